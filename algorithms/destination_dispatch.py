@@ -1,6 +1,6 @@
 import math
 from typing import List
-from models import ElevatorAlgorithm, Elevator, Load
+from models import ElevatorAlgorithm, Elevator, Load, Tunable
 
 
 class DestinationDispatch(ElevatorAlgorithm):
@@ -16,18 +16,23 @@ class DestinationDispatch(ElevatorAlgorithm):
     """
     name = 'Destination Dispatch'
 
-    def __init__(self, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+    # zone range is zone_factor floors when there is one load per floor
+    zone_factor = 20
+    tunables = {'zone_factor': Tunable(1, 100, integer=True)}
+    destination_inputs = frozenset({'floor', 'loads', 'calls'})
+
+    def on_reset(self):
+        super().on_reset()
         self.attended_to = {}
 
     @property
     def pending_loads(self) -> List[Load]:
-        return list(filter(lambda x: x.id not in self.attended_to, super().pending_loads))
+        return [load for load in self.pending_index if load.id not in self.attended_to]
 
     @property
     def zone_range(self):
         lf_ratio = len(self.loads) / self.floors
-        return math.ceil((1 / lf_ratio) * 20)
+        return math.ceil((1 / lf_ratio) * self.zone_factor)
 
     def get_new_destination(self, elevator: Elevator):
         """Gets a new destination for an elevator
@@ -37,21 +42,16 @@ class DestinationDispatch(ElevatorAlgorithm):
         """
         if elevator.load != 0:
             # there is load, go to closest
-            destination_floor = sorted(
+            destination_floor = min(
                 elevator.loads,
                 key=lambda x: abs(x.destination_floor - elevator.current_floor),
-            )[0].destination_floor
+            ).destination_floor
         else:
-            available_loads = self.pending_loads
-
-            if len(available_loads) == 0:
+            # go to the nearest by initial floor
+            go_to = self.pending_index.nearest(elevator.current_floor, self.attended_to)
+            if go_to is None:
                 # no pending loads
                 return None
-            # go to the nearest by initial floor
-            go_to = sorted(
-                available_loads,
-                key=lambda x: abs(x.initial_floor - elevator.current_floor),
-            )[0]
 
             self.attended_to[elevator.id] = go_to
             destination_floor = go_to.initial_floor
@@ -70,11 +70,12 @@ class DestinationDispatch(ElevatorAlgorithm):
     def on_load_unload(self, load, elevator: Elevator):
         if len(elevator.loads) == 0 and elevator.id in self.attended_to:
             del self.attended_to[elevator.id]
+            self.invalidate_destinations()
 
     def on_load_load(self, load, elevator):
         if len(elevator.loads) == 1:
             # First load, reset destination
-            elevator._destination = self.get_new_destination(elevator)
+            elevator.destination = self.get_new_destination(elevator)
 
 
 __algorithm__ = DestinationDispatch
@@ -0,0 +1,243 @@
+import math
+from typing import Dict, Optional, Set, Tuple
+
+import numpy as np
+
+from models import Elevator, ElevatorAlgorithm, Tunable
+from utils import Direction
+
+
+class ElevatorAlgorithmETA(ElevatorAlgorithm):
+    """An estimated time of arrival (ETA) dispatcher
+
+    Waiting loads are grouped into hall calls (a floor and a direction, see ElevatorAlgorithm.hall_calls).
+    Every tick, the cost of each elevator answering each hall call is estimated and calls are assigned
+    to elevators from the cheapest pair upwards.
+
+    The cost of a pair is the number of ticks the elevator needs to reach the call:
+    travel time plus the time to stop at every floor it has to drop loads off at on the way (both from
+    the timings of the elevator, see TravelTimes.eta), plus any action it is still carrying out.
+    Elevators without room for the call are never assigned to it.
+
+    1. Service the hall call assigned to the elevator
+    2. Pick up any loads on the way, travelling the same direction
+    3. Drop off loads in the order they are reached, then repeat step 1
+    4. Park idle elevators where loads are expected to arrive
+    """
+    name = 'ETA Dispatch'
+
+    # ticks to stop at a floor, overriding the stop cost from the timings of each elevator if set
+    stop_ticks: Optional[int] = None
+    tunables = {'stop_ticks': Tunable(0, 30)}
+    parking = True
+    batch_destinations = True
+
+    def on_reset(self):
+        super().on_reset()
+        # elevator id -> (floor, direction) of the hall call it is answering, and the reverse
+        self.assignments: Dict[int, Tuple[int, Direction]] = {}
+        self.call_owners: Dict[Tuple[int, Direction], Set[int]] = {}
+        # elevator id -> direction of the loads it is carrying (or about to board)
+        self.travel_direction: Dict[int, Direction] = {}
+
+        # hall call arrays used by cost_matrix, rebuilt when the hall calls change
+        self._call_arrays = None
+        self._call_arrays_version = None
+
+    def cost_matrix(self):
+        """Estimates the number of ticks each elevator needs to reach each hall call
+
+        Returns: Tuple[np.ndarray, list]
+            An elevators x hall calls matrix of costs (inf where the elevator cannot take the call)
+            and the hall calls, as (floor, direction) tuples, in column order
+        """
+        if self._call_arrays_version != self.hall_calls.version:
+            self._call_arrays = self._build_call_arrays()
+            self._call_arrays_version = self.hall_calls.version
+        calls, call_floors, call_directions, call_weights, _ = self._call_arrays
+        n_elevators = len(self.elevators)
+
+        positions = []
+        move_ticks = []
+        door_ticks = []
+        directions = []
+        furthest = []
+        busy = []
+        room = []
+        stop_elevators = []
+        stop_floors = []
+        stop_load_ticks = []
+        for i, elevator in enumerate(self.elevators):
+            direction = int(self.travel_direction.get(elevator.id, 0))
+            end = elevator.current_floor
+            timings = elevator.timings
+            # stop_counts includes loads that were claimed but have not boarded yet, they are already on their way
+            if elevator._stop_floors:
+                if direction > 0:
+                    end = max(end, elevator._stop_floors[-1])
+                elif direction < 0:
+                    end = min(end, elevator._stop_floors[0])
+                for floor, count in elevator.stop_counts.items():
+                    stop_elevators.append(i)
+                    stop_floors.append(floor)
+                    # ticks to move the loads at the stop, see TravelTimes.stop
+                    stop_load_ticks.append(-(-count // timings.loads_per_tick))
+
+            positions.append(elevator.current_floor)
+            move_ticks.append(timings.move_ticks)
+            door_ticks.append(timings.door_ticks)
+            directions.append(direction)
+            furthest.append(end)
+            busy.append(elevator.action_manager.busy_ticks)
+            room.append(self.max_load - elevator.load if elevator.enabled else -1)
+
+        positions = np.array(positions, dtype=np.int64)[:, None]
+        move_ticks = np.array(move_ticks, dtype=np.int64)[:, None]
+        door_ticks = np.array(door_ticks, dtype=np.int64)[:, None]
+        directions = np.array(directions, dtype=np.int64)[:, None]
+        furthest = np.array(furthest, dtype=np.int64)[:, None]
+        # stops[e, f] is 1 if elevator e has to let loads off at floor f, load_ticks[e, f] the ticks they take
+        stops = np.zeros((n_elevators, self.floors + 2), dtype=np.int64)
+        stops[stop_elevators, stop_floors] = 1
+        load_ticks = np.zeros_like(stops)
+        load_ticks[stop_elevators, stop_floors] = stop_load_ticks
+
+        def stop_cost(stops, load_ticks):
+            if self.stop_ticks is not None:
+                return stops * self.stop_ticks
+            return stops * door_ticks + load_ticks
+
+        # stops strictly between the elevator and the call
+        lower = np.minimum(positions, call_floors)
+        upper = np.maximum(positions, call_floors)
+
+        def between(counts):
+            passed = np.cumsum(counts, axis=1)
+            return np.take_along_axis(passed, np.maximum(upper - 1, lower), axis=1) - np.take_along_axis(
+                passed, lower, axis=1
+            )
+
+        # calls ahead of the elevator in the direction it is going can be picked up on the way,
+        # anything else has to wait until it has dropped everyone off
+        same_direction = (call_directions == directions) & ((call_floors - positions) * directions >= 0)
+        ahead = (directions == 0) | same_direction
+        on_the_way = np.abs(call_floors - positions) * move_ticks + stop_cost(between(stops), between(load_ticks))
+        after_drop_off = (
+            np.abs(furthest - positions) * move_ticks
+            + stop_cost(stops.sum(axis=1)[:, None], load_ticks.sum(axis=1)[:, None])
+            + np.abs(call_floors - furthest) * move_ticks
+        )
+        cost = np.where(ahead, on_the_way, after_drop_off) + np.array(busy, dtype=np.float64)[:, None]
+        cost[np.array(room)[:, None] < call_weights] = math.inf
+        return cost, calls
+
+    def _build_call_arrays(self):
+        calls = []
+        weights = []
+        demand = []
+        for direction in (Direction.UP, Direction.DOWN):
+            for floor in self.hall_calls.floors(direction):
+                call = self.hall_calls.get(floor, direction)
+                calls.append(call.key)
+                # the call can only be answered by an elevator with room for the first load in line
+                weights.append(call.oldest.weight)
+                demand.append(call.weight)
+
+        return (
+            calls,
+            np.array([floor for floor, _ in calls], dtype=np.int64),
+            np.array([int(direction) for _, direction in calls], dtype=np.int64),
+            np.array(weights, dtype=np.int64),
+            np.array(demand, dtype=np.int64),
+        )
+
+    def assign_calls(self):
+        """Assigns hall calls to elevators, cheapest pairs first
+
+        A call keeps being assigned to elevators until they have room for every load waiting at it
+        """
+        self.assignments = {}
+        self.call_owners = {}
+        if len(self.pending_index) == 0 or len(self.elevators) == 0:
+            return
+
+        cost, calls = self.cost_matrix()
+        demand = self._call_arrays[4].copy()
+        for _ in range(len(self.elevators)):
+            index = np.argmin(cost)
+            row, column = divmod(int(index), cost.shape[1])
+            if cost[row, column] == math.inf:
+                break
+
+            elevator = self.elevators[row]
+            self.assignments[elevator.id] = calls[column]
+            self.call_owners.setdefault(calls[column], set()).add(elevator.id)
+            cost[row, :] = math.inf
+            demand[column] -= self.max_load - elevator.load
+            if demand[column] <= 0:
+                cost[:, column] = math.inf
+
+    def pre_loop(self):
+        self.assign_calls()
+
+    def needs_destination(self, elevator: Elevator) -> bool:
+        # idle elevators follow the assignments of this tick
+        return elevator.enabled and not elevator.loads and elevator.id not in self.travel_direction
+
+    def get_new_destinations(self, elevators):
+        destinations = {}
+        for elevator in elevators:
+            destination = self.get_new_destination(elevator)
+            if destination is not None or elevator.id not in self.parked:
+                destinations[elevator.id] = destination
+        return destinations
+
+    def get_new_destination(self, elevator: Elevator):
+        """Gets a new destination for an elevator
+
+        elevator: Elevator
+            The elevator to get a new destination for
+        """
+        if elevator.loads:
+            # drop off the closest load in the direction of travel
+            direction = self.travel_direction.get(elevator.id)
+            floors = [load.destination_floor for load in elevator.loads]
+            if direction is not None:
+                floors = [floor for floor in floors if (floor - elevator.current_floor) * direction >= 0] or floors
+            return min(floors, key=lambda x: abs(x - elevator.current_floor))
+
+        call = self.assignments.get(elevator.id)
+        if call is None:
+            return None
+        return call[0]
+
+    def pre_load_check(self, load, elevator: Elevator):
+        load_direction = load.direction
+        direction = self.travel_direction.get(elevator.id)
+        if direction is not None:
+            return load_direction == direction
+        if elevator.loads:
+            return False
+
+        owners = self.call_owners.get((load.initial_floor, load_direction))
+        if owners is not None and elevator.id not in owners:
+            return False
+
+        self.travel_direction[elevator.id] = load_direction
+        return True
+
+    def on_load_load(self, load, elevator: Elevator):
+        self.travel_direction.setdefault(elevator.id, load.direction)
+        if len(elevator.loads) == 1:
+            # First load, reset destination
+            elevator.destination = self.get_new_destination(elevator)
+
+    def on_load_unload(self, load, elevator: Elevator):
+        if len(elevator.loads) == 0:
+            self.travel_direction.pop(elevator.id, None)
+
+    def on_elevator_removed(self, elevator_id):
+        self.travel_direction.pop(elevator_id, None)
+
+
+__algorithm__ = ElevatorAlgorithmETA
@@ -9,9 +9,10 @@ class ElevatorAlgorithmFCFS(ElevatorAlgorithm):
     3. Repeat step 1 once we run out of loads
     """
     name = 'FCFS'
+    destination_inputs = frozenset({'loads', 'calls'})
 
-    def __init__(self, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+    def on_reset(self):
+        super().on_reset()
         self.attending_to = {}
 
     def get_new_destination(self, elevator: Elevator):
@@ -22,14 +23,13 @@ class ElevatorAlgorithmFCFS(ElevatorAlgorithm):
         """
         if elevator.load != 0:
             # there is load, go to closest
-            destination_floor = sorted(
+            destination_floor = min(
                 elevator.loads,
                 key=lambda x: abs(x.destination_floor - elevator.current_floor),
-            )[0].destination_floor
+            ).destination_floor
         else:
-            try:
-                go_to = self.pending_loads[0]  # get the first in the queue
-            except IndexError:
+            go_to = self.pending_index.first()  # get the first in the queue
+            if go_to is None:
                 # no pending loads
                 return None
 
@@ -47,7 +47,7 @@ class ElevatorAlgorithmFCFS(ElevatorAlgorithm):
     def on_load_load(self, load, elevator):
         if len(elevator.loads) == 1:
             # First load, reset destination
-            elevator._destination = self.get_new_destination(elevator)
+            elevator.destination = self.get_new_destination(elevator)
 
         super().on_load_load(load, elevator)
 
@@ -0,0 +1,150 @@
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+
+from algorithms.eta_dispatch import ElevatorAlgorithmETA
+from utils import Direction, solve_assignment
+
+
+class ElevatorAlgorithmHungarian(ElevatorAlgorithmETA):
+    """An optimal batch assignment dispatcher
+
+    Elevators carrying loads pick up calls ahead of them in their direction of travel, as in ETA Dispatch.
+    Every idle elevator is then assigned to one of the remaining hall calls so that the total
+    estimated time of arrival is as low as possible (the Hungarian method), instead of one pair at a time.
+    A call that needs more room than one elevator has can be assigned to several elevators.
+
+    The assignment is only solved again when the idle elevators or the remaining calls change,
+    starting from the previous solution.
+
+    1. Service the hall call assigned to the elevator
+    2. Pick up any loads on the way, travelling the same direction
+    3. Drop off loads in the order they are reached, then repeat step 1
+    """
+    name = 'Hungarian'
+
+    # cost of pairs that cannot happen, kept finite so every idle elevator still gets a column
+    unreachable_cost = 1e9
+
+    def on_reset(self):
+        super().on_reset()
+        # idle elevators and remaining calls of the last solve, with its solution
+        self._solved_for = None
+        self._idle_assignments: Dict[int, Tuple[int, Direction]] = {}
+        self._potentials: Dict[object, float] = {}
+        self._pairs: Dict[object, object] = {}
+
+    def _remaining_calls(self, busy):
+        """Takes the room of elevators carrying loads off the calls ahead of them
+
+        busy: List[Elevator]
+            Elevators that are carrying (or about to board) loads
+
+        Returns: Dict[Tuple[int, Direction], int]
+            The weight still waiting at each call once the busy elevators have gone past
+        """
+        remaining = {call.key: call.weight for call in self.hall_calls}
+        for elevator in busy:
+            direction = self.travel_direction[elevator.id]
+            room = self.max_load - elevator.load
+            if direction == Direction.UP:
+                floors = self.hall_calls.floors_between(Direction.UP, elevator.current_floor, self.floors)
+            else:
+                floors = reversed(self.hall_calls.floors_between(Direction.DOWN, 1, elevator.current_floor))
+
+            for floor in floors:
+                if room <= 0:
+                    break
+                call = (floor, direction)
+                if remaining[call] <= 0:
+                    continue
+
+                taken = min(room, remaining[call])
+                remaining[call] -= taken
+                room -= taken
+                self.call_owners.setdefault(call, set()).add(elevator.id)
+
+        return remaining
+
+    def assign_calls(self):
+        """Assigns the idle elevators to the remaining hall calls with the lowest total cost"""
+        self.assignments = {}
+        self.call_owners = {}
+        if len(self.pending_index) == 0 or len(self.elevators) == 0:
+            self._solved_for = None
+            return
+
+        idle = []
+        busy = []
+        for elevator in self.elevators:
+            if elevator.loads or elevator.id in self.travel_direction:
+                busy.append(elevator)
+            elif elevator.enabled:
+                idle.append(elevator)
+
+        remaining = self._remaining_calls(busy)
+        # one column per elevator needed to make room for everything waiting at a call
+        columns = []
+        for call, weight in remaining.items():
+            copies = min(math.ceil(weight / self.max_load), len(idle))
+            columns.extend((call, copy) for copy in range(copies))
+
+        solved_for = (tuple(elevator.id for elevator in idle), tuple(columns))
+        if solved_for != self._solved_for:
+            self._solved_for = solved_for
+            self._idle_assignments = self._solve(idle, columns)
+
+        for elevator_id, call in self._idle_assignments.items():
+            self.assignments[elevator_id] = call
+            self.call_owners.setdefault(call, set()).add(elevator_id)
+
+    def _solve(self, idle, columns):
+        """Solves the assignment of idle elevators to call columns
+
+        Returns: Dict[int, Tuple[int, Direction]]
+            The call assigned to each idle elevator
+        """
+        if not idle or not columns:
+            return {}
+
+        cost, calls = self.cost_matrix()
+        rows = [self.elevators.index(elevator) for elevator in idle]
+        call_columns = {call: i for i, call in enumerate(calls)}
+        cost = cost[np.ix_(rows, [call_columns[call] for call, _ in columns])]
+        cost[np.isinf(cost)] = self.unreachable_cost
+
+        row_keys = [elevator.id for elevator in idle]
+        column_keys = columns
+        transposed = len(row_keys) > len(column_keys)
+        if transposed:
+            # more idle elevators than calls, assign calls to elevators instead
+            cost = cost.T
+            row_keys, column_keys = column_keys, row_keys
+
+        # warm start from the previous solution
+        row_index = {key: i for i, key in enumerate(row_keys)}
+        column_index = {key: i for i, key in enumerate(column_keys)}
+        potentials = np.array([self._potentials.get(key, 0.0) for key in column_keys])
+        initial = {
+            row_index[row]: column_index[column]
+            for row, column in self._pairs.items()
+            if row in row_index and column in column_index
+        }
+
+        row_column, potentials = solve_assignment(cost, potentials, initial)
+        self._potentials = dict(zip(column_keys, potentials.tolist()))
+        self._pairs = {row_keys[row]: column_keys[column] for row, column in enumerate(row_column)}
+
+        assignments = {}
+        for row, column in enumerate(row_column):
+            if cost[row, column] >= self.unreachable_cost:
+                continue
+            elevator_id, (call, _) = (
+                (column_keys[column], row_keys[row]) if transposed else (row_keys[row], column_keys[column])
+            )
+            assignments[elevator_id] = call
+        return assignments
+
+
+__algorithm__ = ElevatorAlgorithmHungarian
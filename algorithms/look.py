@@ -1,7 +1,7 @@
-from typing import List
+from typing import Dict, List
 
 from utils import Direction
-from models import ElevatorAlgorithm, Elevator, Load
+from models import ElevatorAlgorithm, Elevator, HallCall, Load
 
 
 class ElevatorAlgorithmLOOK(ElevatorAlgorithm):
@@ -11,22 +11,57 @@ class ElevatorAlgorithmLOOK(ElevatorAlgorithm):
     2. Pick up any loads on the way, travelling the same direction
     3. Reverse direction upon reaching the top or bottom
     4. Repeat step 1 once we run out of loads
+    5. Park idle elevators where loads are expected to arrive
     """
     name = 'LOOK'
+    parking = True
+    destination_inputs = frozenset({'floor', 'loads', 'calls'})
 
-    def __init__(self, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+    def on_reset(self):
+        super().on_reset()
         self.current_direction = {}
-        self.attended_to = {}
+        # elevator id -> floor it is heading to, and the reverse
+        self.attended_to: Dict[int, int] = {}
+        self.attending: Dict[int, int] = {}
 
     @property
     def pending_loads(self) -> List[Load]:
-        return list(
-            filter(
-                lambda x: x.initial_floor not in self.attended_to.values(),
-                super().pending_loads,
+        return [load for load in super().pending_loads if load.initial_floor not in self.attending]
+
+    def _attend(self, elevator, floor):
+        self._release(elevator.id)
+        self.attended_to[elevator.id] = floor
+        self.attending[floor] = elevator.id
+
+    def _release(self, elevator_id):
+        floor = self.attended_to.pop(elevator_id, None)
+        if floor is not None and self.attending.get(floor) == elevator_id:
+            del self.attending[floor]
+            # the floor is free for idle elevators again
+            self.invalidate_destinations()
+
+    def _next_call(self, elevator) -> HallCall:
+        """Finds the closest hall call on a floor no other elevator is heading to
+
+        Calls ahead of the elevator in its current direction are preferred
+        """
+        direction = self.current_direction.get(elevator.id)
+        go_to = None
+        if direction == Direction.UP:
+            go_to = self.hall_calls.nearest(
+                elevator.current_floor, Direction.UP, lowest=elevator.current_floor, exclude_floors=self.attending
+            )
+        elif direction == Direction.DOWN:
+            go_to = self.hall_calls.nearest(
+                elevator.current_floor,
+                Direction.DOWN,
+                highest=elevator.current_floor,
+                exclude_floors=self.attending,
             )
-        )
+
+        if go_to is None:
+            go_to = self.hall_calls.nearest(elevator.current_floor, exclude_floors=self.attending)
+        return go_to
 
     def _calculate_direction(self, elevator, destination_floor):
         if destination_floor is None:
@@ -44,19 +79,19 @@ class ElevatorAlgorithmLOOK(ElevatorAlgorithm):
         """
         if elevator.load != 0:
             # there is load, go to closest
-            destination_floor = sorted(
+            destination_floor = min(
                 elevator.loads,
                 key=lambda x: abs(x.destination_floor - elevator.current_floor),
-            )[0].destination_floor
+            ).destination_floor
         else:
-            available_loads = self.pending_loads
-            if len(available_loads) == 0:
+            go_to = self._next_call(elevator)
+            if go_to is None:
                 # no pending loads
                 self.current_direction[elevator.id] = None
                 return None
 
-            go_to = sorted(available_loads, key=lambda x: abs(x.initial_floor - x.current_floor))[0]
-            destination_floor = self.attended_to[elevator.id] = go_to.initial_floor
+            destination_floor = go_to.floor
+            self._attend(elevator, destination_floor)
             self.current_direction[elevator.id] = None
 
         if self.current_direction.get(elevator.id) is None:
@@ -95,15 +130,12 @@ class ElevatorAlgorithmLOOK(ElevatorAlgorithm):
     def on_load_load(self, load: Load, elevator: Elevator):
         if len(elevator.loads) == 1:
             # First load, reset destination
-            elevator._destination = self.get_new_destination(elevator)
-
-        if elevator.current_floor in self.attended_to.values():
-            for k in self.attended_to:
-                if self.attended_to[k] == elevator.current_floor:
-                    del self.attended_to[k]
-                    break
-        if elevator.id in self.attended_to:
-            del self.attended_to[elevator.id]
+            elevator.destination = self.get_new_destination(elevator)
+
+        attending_id = self.attending.get(elevator.current_floor)
+        if attending_id is not None:
+            self._release(attending_id)
+        self._release(elevator.id)
 
         return super().on_load_load(load, elevator)
 
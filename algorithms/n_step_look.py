@@ -1,3 +1,5 @@
+from typing import Dict, List, Tuple
+
 from algorithms.look import ElevatorAlgorithmLOOK
 from utils import Direction
 from models import Elevator
@@ -9,26 +11,49 @@ class ElevatorAlgorithmNStepLOOK(ElevatorAlgorithmLOOK):
 
     Each elevator is assigned a unique zone of floors.
 
-    1. Service the closest load whose initial floor is within the zone
+    1. Service the oldest load whose initial floor is within the zone
     2. Pick up any loads on the way, travelling the same direction and in the zone
     3. Reverse direction upon reaching the top or bottom
     4. Repeat step 1 once we run out of loads
     """
     name = 'NStepLOOK'
 
-    def __init__(self, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+    def on_reset(self):
+        super().on_reset()
         self.num_zones = len(self.elevators)
-        self.zones = self.calculate_zones()
+        # lookup tables, only recalculated when elevators or floors change
+        self.zones: List[List[int]] = []
+        self.zone_bounds: List[Tuple[int, int]] = []
+        self.floor_zone: List[int] = []
+        self.elevator_zone: Dict[int, int] = {}
+        self.calculate_zones()
 
     def calculate_zones(self):
+        self.invalidate_destinations()
+        self.zones = []
+        self.zone_bounds = []
+        self.floor_zone = [None] * (self.floors + 1)
+        self.elevator_zone = {}
         if len(self.elevators) == 0:
-            return []
-        self.zones = list(split_array(list(range(1, self.floors + 1)), len(self.elevators)))
+            return
+
+        elevator_zones = list(split_array(list(range(1, self.floors + 1)), len(self.elevators)))
+        zone_ids = {}
+        for ev, zone in zip(self.elevators, elevator_zones):
+            bounds = (zone[0], zone[-1])
+            if bounds not in zone_ids:
+                # there are more elevators than floors, zones are shared
+                zone_ids[bounds] = len(self.zone_bounds)
+                self.zone_bounds.append(bounds)
+                for floor in zone:
+                    self.floor_zone[floor] = zone_ids[bounds]
+
+            self.zones.append(zone)
+            self.elevator_zone[ev.id] = zone_ids[bounds]
+
         # update elevators
-        for ev in self.elevators:
-            elevator_index = self.elevators.index(ev)
-            ev.current_floor = self.zones[elevator_index][0]
+        for ev, zone in zip(self.elevators, self.zones):
+            ev.current_floor = zone[0]
 
     def get_new_destination(self, elevator: Elevator):
         """Gets a new destination for an elevator
@@ -38,28 +63,31 @@ class ElevatorAlgorithmNStepLOOK(ElevatorAlgorithmLOOK):
         """
         if elevator.load != 0:
             # there is load, go to closest
-            destination_floor = sorted(
+            destination_floor = min(
                 elevator.loads,
                 key=lambda x: abs(x.destination_floor - elevator.current_floor),
-            )[0].destination_floor
+            ).destination_floor
         else:
-            if elevator not in self.elevators:
+            zone = self.elevator_zone.get(elevator.id)
+            if zone is None:
                 return None
 
-            elevator_index = self.elevators.index(elevator)
-            available_loads = list(
-                filter(
-                    lambda x: x.initial_floor in self.zones[elevator_index],
-                    self.pending_loads,
-                )
-            )
-            if len(available_loads) == 0:
+            lowest, highest = self.zone_bounds[zone]
+            go_to = None
+            for floor in self.pending_index.floors_between(lowest, highest):
+                if floor in self.attending:
+                    continue
+                load = self.pending_index.first_at(floor)
+                if go_to is None or self.pending_index.order(load) < self.pending_index.order(go_to):
+                    go_to = load
+
+            if go_to is None:
                 # no pending loads
                 self.current_direction[elevator.id] = None
                 return None
 
-            go_to = sorted(available_loads, key=lambda x: abs(x.initial_floor - x.current_floor))[0]
-            destination_floor = self.attended_to[elevator.id] = go_to.initial_floor
+            destination_floor = go_to.initial_floor
+            self._attend(elevator, destination_floor)
             self.current_direction[elevator.id] = None
 
         if self.current_direction.get(elevator.id) is None:
@@ -68,8 +96,12 @@ class ElevatorAlgorithmNStepLOOK(ElevatorAlgorithmLOOK):
         return destination_floor
 
     def pre_load_check(self, load, elevator: Elevator):
-        elevator_index = self.elevators.index(elevator)
-        return load.initial_floor in self.zones[elevator_index] and super().pre_load_check(load, elevator)
+        zone = self.elevator_zone.get(elevator.id)
+        return (
+            zone is not None
+            and self.floor_zone[load.initial_floor] == zone
+            and super().pre_load_check(load, elevator)
+        )
 
     def on_elevator_added(self, elevator: Elevator):
         self.calculate_zones()
@@ -81,10 +113,14 @@ class ElevatorAlgorithmNStepLOOK(ElevatorAlgorithmLOOK):
         self.calculate_zones()
 
     def on_elevator_move(self, elevator: Elevator):
-        elevator_index = self.elevators.index(elevator)
-        if elevator.current_floor == self.zones[elevator_index][-1]:  # last floor
+        zone = self.elevator_zone.get(elevator.id)
+        if zone is None:
+            return
+
+        lowest, highest = self.zone_bounds[zone]
+        if elevator.current_floor == highest:  # last floor
             self.current_direction[elevator.id] = Direction.DOWN
-        elif elevator.current_floor == self.zones[elevator_index][0]:  # first floor
+        elif elevator.current_floor == lowest:  # first floor
             self.current_direction[elevator.id] = Direction.UP
 
 
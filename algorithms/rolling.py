@@ -11,16 +11,17 @@ class ElevatorAlgorithmRolling(ElevatorAlgorithm):
     4. Repeat step 1 once we run out of loads
     """
     name = 'Rolling'
+    destination_inputs = frozenset({'loads', 'calls'})
 
-    def __init__(self, *args, **kwargs) -> None:
-        super().__init__(*args, **kwargs)
+    def on_reset(self):
+        super().on_reset()
         self.curr_direction = {}
 
     def _get_curr_direction(self, elevator: Elevator):
         curr_direction = self.curr_direction.get(elevator.id, None)
         if curr_direction is None:
             curr_direction = self.rnd.choice([Direction.UP, Direction.DOWN])
-            self.curr_direction[curr_direction] = curr_direction
+            self.curr_direction[elevator.id] = curr_direction
         return curr_direction
 
     def get_new_destination(self, elevator: Elevator):
@@ -29,7 +30,7 @@ class ElevatorAlgorithmRolling(ElevatorAlgorithm):
         elevator: Elevator
             The elevator to get a new destination for
         """
-        if len(self.pending_loads) == 0:
+        if len(self.pending_index) == 0 and not elevator.loads:
             return None
 
         curr_direction = self._get_curr_direction(elevator)
@@ -53,10 +54,10 @@ class ElevatorAlgorithmRolling(ElevatorAlgorithm):
     def on_elevator_move(self, elevator):
         if elevator.current_floor == self.floors:
             self.curr_direction[elevator.id] = Direction.DOWN
-            elevator._destination = self.get_new_destination(elevator)
+            elevator.destination = self.get_new_destination(elevator)
         elif elevator.current_floor == 1:
             self.curr_direction[elevator.id] = Direction.UP
-            elevator._destination = self.get_new_destination(elevator)
+            elevator.destination = self.get_new_destination(elevator)
 
 
 __algorithm__ = ElevatorAlgorithmRolling
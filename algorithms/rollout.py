@@ -0,0 +1,403 @@
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from algorithms.look import ElevatorAlgorithmLOOK
+from models import ActionQueue, Elevator, Tunable
+from models.action import MOVE_ACTION
+from utils import Direction
+
+
+class RolloutState:
+    """A cheap copy of the simulation state for rollouts
+
+    Only plain lists, dicts and tuples of integers are kept, so copying it does not copy any Load, Elevator or
+    ActionQueue. The simulation follows the timings of every elevator but every elevator is driven by a LOOK-like
+    base policy: carry loads to the closest destination, otherwise head to the closest floor with waiting loads
+    that no other elevator is heading to, picking up loads going the same way.
+
+    floors: int
+        The number of floors
+    max_load: int
+        The maximum load of an elevator
+    tick: int
+        The current tick
+    elevators: List[list]
+        [floor, target, busy ticks, stops, weight, timings] for each elevator, where stops maps the destination
+        of the loads it carries (or is about to board) to their number and weight, and timings is the
+        TravelTimes the elevator runs on. The floor is the one the elevator is at once it is no longer busy.
+    waiting: Dict[int, list]
+        Floor -> (destination, weight, tick created) of every waiting load, in order
+    """
+
+    __slots__ = ('floors', 'max_load', 'tick', 'elevators', 'waiting', 'total_wait')
+
+    def __init__(self, floors, max_load, tick, elevators, waiting) -> None:
+        self.floors = floors
+        self.max_load = max_load
+        self.tick = tick
+        self.elevators: List[list] = elevators
+        self.waiting: Dict[int, List[Tuple[int, int, int]]] = waiting
+        self.total_wait = 0
+
+    @classmethod
+    def from_algorithm(cls, algorithm):
+        """Takes a snapshot of an algorithm"""
+        elevators = []
+        for elevator in algorithm.elevators:
+            floor = elevator.current_floor
+            target = elevator._destination or 0
+            actions = elevator.action_manager.actions
+            if actions and actions[-1] is MOVE_ACTION and target:
+                # the elevator moves once it is done with its ticks
+                floor += (target > floor) - (target < floor)
+
+            stops = {
+                destination: (count, elevator.stop_weights[destination])
+                for destination, count in elevator.stop_counts.items()
+            }
+            # disabled elevators never move
+            busy = elevator.action_manager.busy_ticks if elevator.enabled else math.inf
+            elevators.append([floor, target, busy, stops, sum(elevator.stop_weights.values()), elevator.timings])
+
+        waiting = {}
+        for floor in algorithm.pending_index.floors:
+            waiting[floor] = [
+                (load.destination_floor, load.weight, load.tick_created)
+                for load in algorithm.pending_index.at(floor)
+            ]
+        return cls(algorithm.floors, algorithm.max_load, algorithm.tick_count, elevators, waiting)
+
+    def copy(self):
+        """Creates a copy of the state"""
+        return RolloutState(
+            self.floors,
+            self.max_load,
+            self.tick,
+            [
+                [floor, target, busy, dict(stops), weight, timings]
+                for floor, target, busy, stops, weight, timings in self.elevators
+            ],
+            {floor: list(loads) for floor, loads in self.waiting.items()},
+        )
+
+    def _base_target(self, index):
+        floor, _, _, stops, _, _ = self.elevators[index]
+        if stops:
+            return min(stops, key=lambda x: abs(x - floor))
+
+        targeted = {elevator[1] for i, elevator in enumerate(self.elevators) if i != index}
+        floors = [x for x in self.waiting if x not in targeted] or list(self.waiting)
+        if not floors:
+            return 0
+        return min(floors, key=lambda x: abs(x - floor))
+
+    def _cycle(self, elevator):
+        floor, target, _, stops, weight, timings = elevator
+        changes = 0
+        alighting = stops.pop(floor, None)
+        if alighting is not None:
+            changes, alighting_weight = alighting
+            weight -= alighting_weight
+
+        waiting = self.waiting.get(floor)
+        if waiting:
+            direction = 0
+            if stops:
+                direction = 1 if next(iter(stops)) > floor else -1
+            elif target not in (0, floor):
+                # empty elevators only pick up loads going their way until they get there
+                direction = 1 if target > floor else -1
+            # loads are plain tuples, identical loads cannot be told apart, so the ones left behind are kept
+            staying = []
+            for load in waiting:
+                destination, load_weight, tick_created = load
+                load_direction = 1 if destination > floor else -1
+                if (direction and load_direction != direction) or weight + load_weight > self.max_load:
+                    staying.append(load)
+                    continue
+                direction = load_direction
+                weight += load_weight
+                count, stop_weight = stops.get(destination, (0, 0))
+                stops[destination] = (count + 1, stop_weight + load_weight)
+                self.total_wait += self.tick - tick_created
+
+            boarded = len(waiting) - len(staying)
+            if boarded:
+                changes += boarded
+                if staying:
+                    self.waiting[floor] = staying
+                else:
+                    del self.waiting[floor]
+
+        elevator[4] = weight
+        elevator[2] += timings.stop(changes)
+
+    def step(self):
+        """Runs one tick"""
+        for index, elevator in enumerate(self.elevators):
+            if elevator[2] > 0:
+                elevator[2] -= 1
+                continue
+
+            self._cycle(elevator)
+            if elevator[1] == elevator[0] or elevator[1] == 0 or elevator[3]:
+                elevator[1] = self._base_target(index)
+            if elevator[1] not in (0, elevator[0]):
+                elevator[0] += 1 if elevator[1] > elevator[0] else -1
+                elevator[2] += elevator[5].move_ticks
+            # as in the engine, the tick the cycle runs in is the first of the ticks it takes
+            elevator[2] = max(elevator[2] - 1, 0)
+
+        self.tick += 1
+
+    def projected_wait(self, ticks) -> int:
+        """Runs the state forward and returns the total wait of the loads, as seen at the end
+
+        ticks: int
+            The number of ticks to run for
+        """
+        end = self.tick + ticks
+        for _ in range(ticks):
+            if not self.waiting:
+                break
+            self.step()
+
+        # a load still waiting at the end is counted as waiting as long again, the rollout does not see it board
+        still_waiting = sum(end - tick_created for loads in self.waiting.values() for _, _, tick_created in loads)
+        return self.total_wait + 2 * still_waiting
+
+
+def evaluate_candidate(state: RolloutState, elevator_index: int, floor: int, ticks: int) -> int:
+    """Returns the projected wait if an elevator heads to a floor, on a copy of the state
+
+    state: RolloutState
+        The state to start from
+    elevator_index: int
+        The index of the elevator deciding
+    floor: int
+        The floor it would head to
+    ticks: int
+        The number of ticks to run for
+    """
+    state = state.copy()
+    state.elevators[elevator_index][1] = floor
+    return state.projected_wait(ticks)
+
+
+class ElevatorAlgorithmRollout(ElevatorAlgorithmLOOK):
+    """A Monte Carlo rollout lookahead algorithm
+
+    When an empty elevator needs a new destination, a few candidate floors are picked
+    (the closest waiting load, the closest load in each direction and the oldest load).
+    For each one, the next rollout_ticks ticks are simulated on a cheap copy of the state
+    (see RolloutState) with the elevator heading there and every elevator following LOOK after that.
+    The candidate with the lowest projected wait time wins, as long as it beats the first candidate
+    (the floor LOOK would pick) by more than rollout_margin, as the rollouts are only an approximation.
+    Empty elevators on their way to a floor score their target against the other candidates again
+    every rescore_ticks ticks, as loads that arrived since may be better served by heading elsewhere.
+
+    Every rollout is bounded by rollout_ticks. A wall clock budget can be set with rollout_time_budget (seconds),
+    after which no more rollouts are started and the best candidate so far is used. It is off by default, as which
+    candidates get scored would then depend on how busy the machine is.
+    Rollouts are run in rollout_workers processes (one per CPU by default) when the simulation is not already
+    in a worker process, e.g. a test suite run.
+    With defer_rollouts, they are run in the background (see ElevatorAlgorithm.defer) so the tick is not held up,
+    and the elevator heads to the first candidate until the result is applied at the next tick.
+
+    1. Service the candidate load with the best rollout
+    2. Pick up any loads on the way, travelling the same direction
+    3. Reverse direction upon reaching the top or bottom
+    4. Repeat step 1 once we run out of loads
+    """
+    name = 'Rollout'
+
+    rollout_ticks = 60
+    rollout_time_budget: Optional[float] = None
+    rollout_workers = os.cpu_count() or 1
+    rescore_ticks = ActionQueue.MOVE_TICKS
+    rollout_margin = 0.02
+    defer_rollouts = False
+    tunables = {'rollout_ticks': Tunable(10, 200, integer=True), 'rollout_margin': Tunable(0, 0.2)}
+
+    def on_reset(self):
+        super().on_reset()
+        # on_simulation_end does not run for a simulation that timed out
+        if getattr(self, '_executor', None) is not None:
+            self._executor.shutdown(cancel_futures=True)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # elevator id -> tick it may score its target again at
+        self._next_rescore: Dict[int, int] = {}
+
+    def _candidates(self, elevator: Elevator, exclude_floors=None) -> List[int]:
+        """Returns the floors an empty elevator could head to, best guess first
+
+        elevator: Elevator
+            The elevator deciding
+        exclude_floors: Optional[Container[int]]
+            Floors not to head to
+            Default: the floors an elevator is heading to
+        """
+        if exclude_floors is None:
+            exclude_floors = self.attending
+        calls = [
+            self.hall_calls.nearest(elevator.current_floor, exclude_floors=exclude_floors),
+            self.hall_calls.nearest(elevator.current_floor, Direction.UP, exclude_floors=exclude_floors),
+            self.hall_calls.nearest(elevator.current_floor, Direction.DOWN, exclude_floors=exclude_floors),
+        ]
+        if exclude_floors is self.attending:
+            calls.insert(0, self._next_call(elevator))
+        floors = [call.floor for call in calls if call is not None]
+        oldest = self.pending_index.first()
+        if oldest is not None:
+            floors.append(oldest.initial_floor)
+        return list(dict.fromkeys(floors))
+
+    def _use_workers(self, candidates) -> bool:
+        return self.rollout_workers > 1 and len(candidates) > 1 and not multiprocessing.current_process().daemon
+
+    def _best_candidate(self, state: RolloutState, index: int, candidates: List[int]) -> int:
+        """Runs the rollouts and returns the floor with the lowest projected wait
+
+        Only the state snapshot is used, so this can run in the background
+
+        state: RolloutState
+            Snapshot of the simulation
+        index: int
+            The index of the elevator deciding
+        candidates: List[int]
+            The floors it could head to
+        """
+        deadline = None if self.rollout_time_budget is None else time.perf_counter() + self.rollout_time_budget
+
+        scores = {}
+        if self._use_workers(candidates):
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.rollout_workers)
+            futures = {
+                self._executor.submit(evaluate_candidate, state, index, floor, self.rollout_ticks): floor
+                for floor in candidates
+            }
+            pending = set(futures)
+            while pending:
+                timeout = None if deadline is None else max(deadline - time.perf_counter(), 0)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    scores[futures[future]] = future.result()
+                if not done or (deadline is not None and time.perf_counter() > deadline and scores):
+                    break
+            for future in pending:
+                future.cancel()
+        else:
+            for floor in candidates:
+                scores[floor] = evaluate_candidate(state, index, floor, self.rollout_ticks)
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+
+        if not scores:
+            return candidates[0]
+        # ties go to the earlier candidate
+        best = min(candidates, key=lambda x: (scores.get(x, math.inf), candidates.index(x)))
+        first = scores.get(candidates[0])
+        if first is not None and scores[best] > first * (1 - self.rollout_margin):
+            return candidates[0]
+        return best
+
+    def get_new_destination(self, elevator: Elevator):
+        """Gets a new destination for an elevator
+
+        elevator: Elevator
+            The elevator to get a new destination for
+        """
+        if elevator.load != 0 or elevator not in self.elevators:
+            return super().get_new_destination(elevator)
+
+        candidates = self._candidates(elevator)
+        if not candidates:
+            # no pending loads
+            self.current_direction[elevator.id] = None
+            return None
+
+        destination_floor = candidates[0]
+        if len(candidates) > 1:
+            state = RolloutState.from_algorithm(self)
+            index = self.elevators.index(elevator)
+            if self.defer_rollouts:
+                # head to the first candidate until the rollouts are done
+                self._head_to(elevator, destination_floor)
+                return self.defer(self._best_candidate, state, index, candidates, fallback=destination_floor)
+            destination_floor = self._best_candidate(state, index, candidates)
+
+        self._head_to(elevator, destination_floor)
+        return destination_floor
+
+    def pre_loop(self):
+        super().pre_loop()
+        state = None
+        for index, elevator in enumerate(self.elevators):
+            target = self.attended_to.get(elevator.id)
+            if (
+                target is None
+                or target == elevator.current_floor
+                or elevator.stop_counts
+                or not elevator.enabled
+                or elevator.id in self.pending_decisions
+                or self._next_rescore.get(elevator.id, 0) > self.tick_count
+            ):
+                continue
+
+            self._next_rescore[elevator.id] = self.tick_count + self.rescore_ticks
+            # the floors other elevators are heading to, its own target is the first candidate
+            exclude_floors = {floor for floor, elevator_id in self.attending.items() if elevator_id != elevator.id}
+            candidates = [target] + [x for x in self._candidates(elevator, exclude_floors) if x != target]
+            if len(candidates) == 1:
+                continue
+
+            if state is None:
+                state = RolloutState.from_algorithm(self)
+            if self.defer_rollouts:
+                decision = self.defer(self._best_candidate, state.copy(), index, candidates, fallback=target)
+                self._accept_destination(elevator, decision)
+                continue
+
+            destination_floor = self._best_candidate(state, index, candidates)
+            if destination_floor != target:
+                self._head_to(elevator, destination_floor)
+                elevator.destination = destination_floor
+                state.elevators[index][1] = destination_floor
+
+    def _head_to(self, elevator: Elevator, floor: int):
+        self._attend(elevator, floor)
+        self.current_direction[elevator.id] = None
+        self._calculate_direction(elevator, floor)
+
+    def apply_decision(self, elevator: Elevator, destination):
+        if elevator.loads:
+            # picked up loads on the way, which decide where it goes now
+            return
+        if destination is not None and destination != elevator._destination:
+            self._head_to(elevator, destination)
+        return super().apply_decision(elevator, destination)
+
+    def pre_load_check(self, load, elevator: Elevator):
+        destination = elevator._destination
+        if not elevator.loads and destination not in (None, elevator.current_floor):
+            # on the way to the chosen floor, only pick up loads going the same way
+            return (load.destination_floor > load.initial_floor) == (destination > elevator.current_floor)
+        return super().pre_load_check(load, elevator)
+
+    def on_simulation_end(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['_executor'] = None
+        return state
+
+
+__algorithm__ = ElevatorAlgorithmRollout
@@ -9,6 +9,7 @@ class ElevatorAlgorithmScatter(ElevatorAlgorithm):
     3. Repeat step 1 once we run out of loads
     """
     name = 'Scatter'
+    destination_inputs = frozenset({'loads', 'calls'})
 
     def get_new_destination(self, elevator: Elevator):
         """Gets a new destination for an elevator
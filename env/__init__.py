@@ -0,0 +1,2 @@
+from .env import ElevatorEnv, EnvManager, PolicyAlgorithm
+from .vector import VectorElevatorEnv
@@ -0,0 +1,247 @@
+import random
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from models import Elevator, ElevatorAlgorithm, ElevatorManager, Load
+
+
+class PolicyAlgorithm(ElevatorAlgorithm):
+    """An algorithm whose destinations are chosen from outside the simulation (see ElevatorEnv)
+
+    Loads are picked up on the way, indifferent of direction.
+    The number of loads waiting to go up and down on every floor is kept up to date in calls, a (2, floors + 1)
+    array whose rows are up_counts and down_counts, so an observation copies both at once.
+    """
+    name = 'Policy'
+
+    def on_reset(self):
+        super().on_reset()
+        # elevator id -> destination chosen by the policy
+        self.targets: Dict[int, int] = {}
+        self._recount()
+
+    def _recount(self):
+        self.calls = np.zeros((2, self.floors + 1), dtype=np.int32)
+        self.up_counts, self.down_counts = self.calls
+        for load in self.pending_index:
+            self._count(load, 1)
+
+    def _count(self, load, change):
+        if load.initial_floor > load.destination_floor:
+            self.down_counts[load.initial_floor] += change
+        else:
+            self.up_counts[load.initial_floor] += change
+
+    def get_new_destination(self, elevator: Elevator):
+        """Gets a new destination for an elevator
+
+        elevator: Elevator
+            The elevator to get a new destination for
+        """
+        return self.targets.get(elevator.id)
+
+    def on_floors_changed(self):
+        self._recount()
+
+    def on_load_added(self, load):
+        if load.elevator is None:
+            self._count(load, 1)
+
+    def on_load_removed(self, load):
+        # the load has already left the pending index, delivered loads have no elevator either but boarded one
+        if load.elevator is None and getattr(load, 'enter_lift_tick', None) is None:
+            self._count(load, -1)
+
+    def claim_load(self, load):
+        self._count(load, -1)
+        return super().claim_load(load)
+
+
+class EnvManager(ElevatorManager):
+    """A headless manager that is stepped by ElevatorEnv instead of running its own loop"""
+
+    def __init__(self, algorithm=PolicyAlgorithm):
+        super().__init__(self, None, algorithm, gui=False, log_func=self.log_message)
+
+    @property
+    def running(self):
+        return False
+
+    def log_message(self, level, message):
+        pass
+
+
+class ElevatorEnv:
+    """A Gym-style environment over a simulation
+
+    Every step applies a destination to each elevator and runs the simulation for ticks_per_step ticks.
+    Observations are a dict of NumPy arrays:
+        up_calls, down_calls: (floors,) loads waiting to go up/down on each floor (index 0 is floor 1)
+        positions: (num_elevators,) current floor of each elevator
+        loads: (num_elevators,) weight in each elevator
+        destinations: (num_elevators,) destination of each elevator, 0 if it has none
+
+    The reward is minus the number of loads in the system for every tick that was run,
+    so maximising it minimises the total time loads spend waiting and travelling.
+    An episode terminates when every load has been delivered and is truncated after max_ticks.
+
+    floors: int
+        Number of floors in the building
+        Default: 10
+    num_elevators: int
+        Number of elevators in the building
+        Default: 2
+    num_passengers: int
+        Number of passengers (60kg loads) at the start of each episode
+        Default: 100
+    max_load: int
+        Maximum load of the elevators (in kg)
+        Default: 900
+    max_ticks: int
+        Number of ticks before the episode is truncated
+        Default: 10000
+    ticks_per_step: int
+        Number of ticks run by each step
+        Default: 1
+    init_function: Optional[Callable[[ElevatorAlgorithm], None]]
+        Function to call to initialize the algorithm on every reset
+    """
+
+    def __init__(
+        self,
+        floors: int = 10,
+        num_elevators: int = 2,
+        num_passengers: int = 100,
+        max_load: int = 15 * 60,
+        max_ticks: int = 10000,
+        ticks_per_step: int = 1,
+        init_function: Optional[Callable[[ElevatorAlgorithm], None]] = None,
+    ) -> None:
+        self.floors = floors
+        self.num_elevators = num_elevators
+        self.num_passengers = num_passengers
+        self.max_load = max_load
+        self.max_ticks = max_ticks
+        self.ticks_per_step = ticks_per_step
+        self.init_function = init_function
+
+        self.manager = EnvManager()
+        self.rnd = random.Random()
+
+    @property
+    def algorithm(self) -> PolicyAlgorithm:
+        return self.manager.algorithm
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[Dict[str, np.ndarray], dict]:
+        """Starts a new episode
+
+        seed: Optional[int]
+            Seed for the episode, the episode after the previous one is used if not given
+
+        Returns: Tuple[Dict[str, np.ndarray], dict]
+            The first observation and info
+        """
+        if seed is not None:
+            self.rnd = random.Random(seed)
+
+        self.manager.reset(PolicyAlgorithm)
+        algorithm = self.algorithm
+        algorithm.rnd = random.Random(self.rnd.getrandbits(32))
+        algorithm.floors = self.floors
+        algorithm.max_load = self.max_load
+
+        for _ in range(self.num_passengers):
+            initial, destination = algorithm.rnd.sample(range(1, self.floors + 1), 2)
+            algorithm.add_load(Load(initial, destination, 60))
+        for _ in range(self.num_elevators):
+            algorithm.create_elevator(algorithm.rnd.randint(1, self.floors))
+        if self.init_function is not None:
+            self.init_function(algorithm)
+
+        algorithm.active = True
+        return self.observe(), self._info()
+
+    def step(self, actions) -> Tuple[Dict[str, np.ndarray], float, bool, bool, dict]:
+        """Sets the elevator destinations and runs the simulation
+
+        actions: Sequence[int]
+            The destination floor of each elevator, 0 to leave it unchanged
+
+        Returns: Tuple[Dict[str, np.ndarray], float, bool, bool, dict]
+            observation, reward, terminated, truncated and info
+        """
+        reward, terminated, truncated = self._run(actions)
+        return self.observe(), reward, terminated, truncated, self._info()
+
+    def _run(self, actions) -> Tuple[float, bool, bool]:
+        """Sets the elevator destinations and runs the simulation, returns the reward, terminated and truncated"""
+        algorithm = self.manager.algorithm
+        if isinstance(actions, np.ndarray):
+            actions = actions.tolist()
+        floors = algorithm.floors
+        for elevator, floor in zip(algorithm.elevators, actions):
+            if floor == 0:
+                continue
+            if not 1 <= floor <= floors:
+                raise ValueError(f'Elevator {elevator.id} cannot go to floor {floor} of {floors}')
+
+            algorithm.targets[elevator.id] = floor
+            if elevator._destination != floor:
+                elevator.destination = floor
+
+        reward = 0.0
+        for _ in range(self.ticks_per_step):
+            algorithm.loop()
+            if not algorithm.loads:
+                break
+            algorithm.record_occupancy()
+            reward -= len(algorithm.loads)
+
+        terminated = not algorithm.loads
+        truncated = not terminated and algorithm.tick_count >= self.max_ticks
+        if terminated:
+            algorithm.on_simulation_end()
+        return reward, terminated, truncated
+
+    def _elevator_state(self) -> list:
+        """Returns the positions, loads and destinations of the elevators, one after the other"""
+        elevators = self.manager.algorithm.elevators
+        return (
+            [elevator._current_floor for elevator in elevators]
+            + [elevator._load for elevator in elevators]
+            + [elevator._destination or 0 for elevator in elevators]
+        )
+
+    def observe(self) -> Dict[str, np.ndarray]:
+        """Returns the current observation"""
+        algorithm = self.manager.algorithm
+        # indexing is cheaper than unpacking the rows
+        calls = algorithm.calls[:, 1:].copy()
+        elevators = np.array(self._elevator_state(), dtype=np.int32)
+        count = len(algorithm.elevators)
+        return {
+            'up_calls': calls[0],
+            'down_calls': calls[1],
+            'positions': elevators[:count],
+            'loads': elevators[count : 2 * count],
+            'destinations': elevators[2 * count :],
+        }
+
+    def observe_into(self, calls: np.ndarray, elevators: np.ndarray):
+        """Writes the current observation into preallocated arrays, instead of creating new ones
+
+        calls: np.ndarray
+            (2, floors) array for the up and down calls
+        elevators: np.ndarray
+            (3 * num_elevators,) array for the positions, loads and destinations, one after the other
+        """
+        calls[:] = self.manager.algorithm.calls[:, 1:]
+        elevators[:] = self._elevator_state()
+
+    def _info(self) -> dict:
+        algorithm = self.manager.algorithm
+        return {'tick': algorithm.tick_count, 'loads': len(algorithm.loads)}
+
+    def close(self):
+        self.manager.close()
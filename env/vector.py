@@ -0,0 +1,159 @@
+import multiprocessing as mp
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from env.env import ElevatorEnv
+
+
+def _worker(pipe, env_fn):
+    env = env_fn()
+    try:
+        while True:
+            command, argument = pipe.recv()
+            if command == 'reset':
+                pipe.send(env.reset(argument))
+            elif command == 'step':
+                pipe.send(_step_and_reset(env, argument))
+            elif command == 'close':
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        env.close()
+        pipe.close()
+
+
+def _step_and_reset(env: ElevatorEnv, actions):
+    """Steps an environment, starting a new episode if this one is over
+
+    The last observation of the finished episode is kept in info['final_observation']
+    """
+    observation, reward, terminated, truncated, info = env.step(actions)
+    if terminated or truncated:
+        info['final_observation'] = observation
+        observation, reset_info = env.reset()
+        info.update(reset_info)
+    return observation, reward, terminated, truncated, info
+
+
+class VectorElevatorEnv:
+    """Runs several ElevatorEnv at once, stacking their observations
+
+    Environments that finish an episode are reset automatically.
+    With subprocesses, each environment runs in its own process, otherwise they are stepped in lockstep
+    in this process (usually faster for small buildings, as there is no pickling).
+
+    env_fns: Sequence[Callable[[], ElevatorEnv]]
+        Functions creating each environment (must be picklable to use subprocesses)
+    subprocesses: Optional[bool]
+        Whether to run each environment in its own process
+        Default: False
+    """
+
+    def __init__(self, env_fns: Sequence[Callable[[], ElevatorEnv]], subprocesses: bool = False) -> None:
+        self.num_envs = len(env_fns)
+        self.subprocesses = subprocesses
+        self.envs: List[ElevatorEnv] = []
+        self.pipes = []
+        self.processes = []
+
+        if subprocesses:
+            ctx = mp.get_context()
+            for env_fn in env_fns:
+                parent, child = ctx.Pipe()
+                process = ctx.Process(target=_worker, args=(child, env_fn), daemon=True)
+                process.start()
+                child.close()
+                self.pipes.append(parent)
+                self.processes.append(process)
+        else:
+            self.envs = [env_fn() for env_fn in env_fns]
+
+    @staticmethod
+    def _stack(observations: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+        return {key: np.stack([observation[key] for observation in observations]) for key in observations[0]}
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[Dict[str, np.ndarray], List[dict]]:
+        """Starts a new episode in every environment
+
+        seed: Optional[int]
+            Environment i is seeded with seed + i
+        """
+        seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        if self.subprocesses:
+            for pipe, env_seed in zip(self.pipes, seeds):
+                pipe.send(('reset', env_seed))
+            results = [pipe.recv() for pipe in self.pipes]
+        else:
+            results = [env.reset(env_seed) for env, env_seed in zip(self.envs, seeds)]
+
+        observations, infos = zip(*results)
+        return self._stack(observations), list(infos)
+
+    def step(self, actions) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray, List[dict]]:
+        """Steps every environment
+
+        actions: np.ndarray
+            A num_envs x num_elevators array of destination floors, 0 to leave a destination unchanged
+        """
+        if not self.subprocesses:
+            return self._step_in_process(actions)
+
+        for pipe, env_actions in zip(self.pipes, actions):
+            pipe.send(('step', env_actions))
+        results = [pipe.recv() for pipe in self.pipes]
+
+        observations, rewards, terminated, truncated, infos = zip(*results)
+        return (
+            self._stack(observations),
+            np.array(rewards, dtype=np.float64),
+            np.array(terminated, dtype=bool),
+            np.array(truncated, dtype=bool),
+            list(infos),
+        )
+
+    def _step_in_process(self, actions):
+        """Steps every environment in this process, writing their observations straight into the stacked arrays"""
+        if isinstance(actions, np.ndarray):
+            actions = actions.tolist()
+        algorithm = self.envs[0].algorithm
+        count = len(algorithm.elevators)
+        calls = np.empty((self.num_envs, 2, algorithm.floors), dtype=np.int32)
+        elevators = np.empty((self.num_envs, 3 * count), dtype=np.int32)
+        rewards = np.empty(self.num_envs, dtype=np.float64)
+        terminated = np.empty(self.num_envs, dtype=bool)
+        truncated = np.empty(self.num_envs, dtype=bool)
+        infos = []
+        for index, (env, env_actions) in enumerate(zip(self.envs, actions)):
+            rewards[index], terminated[index], truncated[index] = env._run(env_actions)
+            info = env._info()
+            if terminated[index] or truncated[index]:
+                info['final_observation'] = env.observe()
+                _, reset_info = env.reset()
+                info.update(reset_info)
+            env.observe_into(calls[index], elevators[index])
+            infos.append(info)
+
+        observations = {
+            'up_calls': calls[:, 0],
+            'down_calls': calls[:, 1],
+            'positions': elevators[:, :count],
+            'loads': elevators[:, count : 2 * count],
+            'destinations': elevators[:, 2 * count :],
+        }
+        return observations, rewards, terminated, truncated, infos
+
+    def close(self):
+        for pipe in self.pipes:
+            try:
+                pipe.send(('close', None))
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self.processes:
+            process.join(timeout=1)
+        for env in self.envs:
+            env.close()
+        self.pipes = []
+        self.processes = []
+        self.envs = []
@@ -27,7 +27,7 @@ class ControlPanel(wx.Panel):
 
         self.InitUI()
 
-    def OnUpdateAlgorithm(self, before, after):
+    def OnUpdateAlgorithm(self, before, after, changes=None):
         # changes to track: current_floor, destination, new elevators, active
         updated = False
 
@@ -41,7 +41,7 @@ class ControlPanel(wx.Panel):
                 element = self.FindWindowById(element_id)
                 element.SetRange(1, after.floors)
 
-        if before.elevators != after.elevators:
+        if (changes is None or changes.structure) and before.elevators != after.elevators:
             updated = True
             for element_id in (ID.SELECT_ELEVATOR_REMOVE,):
                 element = self.FindWindowById(element_id)
@@ -41,7 +41,7 @@ class ElevatorsPanel(scrolled.ScrolledPanel):
 
         self.sz.Add(elevator_box, 1, wx.ALL | wx.CENTRE, 10)
 
-    def OnUpdateAlgorithm(self, before, after):
+    def OnUpdateAlgorithm(self, before, after, changes=None):
         # changes to track: current_floor, destination, new elevators
         updated = False
         if len(before.elevators) != len(after.elevators):
@@ -58,6 +58,8 @@ class ElevatorsPanel(scrolled.ScrolledPanel):
 
         # elevator added
         for ev in after.elevators:
+            if changes is not None and ev.id not in changes.elevators:
+                continue
             if ev.id not in self.texts:  # equivalent to ev not in before.elevators
                 updated = True
                 self._add_elevator(ev)
@@ -76,16 +78,17 @@ class ElevatorsPanel(scrolled.ScrolledPanel):
                     self.texts[ev.id][1].SetLabel(fmt_pax)
 
         # elevator removed
-        for ev in before.elevators:
-            if ev not in after.elevators:
-                for index, elev in enumerate(self.sz.GetChildren()):
-                    if elev.GetWindow().GetLabel() == f'Elevator {ev.id}':
-                        break
-
-                self.sz.Hide(index)
-                self.sz.Remove(index)
-                del self.texts[ev.id]
-                updated = True
+        if changes is None or changes.structure:
+            for ev in before.elevators:
+                if ev not in after.elevators:
+                    for index, elev in enumerate(self.sz.GetChildren()):
+                        if elev.GetWindow().GetLabel() == f'Elevator {ev.id}':
+                            break
+
+                    self.sz.Hide(index)
+                    self.sz.Remove(index)
+                    del self.texts[ev.id]
+                    updated = True
 
         if updated:
             self.window.WriteToLog(logging.DEBUG, 'ElevatorsPanel Layout Updated')
@@ -1,9 +1,10 @@
 import logging
-from typing import List, Set
+from collections import deque
+from typing import Deque, Set
 
 import wx
 
-from utils import ID, get_log_level, get_log_name, log_levels
+from utils import ID, Constants, get_log_level, get_log_name, log_levels
 from models import log_message
 
 
@@ -19,7 +20,8 @@ class LogPanel(wx.Panel):
             style=wx.TAB_TRAVERSAL | wx.BORDER_THEME,
         )
 
-        self.log_messages: List[log_message.LogMessage] = []
+        # only the latest messages are kept, so a simulation can be left running
+        self.log_messages: Deque[log_message.LogMessage] = deque(maxlen=Constants.MAX_LOG_MESSAGES)
         self.log_levels: Set[int] = set(log_levels().values())
         self.log_levels.remove(logging.DEBUG)
         self.InitUI()
@@ -30,6 +32,8 @@ class LogPanel(wx.Panel):
         if message.level in self.log_levels:
             name = get_log_name(message.level)
             self.log_tc.AppendText(f'[{name[0]}] {message.tick}: {message.message}\n')
+            if self.log_tc.GetNumberOfLines() > Constants.MAX_LOG_MESSAGES + 1:
+                self.log_tc.Remove(0, self.log_tc.GetLineLength(0) + 1)
 
     def OnLogLevelChanged(self, e):
         cb = e.GetEventObject()
@@ -36,13 +36,13 @@ class StatsPanel(scrolled.ScrolledPanel):
     def update_stats(self, algorithm):
         self.stats_tc.SetValue(str(algorithm.stats))
 
-    def OnUpdateAlgorithm(self, before, after):
+    def OnUpdateAlgorithm(self, before, after, changes=None):
         updated = False
         if str(before.stats) != str(after.stats):
             updated = True
             self.update_stats(after)
 
-        if before.loads != after.loads:
+        if changes is None or changes.loads:
             # floor panel
             updated = True
             floor_fmt = ''
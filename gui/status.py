@@ -19,7 +19,7 @@ class ElevatorStatusPanel(scrolled.ScrolledPanel):
         self.rows = []
         self.InitUI()
 
-    def OnUpdateAlgorithm(self, before, after):
+    def OnUpdateAlgorithm(self, before, after, changes=None):
         # Number of floors and loads
         updated = False
         if before.floors < after.floors:
@@ -38,17 +38,23 @@ class ElevatorStatusPanel(scrolled.ScrolledPanel):
                 if i % 5 == 0:
                     self.rows.pop()
 
-        if before.loads != after.loads:
+        if changes is None or changes.structure:
+            changed_floors = range(1, after.floors + 1)
+        else:
+            changed_floors = [floor for floor in changes.floors if floor <= after.floors]
+
+        if changed_floors:
             updated = True
-            floors = [[0, 0] for _ in range(after.floors)]
-            for load in after.loads:
-                if load.elevator is None:
+            floors = {floor: [0, 0] for floor in changed_floors}
+            for floor in changed_floors:
+                for load in after.pending_index.at(floor):
                     if load.initial_floor < load.destination_floor:
-                        floors[load.initial_floor - 1][0] += load.weight
+                        floors[floor][0] += load.weight
                     else:
-                        floors[load.initial_floor - 1][1] += load.weight
+                        floors[floor][1] += load.weight
 
-            for n, (up, down) in enumerate(floors):
+            for floor, (up, down) in floors.items():
+                n = floor - 1
                 if up == 0:
                     self.rows[n][0].SetForegroundColour(wx.Colour(0, 0, 0))
                 else:
@@ -60,8 +66,6 @@ class ElevatorStatusPanel(scrolled.ScrolledPanel):
                 self.rows[n][0].SetLabel(str(up // 60).zfill(2))
                 self.rows[n][1].SetLabel(str(down // 60).zfill(2))
 
-            updated = True
-
         if updated:
             self.window.WriteToLog(logging.DEBUG, 'ElevatorStatusPanel Layout Updated')
             self.Layout()
@@ -38,10 +38,11 @@ class BaseWindow(wx.Frame):
         self.SetBackgroundColour('white')
         self.InitMenuBar()
 
-    def _update_gui(self, algo):
+    def _update_gui(self, algo, changes=None):
+        # changes is None when everything has to be refreshed
         for c in list(self.GetChildren()):
             if hasattr(c, 'OnUpdateAlgorithm'):
-                c.OnUpdateAlgorithm(self.algorithm, algo)
+                c.OnUpdateAlgorithm(self.algorithm, algo, changes)
 
         # self.algorithm = copy.deepcopy(algo)
         self.algorithm = algo.copy()
@@ -62,16 +63,21 @@ class BaseWindow(wx.Frame):
     def InitMenuBar(self):
         menubar = wx.MenuBar()
         fileMenu = wx.Menu()
+        fileMenu.AppendCheckItem(ID.MENU_LONG_RUNNING, '&Long running mode')
         fileMenu.Append(wx.MenuItem(fileMenu, ID.MENU_APP_EXIT, '&Quit\tCtrl+Q'))
 
+        self.Bind(wx.EVT_MENU, self.OnLongRunningToggled, id=ID.MENU_LONG_RUNNING)
         self.Bind(wx.EVT_MENU, self.Close, id=ID.MENU_APP_EXIT)
         menubar.Append(fileMenu, '&File')
 
         self.SetMenuBar(menubar)
         self.SetFont(self.font)
 
+    def OnLongRunningToggled(self, e: wx.Event):
+        self.manager.set_long_running(e.IsChecked())
+
     def OnUpdateAlgorithm(self, e: wx.Event):
-        self._update_gui(e.algorithm)
+        self._update_gui(e.algorithm, e.changes)
 
     def Close(self, *_):
         self.manager.close()
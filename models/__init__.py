@@ -1,7 +1,18 @@
 from models.action import Action, ActionQueue
+from models.travel_time import TravelTimes
 from models.load import Load
+from models.index import FloorIndex
+from models.hall_call import HallCall, HallCallIndex
 from models.elevator import Elevator
 from models.log_message import LogMessage
-from models.stats import CombinedStats, GeneratedStats, SimulationStats
+from models.stall import StallDetector
+from models.journal import ChangeJournal
+from models.stats import CombinedStats, GeneratedStats, OccupancyStats, SimulationStats
+from models.steady_state import SteadyStateMonitor, SteadyStateWindow
+from models.tunable import Tunable
+from models.forecast import ArrivalForecast
+from models.decision import DeferredDecision
+from models.archive import LoadArchive
 from models.algorithm import ElevatorAlgorithm
 from models.manager import ElevatorManager
+from models.campus import Building, Campus
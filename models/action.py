@@ -1,3 +1,4 @@
+import itertools
 from collections import deque
 from dataclasses import dataclass
 from typing import Any, Deque
@@ -5,38 +6,66 @@ from typing import Any, Deque
 from utils import ActionType
 
 
-@dataclass
+@dataclass(frozen=True)
 class Action:
     action_type: ActionType
     argument: Any = None
 
 
+# actions without an argument are shared, so queueing them does not create anything
+TICK_ACTION = Action(ActionType.ADD_TICK)
+RUN_CYCLE_ACTION = Action(ActionType.RUN_CYCLE)
+MOVE_ACTION = Action(ActionType.MOVE_ELEVATOR)
+SHARED_ACTIONS = {action.action_type: action for action in (TICK_ACTION, RUN_CYCLE_ACTION, MOVE_ACTION)}
+
+
 class ActionQueue:
     """A queue of actions to be performed by the elevator"""
 
+    # number of ticks each step takes
+    DOOR_OPEN_TICKS = 3
+    DOOR_CLOSE_TICKS = 3
+    MOVE_TICKS = 3
+
     def __init__(self):
         self.actions: Deque[Action] = deque()
+        # number of ADD_TICK actions queued, the ticks until the elevator is free
+        self.busy_ticks = 0
 
     def get(self):
         try:
-            return self.actions.popleft()
+            action = self.actions.popleft()
         except IndexError:
-            return Action(ActionType.RUN_CYCLE)
+            return RUN_CYCLE_ACTION
+        if action.action_type == ActionType.ADD_TICK:
+            self.busy_ticks -= 1
+        return action
 
     def add(self, action: Action):
         self.actions.append(action)
+        if action.action_type == ActionType.ADD_TICK:
+            self.busy_ticks += 1
 
     def tick(self, count=1):
-        for _ in range(count):
-            self.actions.append(Action(ActionType.ADD_TICK))
+        self.actions.extend(itertools.repeat(TICK_ACTION, count))
+        self.busy_ticks += count
+
+    def open_door(self, ticks=None):
+        self.tick(self.DOOR_OPEN_TICKS if ticks is None else ticks)
+
+    def close_door(self, ticks=None):
+        self.tick(self.DOOR_CLOSE_TICKS if ticks is None else ticks)
 
-    def open_door(self):
-        self.tick(3)
+    def move(self, ticks=None):
+        self.tick(self.MOVE_TICKS if ticks is None else ticks)
 
-    def close_door(self):
-        self.tick(3)
+    def clear(self):
+        """Removes every action, keeping the queue"""
+        self.actions.clear()
+        self.busy_ticks = 0
 
     def copy(self):
         new_queue = ActionQueue()
         new_queue.actions = self.actions.copy()
+        new_queue.busy_ticks = self.busy_ticks
         return new_queue
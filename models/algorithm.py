@@ -1,33 +1,138 @@
 import copy
 import glob
 import importlib
+import logging
 import os
 import random
-from typing import List
-
-from models import Load, Elevator, GeneratedStats, SimulationStats
-from utils import Constants, BadArgumentError, InvalidAlgorithmError
+from array import array
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, FrozenSet, List, Optional, Set
+
+from models import (
+    Action,
+    ArrivalForecast,
+    ChangeJournal,
+    DeferredDecision,
+    FloorIndex,
+    HallCallIndex,
+    Load,
+    Elevator,
+    GeneratedStats,
+    OccupancyStats,
+    SimulationStats,
+    TravelTimes,
+    Tunable,
+)
+from utils import ActionType, Constants, BadArgumentError, InvalidAlgorithmError, InvariantError, zobrist_key
+
+
+FINGERPRINT_MASK = (1 << 64) - 1
 
 
 class ElevatorAlgorithm:
     """A global class that houses the elevators"""
 
     name: str = NotImplemented
+    # attribute name -> range, for parameters that can be tuned (see suite.Tuner)
+    tunables: Dict[str, Tunable] = {}
+
+    # send idle elevators to where loads are expected to arrive, see park_idle_elevators
+    parking = False
+    # ticks it takes for an arrival to count half as much in the forecast
+    parking_half_life = 300
+    # what get_new_destination depends on, out of 'floor', 'loads' (of the elevator) and 'calls' (waiting loads)
+    # declaring them lets the engine skip asking idle elevators again, see request_destination
+    destination_inputs: FrozenSet[str] = frozenset()
+    # ask for the destinations of every elevator that needs one at once, see get_new_destinations
+    batch_destinations = False
+    # seconds a deferred decision may take by default, and threads computing them, see defer
+    decision_deadline: Optional[float] = None
+    decision_workers = 1
 
     def __init__(self, manager, floors=None, *, elevators=None, loads=None) -> None:
         self.manager = manager
         self._floors: int = floors if floors is not None else Constants.DEFAULT_FLOORS
         self.elevators: List['Elevator'] = elevators or []
         self.loads: List['Load'] = loads or []
+        # loads waiting for an elevator, see claim_load
+        self.pending_index = FloorIndex(load for load in self.loads if load.elevator is None)
+        # the same loads, aggregated per floor and direction
+        self.hall_calls = HallCallIndex(self.pending_index)
+        for elevator in self.elevators:
+            elevator._owner = self
+
+        # elevator id -> decision still being computed, see defer
+        self.pending_decisions: Dict[int, DeferredDecision] = {}
+        self._decision_executor: Optional[ThreadPoolExecutor] = None
+        # elevators of an earlier run, for create_elevator to reuse (see reset_in_place)
+        self._spare_elevators: List['Elevator'] = []
 
+        self._reset_run()
+        self.on_reset()
+        # anything set on the instance after this (e.g. by set_tunables) is removed by reset_in_place
+        self._fresh_attributes = frozenset(self.__dict__) | {'_fresh_attributes'}
+
+    def _reset_run(self):
+        """Sets up the state of a run that is not kept between runs, see reset_in_place"""
         self.max_load = 15 * 60
         self.rnd = random.Random()
+        # timings of the building, elevators can have their own (see Elevator.travel_times)
+        self.travel_times = TravelTimes()
 
         self.active = False
         self.tick_count = 0
         self.wait_times = GeneratedStats()
         self.time_in_lift = GeneratedStats()
-        self.occupancy = GeneratedStats()
+        self.occupancy = OccupancyStats()
+
+        # state fingerprint, see update_fingerprint
+        self.progress_count = 0
+        self.hash_trace: array = None
+        # changes since the journal was last read, see record_changes
+        self.changes: ChangeJournal = None
+        self.fingerprint = self._compute_fingerprint()
+
+        self.forecast = ArrivalForecast(self._floors, self.parking_half_life)
+        # elevator id -> floor it was parked at, and what the parking floors were last worked out for
+        self.parked: Dict[int, int] = {}
+        self._parked_for = None
+        # elevators told to stay idle, whose inputs have not changed since
+        self._idle_decisions: Set[int] = set()
+
+    @classmethod
+    def resets_in_place(cls) -> bool:
+        """Whether reset_in_place leaves the algorithm as a new one would be
+
+        That is the case if the class sets up its own state in on_reset rather than in __init__.
+        """
+        return cls.__init__ is ElevatorAlgorithm.__init__
+
+    def reset_in_place(self):
+        """Resets the algorithm to the state of a new one (type(self)(manager)), reusing its objects
+
+        Its elevators, with their lists of loads and action queues, are kept for create_elevator to reuse,
+        and the indexes of waiting loads and the threads computing deferred decisions are kept, emptied.
+        Statistics are handed out with the results of a run (see stats), so they are created again.
+
+        Raises InvalidAlgorithmError if the algorithm cannot be reset in place, see resets_in_place
+        """
+        if not self.resets_in_place():
+            raise InvalidAlgorithmError(f'{self.name} sets up its state in __init__, it cannot be reset in place')
+
+        for elevator_id in list(self.pending_decisions):
+            self.drop_decision(elevator_id)
+        # reused from the end, so they are handed out in the order they were created
+        self._spare_elevators.extend(reversed(self.elevators))
+        self.elevators.clear()
+        self.loads.clear()
+        self.pending_index.clear()
+        self.hall_calls.clear()
+
+        for name in self.__dict__.keys() - self._fresh_attributes:
+            delattr(self, name)
+        self._floors = Constants.DEFAULT_FLOORS
+        self._reset_run()
+        self.on_reset()
 
     def copy(self):
         """Creates a copy of the algorithm"""
@@ -39,14 +144,35 @@ class ElevatorAlgorithm:
         )
         ev_algo.max_load = self.max_load
         ev_algo.rnd = copy.copy(self.rnd)
+        ev_algo.travel_times = self.travel_times
 
         ev_algo.tick_count = self.tick_count
         ev_algo.wait_times = self.wait_times.copy()
         ev_algo.time_in_lift = self.time_in_lift.copy()
         ev_algo.occupancy = self.occupancy.copy()
+        ev_algo.progress_count = self.progress_count
+        ev_algo.forecast = self.forecast.copy()
+        ev_algo.parked = dict(self.parked)
         ev_algo.active = self.active
         return ev_algo
 
+    def get_tunables(self) -> Dict[str, float]:
+        """Returns the current value of every tunable parameter"""
+        return {name: getattr(self, name) for name in self.tunables}
+
+    def set_tunables(self, values: Dict[str, float]):
+        """Sets tunable parameters, clipped to their range
+
+        values: Dict[str, float]
+            Mapping of { parameter name: value }
+
+        Raises BadArgumentError if a parameter is not tunable
+        """
+        for name, value in values.items():
+            if name not in self.tunables:
+                raise BadArgumentError(f'{self.name} has no tunable parameter {name}')
+            setattr(self, name, self.tunables[name].clip(value))
+
     @property
     def floors(self):
         return self._floors
@@ -54,6 +180,9 @@ class ElevatorAlgorithm:
     @floors.setter
     def floors(self, value):
         self._floors = value
+        self.invalidate_destinations()
+        if self.changes is not None:
+            self.changes.record_structure()
         self.on_floors_changed()
 
     @property
@@ -64,17 +193,65 @@ class ElevatorAlgorithm:
             wait_time=self.wait_times,
             time_in_lift=self.time_in_lift,
             occupancy=self.occupancy,
+            hash_trace=self.hash_trace,
+        )
+
+    def eta(self, elevator, floor) -> int:
+        """Estimates the ticks an elevator needs to reach a floor
+
+        The elevator is taken to head straight there, finishing what it is doing first
+        and stopping to drop off its loads (and those about to board) on the way (see TravelTimes.eta)
+
+        elevator: Elevator
+            The elevator to estimate for
+        floor: int
+            The floor to reach
+        """
+        lowest, highest = sorted((elevator.current_floor, floor))
+        stops, changes = elevator.stops_between(lowest, highest)
+        return elevator.timings.eta(
+            elevator.current_floor, floor, stops, changes, elevator.action_manager.busy_ticks
         )
 
     @property
     def pending_loads(self) -> List['Load']:
-        return [load for load in self.loads if load.elevator is None]
+        """Loads waiting for an elevator, in the order they were added"""
+        return list(self.pending_index)
 
     @property
     def simulation_running(self) -> bool:
         """Returns True if there are loads in the system"""
         return len(self.loads) > 0
 
+    def update_fingerprint(self, removed=None, added=None):
+        """Updates the state fingerprint (a Zobrist-style 64 bit state hash)
+
+        The fingerprint is the sum (mod 2**64) of the zobrist keys of every state key currently in the
+        system: elevator positions and destinations (Elevator.state_key) and load assignments (Load.state_key).
+        Sums are used instead of XOR so identical loads in the same elevator do not cancel out.
+        Keys only contain integers, so the same state has the same fingerprint in every process.
+
+        removed: Optional[tuple]
+            The state key that no longer applies
+        added: Optional[tuple]
+            The state key that replaces it
+        """
+        if removed is not None:
+            self.fingerprint -= zobrist_key(removed)
+        if added is not None:
+            self.fingerprint += zobrist_key(added)
+        self.fingerprint &= FINGERPRINT_MASK
+
+    def _compute_fingerprint(self):
+        """Computes the state fingerprint from scratch"""
+        fingerprint = 0
+        for elevator in self.elevators:
+            fingerprint += zobrist_key(elevator.state_key)
+        for load in self.loads:
+            elevator_id = load.elevator.id if isinstance(load.elevator, Elevator) else 0
+            fingerprint += zobrist_key(load.state_key(elevator_id))
+        return fingerprint & FINGERPRINT_MASK
+
     def get_new_destination(self, elevator):
         """Gets a new destination for an elevator
 
@@ -83,6 +260,233 @@ class ElevatorAlgorithm:
         """
         raise NotImplementedError('get_new_destination must be implemented in a subclass')
 
+    def needs_destination(self, elevator) -> bool:
+        """Checks if an elevator should be given a new destination at the start of a tick (see batch_destinations)
+
+        elevator: Elevator
+            The elevator to check
+        """
+        return elevator.enabled and (
+            elevator._destination is None or elevator._destination == elevator.current_floor
+        )
+
+    def get_new_destinations(self, elevators) -> Dict[int, int]:
+        """Gets new destinations for several elevators at once
+
+        When batch_destinations is set, this is called once per tick after pre_loop with every elevator
+        needs_destination is True for, so they can be decided together (e.g. with one NumPy computation).
+        Elevators still ask get_new_destination on their own when they need a destination during the tick.
+
+        elevators: List[Elevator]
+            The elevators to get a new destination for
+
+        Returns: Dict[int, int]
+            Mapping of { elevator id: new destination }, elevators left out keep their destination
+        """
+        return {elevator.id: self.get_new_destination(elevator) for elevator in elevators}
+
+    def update_destinations(self):
+        """Gives every elevator that needs a destination the result of get_new_destinations"""
+        elevators = [
+            elevator
+            for elevator in self.elevators
+            if elevator.id not in self.pending_decisions and self.needs_destination(elevator)
+        ]
+        if not elevators:
+            return
+
+        destinations = self.get_new_destinations(elevators)
+        for elevator in elevators:
+            if elevator.id not in destinations:
+                continue
+
+            destination = self._accept_destination(elevator, destinations[elevator.id])
+            if destination != elevator._destination:
+                elevator.destination = destination
+
+    def request_destination(self, elevator):
+        """Gets a new destination for an elevator on behalf of the engine
+
+        When the algorithm declares destination_inputs, an elevator that was told to stay idle (None)
+        is not asked again until one of those inputs changes for it (see mark_dirty and invalidate_destinations).
+        Any other decision is acted on straight away, so it is never kept.
+
+        elevator: Elevator
+            The elevator to get a new destination for
+        """
+        decision = self.pending_decisions.get(elevator.id)
+        if decision is not None:
+            return decision.fallback
+        if elevator.id in self._idle_decisions:
+            return None
+
+        destination = self._accept_destination(elevator, self.get_new_destination(elevator))
+        if destination is None and self.destination_inputs and elevator.id not in self.pending_decisions:
+            self._idle_decisions.add(elevator.id)
+        return destination
+
+    def _accept_destination(self, elevator, destination):
+        """Keeps track of deferred decisions, returns the destination the elevator should follow for now"""
+        if isinstance(destination, DeferredDecision):
+            destination.requested_tick = self.tick_count
+            self.pending_decisions[elevator.id] = destination
+            return destination.fallback
+        return destination
+
+    def defer(self, fn, *args, fallback=None, deadline=None) -> DeferredDecision:
+        """Computes a destination in the background, for get_new_destination to return
+
+        fn is called with args in a thread pool, so it should only use what it is given and not the live
+        simulation state (take a snapshot first). The elevator follows fallback until the result is applied
+        at the start of a later tick (see apply_decisions).
+
+        fn: Callable[..., Optional[int]]
+            Function returning the destination floor, or None to stay idle
+        fallback: Optional[int]
+            Destination to follow until the result lands
+            Default: None (stay idle)
+        deadline: Optional[float]
+            Seconds the result may take before the fallback is kept for good
+            Default: decision_deadline
+        """
+        if self._decision_executor is None:
+            self._decision_executor = ThreadPoolExecutor(self.decision_workers)
+        future = self._decision_executor.submit(fn, *args)
+        return DeferredDecision(future, fallback, self.decision_deadline if deadline is None else deadline)
+
+    def apply_decisions(self):
+        """Applies the results of deferred decisions, in elevator id order
+
+        Runs at the start of every tick. When the manager runs synchronously, every result is waited for
+        (up to its deadline) and applied at the start of the tick after it was requested, so a seed always
+        gives the same simulation. Otherwise (e.g. the asyncio web backend), the tick never waits and
+        results are applied at the first tick boundary after they land.
+
+        Raises the exception of a decision that failed
+        """
+        block = getattr(self.manager, 'sync', True)
+        for elevator_id in sorted(self.pending_decisions):
+            decision = self.pending_decisions[elevator_id]
+            if not decision.future.done():
+                if block:
+                    wait([decision.future], timeout=decision.remaining)
+                if not decision.future.done():
+                    if not decision.expired:
+                        continue
+
+                    # missed the deadline, keep following the fallback
+                    decision.future.cancel()
+                    del self.pending_decisions[elevator_id]
+                    self.manager.WriteToLog(
+                        logging.WARNING,
+                        f'Decision for elevator {elevator_id} missed its deadline of {decision.deadline}s',
+                    )
+                    continue
+
+            del self.pending_decisions[elevator_id]
+            destination = decision.future.result()
+            for elevator in self.elevators:
+                if elevator.id == elevator_id:
+                    self._idle_decisions.discard(elevator_id)
+                    self.apply_decision(elevator, destination)
+                    break
+
+    def apply_decision(self, elevator, destination):
+        """Applies the result of a deferred decision
+
+        elevator: Elevator
+            The elevator the decision was for
+        destination: Optional[int]
+            The result of the decision
+        """
+        if destination != elevator._destination:
+            elevator.destination = destination
+
+    def drop_decision(self, elevator_id):
+        """Cancels the deferred decision of an elevator, if it has one, leaving it on its fallback"""
+        decision = self.pending_decisions.pop(elevator_id, None)
+        if decision is not None:
+            decision.future.cancel()
+
+    def cancel_decisions(self):
+        """Cancels every deferred decision and stops the threads computing them"""
+        for elevator_id in list(self.pending_decisions):
+            self.drop_decision(elevator_id)
+        if self._decision_executor is not None:
+            self._decision_executor.shutdown(wait=False, cancel_futures=True)
+            self._decision_executor = None
+
+    def mark_dirty(self, destination_input, elevator_id=None):
+        """Marks an input of get_new_destination as changed
+
+        destination_input: str
+            'floor', 'loads' or 'calls'
+        elevator_id: Optional[int]
+            The elevator it changed for, None for every elevator
+        """
+        if self._idle_decisions and destination_input in self.destination_inputs:
+            self.invalidate_destinations(elevator_id)
+        if destination_input == 'loads' and elevator_id in self.pending_decisions:
+            # decided for loads that have changed since
+            self.drop_decision(elevator_id)
+
+    def invalidate_destinations(self, elevator_id=None):
+        """Asks idle elevators for a new destination again, for state that is not a destination input
+
+        elevator_id: Optional[int]
+            The elevator to ask again, None for every elevator
+        """
+        if elevator_id is None:
+            self._idle_decisions.clear()
+        else:
+            self._idle_decisions.discard(elevator_id)
+
+    def park_idle_elevators(self):
+        """Sends idle elevators to spread out over the forecast demand (see ArrivalForecast)
+
+        Only runs when parking is enabled and no loads are waiting.
+        Once loads are waiting, parked elevators are handed back to get_new_destination.
+        """
+        if len(self.pending_index) > 0:
+            if self.parked:
+                for elevator in self.elevators:
+                    floor = self.parked.pop(elevator.id, None)
+                    if floor is not None and elevator._destination == floor and not elevator.loads:
+                        elevator.destination = self.request_destination(elevator)
+                self._parked_for = None
+            return
+
+        idle = [
+            elevator
+            for elevator in self.elevators
+            if elevator.enabled
+            and not elevator.loads
+            and (elevator._destination is None or elevator.id in self.parked)
+            # loads that were claimed but have not boarded yet
+            and not any(action.action_type == ActionType.LOAD_LOAD for action in elevator.action_manager.actions)
+        ]
+        parked_for = (tuple(elevator.id for elevator in idle), self.forecast.version)
+        if not idle or parked_for == self._parked_for:
+            for elevator in idle:
+                floor = self.parked.get(elevator.id)
+                if floor is not None and elevator._destination is None and elevator.current_floor != floor:
+                    # the algorithm cleared the destination on the way
+                    elevator.destination = floor
+            return
+
+        self._parked_for = parked_for
+        floors = self.forecast.spread(len(idle), self.floors, self.tick_count)
+        if not floors:
+            return
+
+        # lowest elevator to the lowest floor keeps the total distance down
+        idle.sort(key=lambda x: x.current_floor)
+        for elevator, floor in zip(idle, floors):
+            self.parked[elevator.id] = floor
+            # elevators already there stay idle, rather than being handed a destination they have reached
+            if elevator._destination != floor and elevator.current_floor != floor:
+                elevator.destination = floor
+
     def pre_load_check(self, load, elevator):
         """Checks if a load is allowed to enter the elevator
 
@@ -180,6 +584,13 @@ class ElevatorAlgorithm:
         """Runs when the simulation ends"""
         pass
 
+    def on_reset(self):
+        """Runs when the algorithm is created, and when it is reset in place (see reset_in_place)
+
+        State the algorithm keeps of its own should be set up here rather than in __init__
+        """
+        pass
+
     # endregion
 
     def add_load(self, load):
@@ -188,6 +599,15 @@ class ElevatorAlgorithm:
         load: Load
             The load to add"""
         self.loads.append(load)
+        if load.elevator is None:
+            self.pending_index.add(load)
+            self.hall_calls.add(load)
+            self.mark_dirty('calls')
+        self.update_fingerprint(added=load.state_key())
+        if self.changes is not None:
+            self.changes.record_load(load, load.initial_floor if load.elevator is None else None)
+        if load.elevator is None:
+            self.forecast.record(load.initial_floor, load.direction, self.tick_count)
         self.on_load_added(load)
 
     def remove_load(self, load):
@@ -196,9 +616,30 @@ class ElevatorAlgorithm:
         load: Load
             The load to remove
         """
+        if self.changes is not None:
+            self.changes.record_load(load, load.initial_floor if load in self.pending_index else None)
         self.loads.remove(load)
+        self.pending_index.remove(load)
+        self.hall_calls.remove(load)
+        self.mark_dirty('calls')
+        archive = getattr(self.manager, 'archive', None)
+        if archive is not None and getattr(load, 'enter_lift_tick', None) is not None:
+            archive.record(load, self.tick_count)
         self.on_load_removed(load)
 
+    def claim_load(self, load):
+        """Marks a waiting load as taken by an elevator that is about to board it
+
+        load: Load
+            The load to claim
+        """
+        load.elevator = True
+        self.pending_index.remove(load)
+        self.hall_calls.remove(load)
+        self.mark_dirty('calls')
+        if self.changes is not None:
+            self.changes.record_load(load, load.initial_floor)
+
     def create_elevator(self, current_floor=1):
         """Creates a new elevator
 
@@ -209,8 +650,18 @@ class ElevatorAlgorithm:
         new_id = 1
         if self.elevators:
             new_id = self.elevators[-1].id + 1
-        elevator = Elevator(self.manager, new_id, current_floor)
+        if self._spare_elevators:
+            elevator = self._spare_elevators.pop()
+            elevator.reset(self.manager, new_id, current_floor)
+        else:
+            elevator = Elevator(self.manager, new_id, current_floor)
+        elevator._owner = self
+        self.update_fingerprint(added=elevator.state_key)
         self.elevators.append(elevator)
+        self.invalidate_destinations()
+        if self.changes is not None:
+            self.changes.record_elevator(elevator.id)
+            self.changes.record_structure()
         self.on_elevator_added(elevator)
         return elevator
 
@@ -223,6 +674,13 @@ class ElevatorAlgorithm:
         for elevator in self.elevators:
             if elevator.id == elevator_id:
                 self.elevators.remove(elevator)
+                self.update_fingerprint(removed=elevator.state_key)
+                elevator._owner = None
+                self.invalidate_destinations()
+                if self.changes is not None:
+                    self.changes.record_elevator(elevator_id)
+                    self.changes.record_structure()
+                self.drop_decision(elevator_id)
                 self.on_elevator_removed(elevator_id)
                 return
         raise BadArgumentError(f'No elevator with id {elevator_id}')
@@ -247,22 +705,182 @@ class ElevatorAlgorithm:
         self.add_load(load)
         return load
 
+    def record_occupancy(self):
+        """Records the occupancy of every elevator for the current tick"""
+        occupancy = self.occupancy
+        max_load = self.max_load
+        for elevator in self.elevators:
+            occupancy.add(elevator._load, max_load)
+
+    def record_changes(self):
+        """Starts recording the elevators, floors and loads that change into changes (see ChangeJournal)
+
+        Consumers read the journal (which clears it) to only update what moved since they last looked.
+        """
+        self.changes = ChangeJournal()
+
+    def record_hash_trace(self):
+        """Starts recording the fingerprint at the end of every tick into hash_trace"""
+        self.hash_trace = array('Q')
+
+    def enable_invariant_checks(self):
+        """Runs check_invariants after every tick
+
+        The checked loop is only installed on this instance, an algorithm without checks
+        runs the plain loop with no overhead.
+        """
+        self.loop = self._checked_loop
+
+    def _checked_loop(self):
+        type(self).loop(self)
+        self.check_invariants()
+
+    def check_invariants(self):
+        """Checks that the state of the simulation is consistent
+
+        Subclasses can extend this to check their own bookkeeping
+
+        Raises InvariantError if any invariant does not hold
+        """
+        def fail(message):
+            raise InvariantError(f'Tick {self.tick_count}: {message}')
+
+        load_ids = {load.id for load in self.loads}
+        queued = {}
+        boarded = {}
+        for elevator in self.elevators:
+            if not 1 <= elevator.current_floor <= self.floors:
+                fail(f'elevator {elevator.id} is on floor {elevator.current_floor} of {self.floors}')
+            if elevator._destination is not None and not 1 <= elevator._destination <= self.floors:
+                fail(f'elevator {elevator.id} has destination {elevator._destination} of {self.floors}')
+
+            weight = 0
+            for load in elevator.loads:
+                weight += load.weight
+                if load.elevator is not elevator:
+                    fail(f'load {load.id} is in elevator {elevator.id} but assigned to {load.elevator!r}')
+                if load.id in boarded:
+                    fail(f'load {load.id} is in elevators {boarded[load.id]} and {elevator.id}')
+                if load.id not in load_ids:
+                    fail(f'load {load.id} is in elevator {elevator.id} but not in the system')
+                boarded[load.id] = elevator.id
+            actions = elevator.action_manager.actions
+            stop_counts = {}
+            stop_weights = {}
+            boarding = [action.argument for action in actions if action.action_type == ActionType.LOAD_LOAD]
+            for load in elevator.loads + boarding:
+                stop_counts[load.destination_floor] = stop_counts.get(load.destination_floor, 0) + 1
+                stop_weights[load.destination_floor] = stop_weights.get(load.destination_floor, 0) + load.weight
+            if (
+                stop_counts != elevator.stop_counts
+                or stop_weights != elevator.stop_weights
+                or sorted(stop_counts) != elevator._stop_floors
+            ):
+                fail(f'elevator {elevator.id} stop counts are out of sync with its loads')
+            busy_ticks = sum(1 for action in actions if action.action_type == ActionType.ADD_TICK)
+            if busy_ticks != elevator.action_manager.busy_ticks:
+                fail(f'elevator {elevator.id} busy ticks are out of sync with its actions')
+            if weight != elevator.load:
+                fail(f'elevator {elevator.id} weighs {elevator.load} but its loads weigh {weight}')
+            if weight > self.max_load:
+                fail(f'elevator {elevator.id} weighs {weight} over the max load of {self.max_load}')
+
+            for action in elevator.action_manager.actions:
+                if action.action_type == ActionType.LOAD_LOAD:
+                    queued[action.argument.id] = queued.get(action.argument.id, 0) + 1
+
+        for load in self.loads:
+            if not 1 <= load.initial_floor <= self.floors or not 1 <= load.destination_floor <= self.floors:
+                fail(f'load {load.id} goes from {load.initial_floor} to {load.destination_floor} of {self.floors}')
+            if load.elevator is True:
+                if queued.get(load.id, 0) != 1:
+                    fail(f'load {load.id} is claimed but queued {queued.get(load.id, 0)} times')
+            elif load.id in queued:
+                fail(f'load {load.id} is queued to board but not claimed')
+            elif isinstance(load.elevator, Elevator) and load.id not in boarded:
+                fail(f'load {load.id} is assigned to elevator {load.elevator.id} but not in it')
+
+        if self.fingerprint != self._compute_fingerprint():
+            fail('state fingerprint is out of sync')
+
+        pending = [load.id for load in self.loads if load.elevator is None]
+        if pending != [load.id for load in self.pending_index]:
+            fail('pending loads are out of sync with the pending index')
+        if self.pending_index.floors != sorted(set(load.initial_floor for load in self.pending_index)):
+            fail('pending index floors are out of sync with its loads')
+        for call in self.hall_calls:
+            if call.count != len(call.loads) or call.weight != sum(load.weight for load in call.loads.values()):
+                fail(f'hall call {call.key} count or weight is out of sync with its loads')
+        if sum(call.count for call in self.hall_calls) != len(self.pending_index):
+            fail('hall calls are out of sync with the pending index')
+
     def loop(self):
         """Runs a cycle of the elevator algorithm"""
+        if self.pending_decisions:
+            self.apply_decisions()
         # Boarding
         self.pre_loop()
+        if self.batch_destinations:
+            self.update_destinations()
+        if self.parking:
+            self.park_idle_elevators()
         for elevator in self.elevators:
             elevator.loop()
 
         self.tick_count += 1
+        if self.hash_trace is not None:
+            self.hash_trace.append(self.fingerprint)
         self.post_loop()
 
+        archive = getattr(self.manager, 'archive', None)
+        if archive is not None:
+            archive.compact(self)
+
     def __getstate__(self):
         state = self.__dict__.copy()
         if 'manager' in state:
             del state['manager']
+        # futures and threads cannot be pickled
+        state['pending_decisions'] = {}
+        state['_decision_executor'] = None
+        state['_spare_elevators'] = []
+
+        # loads are packed into columns (see Load.pack) and the indexes of waiting loads are rebuilt from them
+        state['loads'] = Load.pack(self.loads)
+        del state['pending_index']
+        state['hall_calls'] = self.hall_calls.version
         return state
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        elevators = {elevator.id: elevator for elevator in self.elevators}
+        self.loads = Load.unpack(state['loads'], elevators)
+
+        # elevators and their actions were pickled with their own copies of the loads they carry
+        loads = {load.id: load for load in self.loads}
+        for elevator in self.elevators:
+            elevator._owner = self
+            elevator.loads = [loads.get(load.id, load) for load in elevator.loads]
+            for load in elevator.loads:
+                load.elevator = elevator
+            actions = elevator.action_manager.actions
+            for i, action in enumerate(actions):
+                if isinstance(action.argument, Load):
+                    actions[i] = Action(action.action_type, loads.get(action.argument.id, action.argument))
+        # loads kept by subclasses, e.g. in a dict of elevator id -> load
+        for name, value in list(self.__dict__.items()):
+            if isinstance(value, Load):
+                setattr(self, name, loads.get(value.id, value))
+            elif isinstance(value, dict):
+                for key, item in value.items():
+                    if isinstance(item, Load):
+                        value[key] = loads.get(item.id, item)
+
+        self.pending_index = FloorIndex(load for load in self.loads if load.elevator is None)
+        self.hall_calls = HallCallIndex(self.pending_index)
+        # anything cached for the old index is out of date
+        self.hall_calls.version = state['hall_calls'] + 1
+
 
 def load_algorithms() -> dict[str, ElevatorAlgorithm]:
     """Loads all algorithms from the algorithms folder
@@ -0,0 +1,77 @@
+import os
+from typing import TextIO
+
+
+class LoadArchive:
+    """Keeps the memory of an open-ended simulation flat
+
+    Served loads are only counted (and written to spill_path, if given) once they leave the system,
+    and the wait time and time in lift samples are folded into histograms (see GeneratedStats.compact)
+    whenever more than sample_limit of them have piled up.
+
+    sample_limit: int
+        Samples a statistic keeps before they are folded
+        Default: 4096
+    spill_path: Optional[str]
+        CSV file every served load is appended to, None to only keep the summaries
+        Default: None
+    """
+
+    HEADER = 'id,initial_floor,destination_floor,weight,tick_created,enter_lift_tick,tick_served\n'
+
+    def __init__(self, sample_limit=4096, spill_path=None) -> None:
+        self.sample_limit = sample_limit
+        self.spill_path = spill_path
+        self.served = 0
+        self._file: TextIO = None
+
+    def record(self, load, tick):
+        """Records a load that has been served
+
+        load: Load
+            The load that left the system
+        tick: int
+            The current tick
+        """
+        self.served += 1
+        if self.spill_path is None:
+            return
+
+        if self._file is None:
+            new = not os.path.exists(self.spill_path) or os.path.getsize(self.spill_path) == 0
+            self._file = open(self.spill_path, 'a', encoding='utf-8')
+            if new:
+                self._file.write(self.HEADER)
+        self._file.write(
+            f'{load.id},{load.initial_floor},{load.destination_floor},{load.weight},'
+            f'{load.tick_created},{getattr(load, "enter_lift_tick", "")},{tick}\n'
+        )
+
+    def compact(self, algorithm):
+        """Folds the statistics of an algorithm if they have grown past sample_limit
+
+        algorithm: ElevatorAlgorithm
+            The algorithm to compact
+        """
+        folded = False
+        for stats in (algorithm.wait_times, algorithm.time_in_lift):
+            if len(stats.values) >= self.sample_limit:
+                stats.compact()
+                folded = True
+
+        if folded and self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        """Closes the spill file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_file'] = None
+        return state
+
+    def __repr__(self) -> str:
+        return f'<LoadArchive served={self.served} spill_path={self.spill_path!r}>'
@@ -0,0 +1,241 @@
+from __future__ import annotations
+import logging
+import random
+import time
+from typing import Callable, Dict, List, Optional, Type
+
+import wx
+
+from utils import Infinity, _InfinitySentinel
+from models import GeneratedStats, OccupancyStats, SimulationStats
+from models.manager import ElevatorManager
+
+
+class Building(ElevatorManager):
+    """A building of a Campus, ticked by the campus rather than a loop of its own
+
+    campus: Campus
+        The campus the building is in
+    algorithm: Type[ElevatorAlgorithm]
+        The algorithm running the elevators of the building
+    name: str
+        The name of the building, prefixed to its log messages
+    """
+
+    def __init__(self, campus: 'Campus', algorithm: Type['ElevatorAlgorithm'], name: str):
+        self.campus = campus
+        self.name = name
+        super().__init__(campus, None, algorithm, gui=False, log_func=self._log)
+
+    @property
+    def running(self):
+        return self.campus.running
+
+    def _log(self, level, message):
+        self.campus.WriteToLog(level, f'[{self.name}] {message}')
+
+    def __repr__(self) -> str:
+        return f'<Building {self.name!r} algorithm={self.algorithm.name!r} active={self.algorithm.active}>'
+
+
+class Campus:
+    """Runs many buildings in one process, on one shared tick scheduler
+
+    Every building keeps its own algorithm, but instead of a thread or task (and a sleep) per building, the
+    campus ticks every active building in turn, then sends one event for all of them. Buildings that are not
+    active (paused, or finished) are skipped. With many tiny buildings, the cost of a tick is then the cost of
+    the algorithms themselves rather than of the loop around them.
+
+    parent: Optional[wx.Window]
+        The window events are sent to
+        Default: None
+    event: Optional[Callable]
+        The event sent after every tick, with campus and changes (building name -> ChangeJournal)
+        Default: None
+    gui: bool
+        Whether to send events
+        Default: False
+    log_func: Optional[Callable[[int, str], None]]
+        Function log messages are sent to, logging.log if None
+        Default: None
+    seed: Optional[int]
+        Seed of the random number generators of the buildings (building n is seeded with seed + n), None to
+        leave them unseeded
+        Default: None
+    """
+
+    def __init__(
+        self,
+        parent=None,
+        event: Callable = None,
+        *,
+        gui: bool = False,
+        log_func: Callable[[int, str], None] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.parent = parent
+        self.event = event
+        self.gui = gui
+        self.seed = seed
+        self.speed = Infinity
+        self.buildings: List[Building] = []
+        self.tick_count = 0
+        self.is_open = True
+        self._running = False
+
+        if log_func is None:
+            self.WriteToLog = logging.log
+        else:
+            self.WriteToLog = log_func
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def simulation_running(self) -> bool:
+        """Returns True if any building is active"""
+        return any(building.algorithm.active for building in self.buildings)
+
+    def add_building(
+        self,
+        algorithm: Type['ElevatorAlgorithm'],
+        floors: int,
+        elevators: List[int] = None,
+        *,
+        max_load: Optional[int] = None,
+        name: Optional[str] = None,
+    ) -> Building:
+        """Adds a building to the campus
+
+        algorithm: Type[ElevatorAlgorithm]
+            The algorithm running the elevators of the building
+        floors: int
+            The number of floors
+        elevators: Optional[List[int]]
+            The floors the elevators start at, one elevator on the first floor if None
+            Default: None
+        max_load: Optional[int]
+            The maximum load of the elevators (in kg), the algorithm's default if None
+            Default: None
+        name: Optional[str]
+            The name of the building, numbered if None
+            Default: None
+        """
+        building = Building(self, algorithm, name or f'Building {len(self.buildings) + 1}')
+        if self.seed is not None:
+            building.algorithm.rnd = random.Random((self.seed + len(self.buildings)) % 2**32)
+        building.set_floors(floors)
+        if max_load is not None:
+            building.set_max_load(max_load)
+        for floor in elevators or [1]:
+            building.add_elevator(floor)
+
+        self.buildings.append(building)
+        return building
+
+    def remove_building(self, building: Building):
+        """Removes a building from the campus"""
+        self.buildings.remove(building)
+        building.close()
+
+    def set_speed(self, speed):
+        """Sets the number of ticks run every second, Infinity to not wait between ticks"""
+        self.speed = speed
+
+    def set_active(self, active: bool):
+        """Plays or pauses every building"""
+        for building in self.buildings:
+            building.set_active(active)
+
+    def play(self):
+        self.set_active(True)
+
+    def pause(self):
+        self.set_active(False)
+
+    def _on_loop(self):
+        pass
+
+    def tick(self) -> int:
+        """Runs a tick of every active building
+
+        Returns: int
+            The number of buildings that were ticked
+        """
+        active = [building for building in self.buildings if building.algorithm.active]
+        for building in active:
+            building.step()
+
+        self.tick_count += 1
+        self._on_loop()
+        self.send_event()
+        return len(active)
+
+    def loop(self, max_ticks: Optional[int] = None) -> int:
+        """Ticks the buildings until none of them are active
+
+        max_ticks: Optional[int]
+            The number of ticks to stop after, None to run until every building has finished
+            Default: None
+
+        Returns: int
+            The number of ticks run
+        """
+        self._running = True
+        ticks = 0
+        while self.running and self.is_open and (max_ticks is None or ticks < max_ticks):
+            if self.tick() == 0:
+                break
+            ticks += 1
+
+            if not isinstance(self.speed, _InfinitySentinel):
+                time.sleep(1 / self.speed)
+
+        self._running = False
+        return ticks
+
+    def send_event(self):
+        """Sends one event with the changes of every building since the last one"""
+        if self.gui is True:
+            changes = {}
+            for building in self.buildings:
+                journal = building.algorithm.changes
+                if journal is None:
+                    # first event of this algorithm, everything is new
+                    building.algorithm.record_changes()
+                    changes[building.name] = None
+                elif journal:
+                    changes[building.name] = journal.read()
+            wx.PostEvent(self.parent, self.event(campus=self, changes=changes))
+
+    def stats(self) -> Dict[str, SimulationStats]:
+        """Returns the statistics of every building, by name"""
+        return {building.name: building.algorithm.stats for building in self.buildings}
+
+    def combined_stats(self) -> SimulationStats:
+        """Returns the statistics of every load and elevator on the campus, as if it were one building"""
+        wait_time = GeneratedStats()
+        time_in_lift = GeneratedStats()
+        occupancy = OccupancyStats()
+        for building in self.buildings:
+            wait_time.merge(building.algorithm.wait_times)
+            time_in_lift.merge(building.algorithm.time_in_lift)
+            occupancy.merge(building.algorithm.occupancy)
+
+        names = sorted({building.algorithm.name for building in self.buildings})
+        return SimulationStats(
+            ticks=max((building.algorithm.tick_count for building in self.buildings), default=0),
+            algorithm_name=', '.join(names),
+            wait_time=wait_time,
+            time_in_lift=time_in_lift,
+            occupancy=occupancy,
+        )
+
+    def close(self):
+        self.is_open = False
+        for building in self.buildings:
+            building.close()
+
+    def __repr__(self) -> str:
+        return f'<Campus buildings={len(self.buildings)} tick={self.tick_count}>'
@@ -0,0 +1,43 @@
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class DeferredDecision:
+    """A destination that is still being computed, which get_new_destination can return instead of a floor
+
+    The elevator follows fallback until the result is applied at a tick boundary (see ElevatorAlgorithm.defer).
+
+    Attributes:
+        future: Future
+            Future of the destination floor (or None to stay idle)
+        fallback: Optional[int]
+            Destination to follow until the result lands
+            Default: None
+        deadline: Optional[float]
+            Seconds the result may take before the fallback is kept for good, None to always wait for it
+            Default: None
+        requested_tick: int
+            Tick the decision was requested on
+        requested_at: float
+            time.perf_counter() when the decision was requested
+    """
+
+    future: Future
+    fallback: Optional[int] = None
+    deadline: Optional[float] = None
+    requested_tick: int = field(init=False, default=0)
+    requested_at: float = field(init=False, default_factory=time.perf_counter)
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, None if there is no deadline"""
+        if self.deadline is None:
+            return None
+        return max(self.requested_at + self.deadline - time.perf_counter(), 0)
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and self.remaining == 0
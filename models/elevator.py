@@ -1,21 +1,51 @@
+import bisect
 import logging
-from typing import List
+from typing import Dict, List, Tuple
 
-from utils import ActionType, Constants, Direction, FullElevatorError
+from utils import ActionType, Direction, FullElevatorError
 from models import ActionQueue, Action
+from models.action import MOVE_ACTION, SHARED_ACTIONS
 
 
 class Elevator:
     def __init__(self, manager, elevator_id, current_floor=1) -> None:
+        self.loads: List['Load'] = []
+        # destination floor -> number and weight of loads carried or about to board going there
+        self.stop_counts: Dict[int, int] = {}
+        self.stop_weights: Dict[int, int] = {}
+        # the same floors, in order
+        self._stop_floors: List[int] = []
+        self.action_manager = ActionQueue()
+        self.reset(manager, elevator_id, current_floor)
+
+    def reset(self, manager, elevator_id, current_floor=1):
+        """Resets the elevator to the state of a new one, keeping its list of loads and action queue
+
+        manager: ElevatorManager
+            The manager of the elevator
+        elevator_id: int
+            The new id of the elevator
+        current_floor: int[Optional]
+            The current floor of the elevator
+            Default: 1
+        """
         self.id = elevator_id
         self.manager: 'ElevatorManager' = manager
         self._current_floor = current_floor
-        self.loads: List['Load'] = []
+        self.loads.clear()
+        self.stop_counts.clear()
+        self.stop_weights.clear()
+        self._stop_floors.clear()
+        self._load = 0
         self.enabled: bool = True
-        self.action_manager = ActionQueue()
+        self.action_manager.clear()
+        # timings of this elevator, None to use the timings of the building (see ElevatorAlgorithm.travel_times)
+        self.travel_times: 'TravelTimes' = None
+        # algorithm whose state fingerprint includes this elevator
+        self._owner: 'ElevatorAlgorithm' = None
 
         self._destination: int = None
-        self.destination = self.manager.algorithm.get_new_destination(self)
+        self.destination = self.manager.algorithm.request_destination(self)
 
     def copy(self):
         """Creates a copy of the elevator"""
@@ -23,20 +53,70 @@ class Elevator:
         ev._destination = self._destination
         ev.enabled = self.enabled
         ev.loads = [load.copy() for load in self.loads]
+        ev.stop_counts = dict(self.stop_counts)
+        ev.stop_weights = dict(self.stop_weights)
+        ev._stop_floors = list(self._stop_floors)
+        ev._load = self._load
         ev.action_manager = self.action_manager.copy()
+        ev.travel_times = self.travel_times
         return ev
 
     @property
     def destination(self):
         if self._destination is None:
-            self.destination = self.manager.algorithm.get_new_destination(self)
+            self.destination = self.manager.algorithm.request_destination(self)
 
         return self._destination
 
     @destination.setter
     def destination(self, value):
+        if value == self._destination:
+            # idle elevators are given the same destination on every move
+            return
         self.manager.on_elevator_destination_change(self, value)
+        old_key = self.state_key
         self._destination = value
+        if self._owner is not None:
+            self._owner.update_fingerprint(old_key, self.state_key)
+            if self._owner.changes is not None:
+                self._owner.changes.record_elevator(self.id)
+
+    @property
+    def state_key(self):
+        """Key of the elevator for the state fingerprint"""
+        return (1, self.id, self._current_floor, self._destination or 0)
+
+    def stops_between(self, lowest, highest) -> Tuple[int, int]:
+        """Returns the stops the elevator has to make strictly between two floors for its loads
+
+        Loads that are about to board are counted as well
+
+        Returns: Tuple[int, int]
+            The number of stops and the number of loads alighting at them
+        """
+        floors = self._stop_floors
+        start = bisect.bisect_right(floors, lowest)
+        end = bisect.bisect_left(floors, highest, start)
+        return end - start, sum(self.stop_counts[floor] for floor in floors[start:end])
+
+    def _add_stop(self, load):
+        floor = load.destination_floor
+        count = self.stop_counts.get(floor, 0)
+        if count == 0:
+            bisect.insort(self._stop_floors, floor)
+            self.stop_weights[floor] = 0
+        self.stop_counts[floor] = count + 1
+        self.stop_weights[floor] += load.weight
+
+    def _remove_stop(self, load):
+        floor = load.destination_floor
+        count = self.stop_counts.pop(floor) - 1
+        if count == 0:
+            del self._stop_floors[bisect.bisect_left(self._stop_floors, floor)]
+            del self.stop_weights[floor]
+        else:
+            self.stop_counts[floor] = count
+            self.stop_weights[floor] -= load.weight
 
     @property
     def direction(self):
@@ -48,9 +128,17 @@ class Elevator:
         if dest < self.current_floor:
             return Direction.DOWN
 
+    @property
+    def timings(self) -> 'TravelTimes':
+        """The timings the elevator runs on"""
+        if self.travel_times is not None:
+            return self.travel_times
+        return self.manager.algorithm.travel_times
+
     @property
     def load(self):
-        return sum(x.weight for x in self.loads)
+        """The total weight in the elevator, kept in step with loads as they board and alight"""
+        return self._load
 
     @property
     def current_floor(self):
@@ -70,15 +158,22 @@ class Elevator:
             logging.DEBUG,
             f'Elevator {self.id} moving {increment} floors from {self.current_floor} to {self.current_floor + increment}',
         )
+        old_key = self.state_key
         self._current_floor += increment
+        if self._owner is not None:
+            self._owner.update_fingerprint(old_key, self.state_key)
+            self._owner.mark_dirty('floor', self.id)
+            if self._owner.changes is not None:
+                self._owner.changes.record_elevator(self.id)
 
     def loop(self):
         if not self.enabled:
             return
 
+        get_action = self.action_manager.get
         while True:
             # keep running until we reach an add tick
-            action = self.action_manager.get()
+            action = get_action()
             match action.action_type:
                 case ActionType.ADD_TICK:
                     return
@@ -97,9 +192,10 @@ class Elevator:
 
     def move_elevator(self):
         increment = 0
-        if self.direction == Direction.UP:
+        direction = self.direction
+        if direction == Direction.UP:
             increment = 1
-        elif self.direction == Direction.DOWN:
+        elif direction == Direction.DOWN:
             increment = -1
 
         if increment != 0:
@@ -111,63 +207,61 @@ class Elevator:
                 self.manager.on_load_move(load)
 
         if self._destination == self.current_floor or self._destination is None:
-            self.destination = self.manager.algorithm.get_new_destination(self)
+            self.destination = self.manager.algorithm.request_destination(self)
 
         self.manager.on_elevator_move(self)
 
     def cycle(self):
         """Runs a cycle of the elevator"""
+        algorithm = self.manager.algorithm
+        timings = self.timings
         load_change_count = 0
 
         # remove loads
         for load in self.loads:
             # unloading off elevator
-            if load.destination_floor != self.current_floor or not self.manager.algorithm.pre_unload_check(
-                load, self
-            ):
+            if load.destination_floor != self._current_floor or not algorithm.pre_unload_check(load, self):
                 continue
 
             if load_change_count == 0:
-                self.action_manager.open_door()
+                self.action_manager.open_door(timings.door_open_ticks)
 
             self.action_manager.add(Action(ActionType.UNLOAD_LOAD, load))
             load_change_count += 1
-            if load_change_count % Constants.MAX_NUM_LOADS_REMOVED_PER_TICK == 0:
+            if load_change_count % timings.loads_per_tick == 0:
                 self.action_manager.tick()
 
         # add loads
         added_loads = 0
-        if self.load <= self.manager.algorithm.max_load:
-            for load in self.manager.algorithm.loads:
+        if self._load <= algorithm.max_load:
+            for load in algorithm.pending_index.at(self._current_floor):
                 # add to elevator
-                if (
-                    load.elevator is not None
-                    or load.initial_floor != self.current_floor
-                    or self.load + added_loads + load.weight > self.manager.algorithm.max_load
-                    or not self.manager.algorithm.pre_load_check(load, self)
+                if self._load + added_loads + load.weight > algorithm.max_load or not algorithm.pre_load_check(
+                    load, self
                 ):
                     continue
 
                 if load_change_count == 0:
-                    self.action_manager.open_door()
+                    self.action_manager.open_door(timings.door_open_ticks)
 
-                load.elevator = True  # mark elevator as taken
+                algorithm.claim_load(load)  # mark elevator as taken
 
                 self.action_manager.add(Action(ActionType.LOAD_LOAD, load))
+                self._add_stop(load)
                 added_loads += load.weight
                 load_change_count += 1
-                if load_change_count % Constants.MAX_NUM_LOADS_REMOVED_PER_TICK == 0:
+                if load_change_count % timings.loads_per_tick == 0:
                     self.action_manager.tick()
 
-        if load_change_count % 3 != 0:
+        if load_change_count % timings.loads_per_tick != 0:
             self.action_manager.tick()
 
         if load_change_count > 0:
-            self.action_manager.close_door()
+            self.action_manager.close_door(timings.door_close_ticks)
 
         # move elevator
-        self.action_manager.tick(3)
-        self.action_manager.add(Action(ActionType.MOVE_ELEVATOR))
+        self.action_manager.move(timings.move_ticks)
+        self.action_manager.add(MOVE_ACTION)
 
     def load_load(self, load):
         """Adds new loads to the elevator.
@@ -189,6 +283,13 @@ class Elevator:
 
         load.elevator = self
         self.loads.append(load)
+        self._load += load.weight
+        self.manager.algorithm.progress_count += 1
+        self.manager.algorithm.mark_dirty('loads', self.id)
+        self.manager.algorithm.update_fingerprint(load.state_key(), load.state_key(self.id))
+        if self.manager.algorithm.changes is not None:
+            self.manager.algorithm.changes.record_load(load)
+            self.manager.algorithm.changes.record_elevator(self.id)
         self.manager.on_load_load(load, self)
         self.manager.algorithm.on_load_load(load, self)
 
@@ -203,6 +304,14 @@ class Elevator:
 
         load.elevator = None
         self.loads.remove(load)
+        self._remove_stop(load)
+        self._load -= load.weight
+        self.manager.algorithm.progress_count += 1
+        self.manager.algorithm.mark_dirty('loads', self.id)
+        self.manager.algorithm.update_fingerprint(removed=load.state_key(self.id))
+        if self.manager.algorithm.changes is not None:
+            self.manager.algorithm.changes.record_load(load)
+            self.manager.algorithm.changes.record_elevator(self.id)
         self.manager.on_load_unload(load, self)
         self.manager.algorithm.on_load_unload(load, self)
         self.manager.algorithm.remove_load(load)
@@ -222,4 +331,24 @@ class Elevator:
         state = self.__dict__.copy()
         if 'manager' in state:
             del state['manager']
+        # set again by the algorithm when it is unpickled
+        state['_owner'] = None
+        # the action types as bytes (the high bit set if the action has an argument), with the arguments alongside
+        actions = state.pop('action_manager').actions
+        state['action_manager'] = (
+            bytes(action.action_type | (0x80 if action.argument is not None else 0) for action in actions),
+            [action.argument for action in actions if action.argument is not None],
+        )
         return state
+
+    def __setstate__(self, state):
+        action_types, arguments = state.pop('action_manager')
+        self.__dict__.update(state)
+        self.action_manager = ActionQueue()
+        arguments = iter(arguments)
+        for code in action_types:
+            action_type = ActionType(code & 0x7F)
+            if code & 0x80:
+                self.action_manager.add(Action(action_type, next(arguments)))
+            else:
+                self.action_manager.add(SHARED_ACTIONS.get(action_type) or Action(action_type))
@@ -0,0 +1,114 @@
+from typing import List
+
+from utils import Direction
+
+
+class ArrivalForecast:
+    """An online estimate of where loads arrive, for each floor and direction
+
+    Every arrival adds 1 to the rate of its floor and direction, and rates halve every half_life ticks.
+    Rates are only decayed when they are read or updated, so recording an arrival is O(1).
+
+    floors: int
+        The number of floors
+    half_life: float
+        The number of ticks it takes for an arrival to count half as much
+    """
+
+    def __init__(self, floors, half_life) -> None:
+        self.half_life = half_life
+        # [up, down] -> rate and tick it was last decayed to, for each floor
+        self.rates: List[List[float]] = [[0.0] * (floors + 1), [0.0] * (floors + 1)]
+        self.ticks: List[List[int]] = [[0] * (floors + 1), [0] * (floors + 1)]
+        # number of arrivals recorded, to tell when the forecast has changed
+        self.version = 0
+
+    def copy(self):
+        """Creates a copy of the forecast"""
+        forecast = ArrivalForecast(0, self.half_life)
+        forecast.rates = [list(x) for x in self.rates]
+        forecast.ticks = [list(x) for x in self.ticks]
+        forecast.version = self.version
+        return forecast
+
+    @staticmethod
+    def _side(direction: Direction) -> int:
+        return 0 if direction == Direction.UP else 1
+
+    def _decayed(self, side, floor, tick) -> float:
+        return self.rates[side][floor] * 0.5 ** ((tick - self.ticks[side][floor]) / self.half_life)
+
+    def record(self, floor, direction: Direction, tick):
+        """Records an arrival
+
+        floor: int
+            The floor the load arrived at
+        direction: Direction
+            The direction the load wants to travel
+        tick: int
+            The current tick
+        """
+        side = self._side(direction)
+        if floor >= len(self.rates[side]):
+            for rates, ticks in zip(self.rates, self.ticks):
+                rates.extend([0.0] * (floor + 1 - len(rates)))
+                ticks.extend([tick] * (floor + 1 - len(ticks)))
+
+        self.rates[side][floor] = self._decayed(side, floor, tick) + 1
+        self.ticks[side][floor] = tick
+        self.version += 1
+
+    def rate(self, floor, direction: Direction, tick) -> float:
+        """Returns the decayed arrival rate of a floor and direction"""
+        side = self._side(direction)
+        if floor >= len(self.rates[side]):
+            return 0.0
+        return self._decayed(side, floor, tick)
+
+    def demand(self, floors, tick) -> List[float]:
+        """Returns the decayed arrival rate of each floor, in both directions
+
+        floors: int
+            The number of floors
+        tick: int
+            The current tick
+
+        Returns: List[float]
+            Rate of floor f at index f - 1
+        """
+        return [
+            self.rate(floor, Direction.UP, tick) + self.rate(floor, Direction.DOWN, tick)
+            for floor in range(1, floors + 1)
+        ]
+
+    def spread(self, count, floors, tick) -> List[int]:
+        """Returns floors that split the forecast demand evenly between a number of elevators
+
+        Demand is cut into count parts of equal weight, from the bottom floor up,
+        and each elevator is given the median floor of its part.
+
+        count: int
+            The number of elevators
+        floors: int
+            The number of floors
+        tick: int
+            The current tick
+
+        Returns: List[int]
+            count floors, lowest first, or an empty list when no load has arrived yet
+        """
+        demand = self.demand(floors, tick)
+        total = sum(demand)
+        if total <= 0 or count == 0:
+            return []
+
+        result = []
+        cumulative = 0.0
+        floor = 0
+        for part in range(count):
+            target = total * (part + 0.5) / count
+            while floor < floors - 1 and cumulative + demand[floor] < target:
+                cumulative += demand[floor]
+                floor += 1
+            result.append(floor + 1)
+        return result
@@ -0,0 +1,196 @@
+import bisect
+import itertools
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
+
+from utils import Direction
+from models.index import nearest_floor
+
+
+@dataclass(eq=False)
+class HallCall:
+    """The loads waiting on a floor to travel in one direction
+
+    Attributes:
+        floor: int
+            The floor the loads are waiting on
+        direction: Direction
+            The direction they want to travel in
+        count: int
+            The number of loads waiting
+        weight: int
+            The total weight of the loads waiting
+        loads: OrderedDict[int, Load]
+            The loads waiting, in the order they arrived
+    """
+
+    floor: int
+    direction: Direction
+    count: int = 0
+    weight: int = 0
+    loads: 'OrderedDict[int, Load]' = field(default_factory=OrderedDict, repr=False)
+
+    @property
+    def key(self) -> Tuple[int, Direction]:
+        return (self.floor, self.direction)
+
+    @property
+    def oldest(self) -> 'Load':
+        """The load that has been waiting the longest"""
+        return next(iter(self.loads.values()))
+
+    @property
+    def oldest_tick(self) -> int:
+        """The tick the load that has been waiting the longest was created on"""
+        return self.oldest.tick_created
+
+
+class HallCallIndex:
+    """An index of waiting loads aggregated into hall calls (a floor and a direction)
+
+    Every operation is done per hall call, so the cost of looking through the index grows with the number of
+    floors with waiting loads rather than the number of waiting loads. Floors with calls are kept sorted
+    for each direction, and ties are broken in favour of the call whose oldest load arrived first.
+
+    loads: Optional[List[Load]]
+        Loads to index, in order
+    """
+
+    def __init__(self, loads=None) -> None:
+        self.calls: Dict[Tuple[int, Direction], HallCall] = {}
+        self._floors: Dict[Direction, List[int]] = {Direction.UP: [], Direction.DOWN: []}
+        self._order: Dict[int, int] = {}
+        self._counter = itertools.count()
+        # incremented on every change, to tell when views of the index are out of date
+        self.version = 0
+
+        for load in loads or []:
+            self.add(load)
+
+    def clear(self):
+        """Removes every load, keeping the index"""
+        self.calls.clear()
+        for floors in self._floors.values():
+            floors.clear()
+        self._order.clear()
+        self._counter = itertools.count()
+        self.version += 1
+
+    def add(self, load):
+        """Adds a load to the index
+
+        load: Load
+            The load to add
+        """
+        if load.id in self._order:
+            return
+
+        key = (load.initial_floor, load.direction)
+        call = self.calls.get(key)
+        if call is None:
+            call = self.calls[key] = HallCall(*key)
+            bisect.insort(self._floors[load.direction], load.initial_floor)
+
+        call.loads[load.id] = load
+        call.count += 1
+        call.weight += load.weight
+        self._order[load.id] = next(self._counter)
+        self.version += 1
+
+    def remove(self, load):
+        """Removes a load from the index, if it is in it
+
+        load: Load
+            The load to remove
+        """
+        if self._order.pop(load.id, None) is None:
+            return
+
+        key = (load.initial_floor, load.direction)
+        call = self.calls[key]
+        del call.loads[load.id]
+        call.count -= 1
+        call.weight -= load.weight
+        if call.count == 0:
+            del self.calls[key]
+            floors = self._floors[load.direction]
+            del floors[bisect.bisect_left(floors, load.initial_floor)]
+        self.version += 1
+
+    def get(self, floor, direction: Direction) -> Optional[HallCall]:
+        """Returns the hall call of a floor and direction, if there are loads waiting"""
+        return self.calls.get((floor, direction))
+
+    def at(self, floor) -> List[HallCall]:
+        """Returns the hall calls on a floor, oldest first"""
+        calls = [
+            call for call in (self.get(floor, Direction.UP), self.get(floor, Direction.DOWN)) if call is not None
+        ]
+        return sorted(calls, key=self.order)
+
+    def floors(self, direction: Direction) -> List[int]:
+        """Returns the floors with loads waiting to travel in a direction, lowest first"""
+        return self._floors[direction]
+
+    def floors_between(self, direction: Direction, lowest, highest) -> List[int]:
+        """Returns the floors with loads waiting to travel in a direction from lowest to highest (inclusive)"""
+        floors = self._floors[direction]
+        return floors[bisect.bisect_left(floors, lowest):bisect.bisect_right(floors, highest)]
+
+    def order(self, call: HallCall) -> int:
+        """Returns the position the oldest load of a call was added to the index in"""
+        return self._order[next(iter(call.loads))]
+
+    def nearest(
+        self, floor, direction: Direction = None, lowest=None, highest=None, exclude_floors: Collection[int] = ()
+    ) -> Optional[HallCall]:
+        """Returns the hall call closest to a floor
+
+        If calls on two floors are equally close, or a floor has calls in both directions,
+        the call whose oldest load was added first is returned
+
+        floor: int
+            The floor to search from
+        direction: Optional[Direction]
+            Only return calls in this direction
+        lowest: Optional[int]
+            Lowest floor to search
+        highest: Optional[int]
+            Highest floor to search
+        exclude_floors: Collection[int]
+            Floors to skip
+        """
+        directions = (Direction.UP, Direction.DOWN) if direction is None else (direction,)
+        best = None
+        best_distance = None
+        for search in directions:
+            call = nearest_floor(
+                self._floors[search],
+                floor,
+                lambda x: self.calls[(x, search)],
+                self.order,
+                lowest,
+                highest,
+                exclude_floors,
+            )
+            if call is None:
+                continue
+
+            distance = abs(call.floor - floor)
+            if best is None or (distance, self.order(call)) < (best_distance, self.order(best)):
+                best = call
+                best_distance = distance
+        return best
+
+    def __contains__(self, load) -> bool:
+        return load.id in self._order
+
+    def __iter__(self) -> Iterator[HallCall]:
+        return iter(self.calls.values())
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def __repr__(self) -> str:
+        return f'<HallCallIndex calls={len(self.calls)} loads={len(self._order)}>'
@@ -0,0 +1,199 @@
+import bisect
+import itertools
+from typing import Callable, Collection, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+def nearest_floor(
+    floors: List[int],
+    floor,
+    candidate: Callable[[int], Optional[T]],
+    order: Callable[[T], int],
+    lowest=None,
+    highest=None,
+    exclude_floors: Collection[int] = (),
+) -> Optional[T]:
+    """Searches outwards from a floor for the closest floor with a candidate on it
+
+    floors: List[int]
+        The floors to search, sorted
+    floor: int
+        The floor to search from
+    candidate: Callable[[int], Optional[T]]
+        Returns what is on a floor, None to skip it
+    order: Callable[[T], int]
+        Breaks ties between candidates on equally close floors, lowest first
+    lowest: Optional[int]
+        Lowest floor to search
+    highest: Optional[int]
+        Highest floor to search
+    exclude_floors: Collection[int]
+        Floors to skip
+    """
+    lo_bound = 0 if lowest is None else bisect.bisect_left(floors, lowest)
+    hi_bound = len(floors) if highest is None else bisect.bisect_right(floors, highest)
+    hi = max(min(bisect.bisect_left(floors, floor), hi_bound), lo_bound)
+    lo = hi - 1
+
+    while lo >= lo_bound or hi < hi_bound:
+        below = floor - floors[lo] if lo >= lo_bound else None
+        above = floors[hi] - floor if hi < hi_bound else None
+        distance = min(x for x in (below, above) if x is not None)
+
+        candidates = []
+        if below == distance:
+            if floors[lo] not in exclude_floors:
+                candidates.append(candidate(floors[lo]))
+            lo -= 1
+        if above == distance:
+            if floors[hi] not in exclude_floors:
+                candidates.append(candidate(floors[hi]))
+            hi += 1
+
+        candidates = [item for item in candidates if item is not None]
+        if candidates:
+            return min(candidates, key=order)
+
+    return None
+
+
+class FloorIndex:
+    """An index of waiting loads bucketed by their initial floor
+
+    Floors with at least one load are kept sorted so the nearest floor to an elevator is found
+    with a binary search. Loads keep the order they were added in, both per floor and overall,
+    so ties are always broken in favour of the load that has been in the system the longest.
+
+    loads: Optional[List[Load]]
+        Loads to index, in order
+    """
+
+    def __init__(self, loads=None) -> None:
+        self.floors: List[int] = []
+        self._buckets: Dict[int, Dict[int, 'Load']] = {}
+        self._loads: Dict[int, 'Load'] = {}
+        self._order: Dict[int, int] = {}
+        self._counter = itertools.count()
+
+        for load in loads or []:
+            self.add(load)
+
+    def clear(self):
+        """Removes every load, keeping the index"""
+        self.floors.clear()
+        self._buckets.clear()
+        self._loads.clear()
+        self._order.clear()
+        self._counter = itertools.count()
+
+    def add(self, load):
+        """Adds a load to the index
+
+        load: Load
+            The load to add
+        """
+        if load.id in self._loads:
+            return
+
+        floor = load.initial_floor
+        bucket = self._buckets.get(floor)
+        if bucket is None:
+            bucket = self._buckets[floor] = {}
+            bisect.insort(self.floors, floor)
+
+        bucket[load.id] = load
+        self._loads[load.id] = load
+        self._order[load.id] = next(self._counter)
+
+    def remove(self, load):
+        """Removes a load from the index, if it is in it
+
+        load: Load
+            The load to remove
+        """
+        if self._loads.pop(load.id, None) is None:
+            return
+
+        del self._order[load.id]
+        floor = load.initial_floor
+        bucket = self._buckets[floor]
+        del bucket[load.id]
+        if not bucket:
+            del self._buckets[floor]
+            del self.floors[bisect.bisect_left(self.floors, floor)]
+
+    def order(self, load) -> int:
+        """Returns the position the load was added to the index in"""
+        return self._order[load.id]
+
+    def at(self, floor) -> List['Load']:
+        """Returns the loads waiting on a floor, in order"""
+        bucket = self._buckets.get(floor)
+        if bucket is None:
+            return []
+        return list(bucket.values())
+
+    def count_at(self, floor) -> int:
+        """Returns the number of loads waiting on a floor"""
+        return len(self._buckets.get(floor, ()))
+
+    def first(self, exclude: Collection[int] = ()) -> Optional['Load']:
+        """Returns the load that was added first
+
+        exclude: Collection[int]
+            IDs of loads to skip
+        """
+        for load_id, load in self._loads.items():
+            if load_id not in exclude:
+                return load
+        return None
+
+    def first_at(self, floor, exclude: Collection[int] = ()) -> Optional['Load']:
+        """Returns the load that was added first on a floor
+
+        exclude: Collection[int]
+            IDs of loads to skip
+        """
+        for load_id, load in self._buckets.get(floor, {}).items():
+            if load_id not in exclude:
+                return load
+        return None
+
+    def floors_between(self, lowest, highest) -> List[int]:
+        """Returns the floors with waiting loads from lowest to highest (inclusive)"""
+        return self.floors[bisect.bisect_left(self.floors, lowest):bisect.bisect_right(self.floors, highest)]
+
+    def nearest(
+        self, floor, exclude: Collection[int] = (), lowest=None, highest=None, exclude_floors: Collection[int] = ()
+    ) -> Optional['Load']:
+        """Returns the load waiting closest to a floor
+
+        If loads on two floors are equally close, the load that was added first is returned
+
+        floor: int
+            The floor to search from
+        exclude: Collection[int]
+            IDs of loads to skip
+        lowest: Optional[int]
+            Lowest floor to search
+        highest: Optional[int]
+            Highest floor to search
+        exclude_floors: Collection[int]
+            Floors to skip
+        """
+        return nearest_floor(
+            self.floors, floor, lambda x: self.first_at(x, exclude), self.order, lowest, highest, exclude_floors
+        )
+
+    def __contains__(self, load) -> bool:
+        return load.id in self._loads
+
+    def __iter__(self) -> Iterator['Load']:
+        return iter(self._loads.values())
+
+    def __len__(self) -> int:
+        return len(self._loads)
+
+    def __repr__(self) -> str:
+        return f'<FloorIndex size={len(self._loads)} floors={len(self.floors)}>'
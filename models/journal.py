@@ -0,0 +1,67 @@
+from typing import Set
+
+
+class ChangeJournal:
+    """The elevators, floors and loads that changed since the journal was last read
+
+    The engine records every change as it happens (see ElevatorAlgorithm.record_changes), so reading
+    the journal costs as much as the activity since the last read, not as much as the whole simulation.
+    Reading it (see read) clears it.
+
+    Attributes:
+        elevators: Set[int]
+            Ids of the elevators that moved, changed destination or had loads board or alight
+        floors: Set[int]
+            Floors where loads started or stopped waiting
+        loads: Set[int]
+            Ids of the loads that were added, claimed, boarded, alighted or removed
+        structure: bool
+            Whether elevators were added or removed or the number of floors changed
+    """
+
+    __slots__ = ('elevators', 'floors', 'loads', 'structure')
+
+    def __init__(self) -> None:
+        self.elevators: Set[int] = set()
+        self.floors: Set[int] = set()
+        self.loads: Set[int] = set()
+        self.structure = False
+
+    def record_elevator(self, elevator_id):
+        """Records a change to an elevator"""
+        self.elevators.add(elevator_id)
+
+    def record_load(self, load, floor=None):
+        """Records a change to a load
+
+        load: Load
+            The load that changed
+        floor: Optional[int]
+            The floor it started or stopped waiting at, if it did
+            Default: None
+        """
+        self.loads.add(load.id)
+        if floor is not None:
+            self.floors.add(floor)
+
+    def record_structure(self):
+        """Records that elevators were added or removed or the number of floors changed"""
+        self.structure = True
+
+    def read(self) -> 'ChangeJournal':
+        """Returns the changes recorded so far and clears the journal"""
+        changes = ChangeJournal()
+        changes.elevators, self.elevators = self.elevators, set()
+        changes.floors, self.floors = self.floors, set()
+        changes.loads, self.loads = self.loads, set()
+        changes.structure, self.structure = self.structure, False
+        return changes
+
+    def __bool__(self) -> bool:
+        return bool(self.elevators or self.floors or self.loads or self.structure)
+
+    def __repr__(self) -> str:
+        return (
+            f'<ChangeJournal elevators={len(self.elevators)} floors={len(self.floors)} '
+            f'loads={len(self.loads)} structure={self.structure}>'
+        )
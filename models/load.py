@@ -1,5 +1,10 @@
 import itertools
 from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils import Direction, pack_numbers, unpack_numbers
 
 
 @dataclass
@@ -34,6 +39,22 @@ class Load:
     def __post_init__(self):
         self.current_floor = self.initial_floor
 
+    @property
+    def direction(self) -> Direction:
+        """The direction the load wants to travel in"""
+        if self.destination_floor > self.initial_floor:
+            return Direction.UP
+        return Direction.DOWN
+
+    def state_key(self, elevator_id=0):
+        """Key of the load for the state fingerprint
+
+        elevator_id: int[Optional]
+            The elevator the load is in, 0 if it is waiting
+            Default: 0
+        """
+        return (2, elevator_id, self.initial_floor, self.destination_floor, self.tick_created)
+
     def __repr__(self) -> str:
         return f'Load(id={self.id}, initial_floor={self.initial_floor}, destination_floor={self.destination_floor}, weight={self.weight} current_floor={self.current_floor} elevator={bool(self.elevator)})'
 
@@ -49,3 +70,85 @@ class Load:
         load.tick_created = self.tick_created
         load.enter_lift_time = self.enter_lift_time
         return load
+
+    def __reduce__(self):
+        # a tuple of integers instead of the field dict
+        # the elevator is set afterwards (as state) since it can refer back to the load
+        return (_restore_load, self._fields(), self.elevator)
+
+    def __setstate__(self, elevator):
+        self.elevator = elevator
+
+    def _fields(self):
+        enter_lift_tick = getattr(self, 'enter_lift_tick', None)
+        return (
+            self.id,
+            self.initial_floor,
+            self.destination_floor,
+            self.weight,
+            self.current_floor,
+            self.tick_created,
+            -1 if self.enter_lift_time is None else self.enter_lift_time,
+            -1 if enter_lift_tick is None else enter_lift_tick,
+        )
+
+    @staticmethod
+    def pack(loads: List['Load']) -> tuple:
+        """Packs loads into compressed columns of integers (see pack_numbers), far smaller than pickling each one
+
+        The elevator of a load is kept as its id (0 if waiting, -1 if claimed), see unpack
+        """
+        if not loads:
+            return 0, [], pack_numbers([])
+
+        fields = np.array([load._fields() for load in loads], dtype=np.int64)
+        columns = [pack_numbers(column, delta=i == 0) for i, column in enumerate(fields.T)]
+        elevators = [0 if x.elevator is None else -1 if x.elevator is True else x.elevator.id for x in loads]
+        return len(loads), columns, pack_numbers(elevators)
+
+    @staticmethod
+    def unpack(packed: tuple, elevators: Optional[Dict[int, 'Elevator']] = None) -> List['Load']:
+        """Unpacks the loads packed by pack
+
+        packed: tuple
+            The columns returned by pack
+        elevators: Optional[Dict[int, Elevator]]
+            Elevator id -> elevator, to set the elevator of the loads in one
+            Default: None
+        """
+        count, columns, elevator_ids = packed
+        if count == 0:
+            return []
+
+        columns = [unpack_numbers(column, delta=i == 0) for i, column in enumerate(columns)]
+        loads = [_restore_load(*fields) for fields in zip(*columns)]
+        for load, elevator_id in zip(loads, unpack_numbers(elevator_ids)):
+            if elevator_id == -1:
+                load.elevator = True
+            elif elevator_id and elevators is not None:
+                load.elevator = elevators.get(elevator_id)
+        return loads
+
+
+def _restore_load(
+    load_id,
+    initial_floor,
+    destination_floor,
+    weight,
+    current_floor,
+    tick_created,
+    enter_lift_time,
+    enter_lift_tick,
+) -> Load:
+    load = Load.__new__(Load)
+    load.id = load_id
+    load.initial_floor = initial_floor
+    load.destination_floor = destination_floor
+    load.weight = weight
+    load.current_floor = current_floor
+    load.elevator = None
+    load.tick_created = tick_created
+    load.enter_lift_time = None if enter_lift_time == -1 else enter_lift_time
+    if enter_lift_tick != -1:
+        load.enter_lift_tick = enter_lift_tick
+    return load
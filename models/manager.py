@@ -8,7 +8,7 @@ from typing import Callable, List, Tuple
 import wx
 
 from utils import _InfinitySentinel, run_async_or_sync
-from models import ElevatorAlgorithm
+from models import ElevatorAlgorithm, LoadArchive
 
 
 class ElevatorManager:
@@ -33,6 +33,8 @@ class ElevatorManager:
         self.gui = gui
         self.id = next(ElevatorManager._id_iter)
         self.sync = sync
+        # set by set_long_running
+        self.archive: LoadArchive = None
 
         if log_func is None:
             self.WriteToLog = self.parent.WriteToLog
@@ -43,6 +45,11 @@ class ElevatorManager:
     def running(self):
         raise NotImplementedError
 
+    @property
+    def simulation_running(self) -> bool:
+        """Returns True if the simulation should carry on"""
+        return self.algorithm.simulation_running
+
     def _on_loop(self):
         pass
 
@@ -62,13 +69,13 @@ class ElevatorManager:
                     self.algorithm.loop()
                     await run_async_or_sync(self._on_loop)
 
-                    if self.algorithm.simulation_running:
-                        # only append if there are things going on
-                        for elevator in self.algorithm.elevators:
-                            self.algorithm.occupancy.append((elevator.load / self.algorithm.max_load) * 100)
+                    if self.simulation_running:
+                        # only record if there are things going on
+                        self.algorithm.record_occupancy()
                     else:
                         self.set_active(False)
                         self.WriteToLog(logging.INFO, 'Simulation finished, pausing')
+                        self.algorithm.cancel_decisions()
                         await run_async_or_sync(self.on_simulation_end)
 
                     self.send_event()
@@ -84,29 +91,38 @@ class ElevatorManager:
     def _sync_loop(self):
         while self.running and self.is_open:
             if self.algorithm.active:
-                self.algorithm.loop()
-                self._on_loop()
-
-                if self.algorithm.simulation_running:
-                    # only append if there are things going on
-                    for elevator in self.algorithm.elevators:
-                        self.algorithm.occupancy.append((elevator.load / self.algorithm.max_load) * 100)
-                else:
-                    self.set_active(False)
-                    self.WriteToLog(logging.INFO, 'Simulation finished, pausing')
-                    self.algorithm.on_simulation_end()
-                    self.on_simulation_end()
-
+                self.step()
                 self.send_event()
 
             if not isinstance(self.speed, _InfinitySentinel):
                 time.sleep(1 / self.speed)
                 # speed: 3 seconds per floor (1x)
 
+    def step(self):
+        """Runs a tick of the algorithm, pausing it once the simulation has finished"""
+        self.algorithm.loop()
+        self._on_loop()
+
+        if self.simulation_running:
+            # only record if there are things going on
+            self.algorithm.record_occupancy()
+        else:
+            self.set_active(False)
+            self.WriteToLog(logging.INFO, 'Simulation finished, pausing')
+            self.algorithm.cancel_decisions()
+            self.algorithm.on_simulation_end()
+            self.on_simulation_end()
+
     def send_event(self):
         """Sends an event to the server"""
         if self.gui is True:
-            event = self.event(algorithm=self.algorithm, thread=self)
+            changes = self.algorithm.changes
+            if changes is None:
+                # first event of this algorithm, everything is new to the GUI
+                self.algorithm.record_changes()
+            else:
+                changes = changes.read()
+            event = self.event(algorithm=self.algorithm, thread=self, changes=changes)
             wx.PostEvent(self.parent, event)
 
     def add_elevator(self, current_floor: int):
@@ -125,8 +141,27 @@ class ElevatorManager:
     def set_speed(self, speed: int):
         self.speed = speed
 
+    def set_long_running(self, enabled: bool = True, *, sample_limit: int = 4096, spill_path: str = None):
+        """Keeps memory flat for simulations left running indefinitely (see LoadArchive)
+
+        enabled: bool
+            Whether to turn long running mode on or off
+            Default: True
+        sample_limit: int
+            Samples a statistic keeps before they are folded into a histogram
+            Default: 4096
+        spill_path: Optional[str]
+            CSV file every served load is appended to
+            Default: None
+        """
+        if self.archive is not None:
+            self.archive.close()
+        self.archive = LoadArchive(sample_limit, spill_path) if enabled else None
+
     def close(self):
         self.is_open = False
+        if self.archive is not None:
+            self.archive.close()
 
     def add_passenger(self, initial: int, destination: int):
         load = self.algorithm.add_passenger(initial, destination)
@@ -159,6 +194,16 @@ class ElevatorManager:
         self.algorithm = cls(self)
         self.send_event()
 
+    def reset_in_place(self, cls: 'ElevatorAlgorithm' = None):
+        """Like reset, reusing the current algorithm if it is a cls (see ElevatorAlgorithm.reset_in_place)"""
+        if cls is None:
+            cls = self.algorithm.__class__
+        if self.algorithm.__class__ is not cls or not cls.resets_in_place():
+            return self.reset(cls)
+
+        self.algorithm.reset_in_place()
+        self.send_event()
+
     def set_active(self, active: bool):
         self.algorithm.active = active
 
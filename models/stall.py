@@ -0,0 +1,84 @@
+from typing import Dict, Optional, Tuple
+
+
+class StallDetector:
+    """Detects simulations that are no longer making progress
+
+    Progress is any load boarding or alighting. Between two progress events, the
+    state fingerprint of the algorithm is watched for:
+        - a frozen state (the fingerprint does not change at all)
+        - a livelock (the same state keeps being re-entered at the same interval, i.e. elevators cycle
+          without serving anyone)
+
+    The fingerprint does not cover everything an algorithm decides with, so a state being re-entered once
+    (e.g. an elevator rerouted and sent back) is not a livelock on its own, only a repeating cycle is.
+
+    window: int[Optional]
+        Maximum number of ticks without any progress
+        Default: 500
+    freeze_window: int[Optional]
+        Maximum number of ticks the fingerprint may stay unchanged without progress
+        Default: 30
+    cycle_repeats: int[Optional]
+        Number of times in a row a state may be re-entered after the same number of ticks without progress
+        before it is a livelock
+        Default: 3
+    """
+
+    def __init__(self, window=500, freeze_window=30, cycle_repeats=3) -> None:
+        self.window = window
+        self.freeze_window = freeze_window
+        self.cycle_repeats = cycle_repeats
+        self.reset()
+
+    def reset(self):
+        """Clears all tracked state"""
+        self._progress: int = None
+        self._progress_tick = 0
+        self._fingerprint: int = None
+        self._fingerprint_tick = 0
+        # fingerprint -> (tick it was last entered, ticks since the visit before, visits in a row at that period)
+        self._seen: Dict[int, Tuple[int, int, int]] = {}
+
+    def update(self, tick: int, fingerprint: int, progress: int) -> Optional[str]:
+        """Feeds the state of the current tick into the detector
+
+        tick: int
+            The current tick
+        fingerprint: int
+            The state fingerprint of the algorithm
+        progress: int
+            A counter that increases whenever a load boards or alights
+
+        Returns: the reason the simulation is stalled, None if it is not
+        """
+        if progress != self._progress:
+            self._progress = progress
+            self._progress_tick = tick
+            self._fingerprint = fingerprint
+            self._fingerprint_tick = tick
+            self._seen.clear()
+            self._seen[fingerprint] = (tick, 0, 0)
+            return None
+
+        if fingerprint != self._fingerprint:
+            self._fingerprint = fingerprint
+            self._fingerprint_tick = tick
+            last_tick, last_period, repeats = self._seen.get(fingerprint, (tick, 0, 0))
+            period = tick - last_tick
+            if period == 0:
+                repeats = 0
+            elif period == last_period:
+                repeats += 1
+            else:
+                repeats = 1
+            self._seen[fingerprint] = (tick, period, repeats)
+            if repeats >= self.cycle_repeats:
+                return f'state repeated every {period} ticks {repeats} times without progress'
+        elif tick - self._fingerprint_tick > self.freeze_window:
+            return f'state frozen for {tick - self._fingerprint_tick} ticks'
+
+        if tick - self._progress_tick > self.window:
+            return f'no progress for {tick - self._progress_tick} ticks'
+
+        return None
@@ -1,19 +1,64 @@
+import itertools
 import statistics
+from array import array
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Optional, Tuple
+
+from utils import pack_numbers, unpack_numbers
 
 
 @dataclass
 class GeneratedStats:
+    """Samples of a statistic
+
+    Samples are kept in values until compact folds them into a histogram of { value: count },
+    which stays the same size however many samples are added as long as values repeat (e.g. ticks).
+    """
+
     values: List[float | int] = field(default_factory=list)
+    histogram: Dict[float | int, int] = field(default_factory=dict)
+    folded_count: int = 0
+    folded_sum: float | int = 0
 
     def append(self, value: float | int):
         self.values.append(value)
 
+    def compact(self):
+        """Folds the samples in values into the histogram"""
+        for value in self.values:
+            self.histogram[value] = self.histogram.get(value, 0) + 1
+        self.folded_count += len(self.values)
+        self.folded_sum += sum(self.values)
+        self.values = []
+
+    def merge(self, other: 'GeneratedStats'):
+        """Folds the samples of another GeneratedStats into the histogram"""
+        self.compact()
+        for value, count in other.histogram.items():
+            self.histogram[value] = self.histogram.get(value, 0) + count
+        for value in other.values:
+            self.histogram[value] = self.histogram.get(value, 0) + 1
+        self.folded_count += len(other)
+        self.folded_sum += other.folded_sum + sum(other.values)
+
+    def _value_at(self, index: int) -> float | int:
+        counts = dict(self.histogram)
+        for value in self.values:
+            counts[value] = counts.get(value, 0) + 1
+
+        seen = 0
+        for value in sorted(counts):
+            seen += counts[value]
+            if index < seen:
+                return value
+        raise IndexError(index)
+
     @property
     def mean(self):
-        if len(self.values) == 0:
+        if len(self) == 0:
             return 0
+        if self.folded_count:
+            return (self.folded_sum + sum(self.values)) / len(self)
         try:
             return statistics.mean(self.values)
         except AssertionError:
@@ -21,8 +66,13 @@ class GeneratedStats:
 
     @property
     def median(self):
-        if len(self.values) == 0:
+        if len(self) == 0:
             return 0
+        if self.folded_count:
+            mid = len(self) // 2
+            if len(self) % 2 == 1:
+                return self._value_at(mid)
+            return (self._value_at(mid - 1) + self._value_at(mid)) / 2
         try:
             return statistics.median(self.values)
         except AssertionError:
@@ -30,18 +80,130 @@ class GeneratedStats:
 
     @property
     def minimum(self):
-        if len(self.values) == 0:
+        if len(self) == 0:
+            return 0
+        return min(itertools.chain(self.values, self.histogram))
+
+    @property
+    def maximum(self):
+        if len(self) == 0:
+            return 0
+        return max(itertools.chain(self.values, self.histogram))
+
+    def __len__(self):
+        return len(self.values) + self.folded_count
+
+    def __str__(self):
+        return f'{self.minimum:.2f}/{self.mean:.2f}/{self.median:.2f}/{self.maximum:.2f}'
+
+    def to_dict(self):
+        return {
+            'mean': self.mean,
+            'median': self.median,
+            'minimum': self.minimum,
+            'maximum': self.maximum,
+        }
+
+    def __repr__(self) -> str:
+        return f'<GeneratedStats size={len(self)} buckets={len(self.histogram)}>'
+
+    def copy(self):
+        return GeneratedStats(self.values.copy(), self.histogram.copy(), self.folded_count, self.folded_sum)
+
+    def __reduce__(self):
+        # samples are packed into compressed arrays (see pack_numbers) instead of pickled one by one
+        return (
+            _restore_generated_stats,
+            (
+                pack_numbers(self.values),
+                pack_numbers(self.histogram.keys()),
+                pack_numbers(self.histogram.values()),
+                self.folded_count,
+                self.folded_sum,
+            ),
+        )
+
+
+@dataclass
+class OccupancyStats:
+    """Occupancy samples stored as a histogram of elevator weights
+
+    Every sample is the weight of an elevator (in kg) at the end of a tick, bucketed by
+    (weight, max_load). Running integer weight sums are kept per max_load so that the
+    mean is available without walking the samples.
+    """
+
+    histogram: Dict[Tuple[int, int], int] = field(default_factory=dict)
+    weight_sums: Dict[int, int] = field(default_factory=dict)
+    count: int = 0
+
+    @staticmethod
+    def percentage(weight: int, max_load: int) -> float:
+        return (weight / max_load) * 100
+
+    def add(self, weight: int, max_load: int, count: int = 1):
+        """Adds occupancy samples
+
+        weight: int
+            The weight of the elevator in kg
+        max_load: int
+            The maximum load of the elevator in kg
+        count: int[Optional]
+            The number of samples with this weight
+            Default: 1
+        """
+        key = (weight, max_load)
+        self.histogram[key] = self.histogram.get(key, 0) + count
+        self.weight_sums[max_load] = self.weight_sums.get(max_load, 0) + weight * count
+        self.count += count
+
+    def merge(self, other: 'OccupancyStats'):
+        """Adds the samples of another OccupancyStats"""
+        for (weight, max_load), count in other.histogram.items():
+            self.add(weight, max_load, count)
+
+    def _sorted_buckets(self) -> List[Tuple[float, int]]:
+        return sorted((self.percentage(weight, max_load), n) for (weight, max_load), n in self.histogram.items())
+
+    @staticmethod
+    def _value_at(buckets: List[Tuple[float, int]], index: int) -> float:
+        seen = 0
+        for value, n in buckets:
+            seen += n
+            if index < seen:
+                return value
+        raise IndexError(index)
+
+    @property
+    def mean(self):
+        if self.count == 0:
+            return 0
+        return sum(self.percentage(total, max_load) for max_load, total in self.weight_sums.items()) / self.count
+
+    @property
+    def median(self):
+        if self.count == 0:
+            return 0
+        buckets = self._sorted_buckets()
+        mid = self.count // 2
+        if self.count % 2 == 1:
+            return self._value_at(buckets, mid)
+        return (self._value_at(buckets, mid - 1) + self._value_at(buckets, mid)) / 2
+
+    @property
+    def minimum(self):
+        if self.count == 0:
             return 0
-        return min(self.values)
+        return min(self.percentage(weight, max_load) for weight, max_load in self.histogram)
 
     @property
     def maximum(self):
-        if len(self.values) == 0:
+        if self.count == 0:
             return 0
-        return max(self.values)
+        return max(self.percentage(weight, max_load) for weight, max_load in self.histogram)
 
     def __len__(self):
-        return len(self.values)
+        return self.count
 
     def __str__(self):
         return f'{self.minimum:.2f}/{self.mean:.2f}/{self.median:.2f}/{self.maximum:.2f}'
@@ -55,15 +217,27 @@ class GeneratedStats:
         }
 
     def __repr__(self) -> str:
-        return f'<GeneratedStats size={len(self.values)}>'
+        return f'<OccupancyStats size={self.count} buckets={len(self.histogram)}>'
 
     def copy(self):
-        return GeneratedStats(self.values.copy())
+        return OccupancyStats(self.histogram.copy(), self.weight_sums.copy(), self.count)
+
+    def __reduce__(self):
+        return (
+            _restore_occupancy_stats,
+            (
+                pack_numbers(weight for weight, _ in self.histogram),
+                pack_numbers(max_load for _, max_load in self.histogram),
+                pack_numbers(self.histogram.values()),
+                self.weight_sums,
+                self.count,
+            ),
+        )
 
 
 @dataclass
 class CombinedStats:
-    stats: List[GeneratedStats | int] = field(default_factory=list)
+    stats: List[GeneratedStats | OccupancyStats | int] = field(default_factory=list)
 
     def append(self, stat: GeneratedStats):
         self.stats.append(stat)
@@ -138,11 +312,52 @@ class SimulationStats:
     algorithm_name: str
     wait_time: GeneratedStats
     time_in_lift: GeneratedStats
-    occupancy: GeneratedStats
+    occupancy: OccupancyStats
+    hash_trace: array = field(default=None, repr=False)
+    # open systems only (see SteadyStateMonitor)
+    warmup_ticks: Optional[int] = None
+    converged: Optional[bool] = None
 
     def __str__(self) -> str:
         fmt_text = f'Tick: {self.ticks}\nAlgorithm: {self.algorithm_name}\n\n(MIN/MEAN/MED/MAX)\n\n'
         fmt_text += f'Wait Time: {self.wait_time}\n'
         fmt_text += f'Time in Lift: {self.time_in_lift}\n'
         fmt_text += f'Occupancy: {self.occupancy}'
+        if self.warmup_ticks is not None:
+            fmt_text += f'\nWarm-up: {self.warmup_ticks} ticks (converged: {self.converged})'
         return fmt_text
+
+    def __reduce__(self):
+        return (
+            _restore_simulation_stats,
+            (
+                self.ticks,
+                self.algorithm_name,
+                self.wait_time,
+                self.time_in_lift,
+                self.occupancy,
+                None if self.hash_trace is None else pack_numbers(self.hash_trace),
+                self.warmup_ticks,
+                self.converged,
+            ),
+        )
+
+
+def _restore_generated_stats(values, histogram_values, histogram_counts, folded_count, folded_sum):
+    histogram = dict(zip(unpack_numbers(histogram_values), unpack_numbers(histogram_counts)))
+    return GeneratedStats(unpack_numbers(values), histogram, folded_count, folded_sum)
+
+
+def _restore_occupancy_stats(weights, max_loads, counts, weight_sums, count):
+    histogram = dict(zip(zip(unpack_numbers(weights), unpack_numbers(max_loads)), unpack_numbers(counts)))
+    return OccupancyStats(histogram, weight_sums, count)
+
+
+def _restore_simulation_stats(
+    ticks, algorithm_name, wait_time, time_in_lift, occupancy, hash_trace, warmup_ticks, converged
+):
+    if hash_trace is not None:
+        hash_trace = array('Q', unpack_numbers(hash_trace))
+    return SimulationStats(
+        ticks, algorithm_name, wait_time, time_in_lift, occupancy, hash_trace, warmup_ticks, converged
+    )
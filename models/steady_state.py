@@ -0,0 +1,193 @@
+import math
+import statistics
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from models.stats import GeneratedStats, OccupancyStats
+
+
+@dataclass
+class SteadyStateWindow:
+    """Statistics of a window of ticks
+
+    Attributes:
+        start_tick: int
+            The first tick of the window
+        wait_time: GeneratedStats
+            Wait time of the loads that boarded during the window
+        time_in_lift: GeneratedStats
+            Time in lift of the loads that alighted during the window
+        occupancy: OccupancyStats
+            Occupancy of every elevator on every tick of the window
+    """
+
+    start_tick: int
+    wait_time: GeneratedStats = field(default_factory=GeneratedStats)
+    time_in_lift: GeneratedStats = field(default_factory=GeneratedStats)
+    occupancy: OccupancyStats = field(default_factory=OccupancyStats)
+
+    def to_dict(self):
+        return {
+            'start_tick': self.start_tick,
+            'wait_time': self.wait_time.mean,
+            'time_in_lift': self.time_in_lift.mean,
+            'occupancy': self.occupancy.mean,
+        }
+
+
+class SteadyStateMonitor:
+    """Tracks an open system (where loads keep arriving) until its statistics have converged
+
+    Ticks are split into windows of window ticks. The warm-up is found with MSER-5 on the mean wait time
+    of every window (the windows are the batches): the first d windows are dropped, where d keeps the
+    standard error of the rest lowest. The simulation has converged once at least min_windows windows are
+    left after the warm-up and the confidence interval of their mean wait time is within tolerance of it
+    (batch means).
+
+    window: int[Optional]
+        Number of ticks in a window
+        Default: 500
+    warmup: Optional[int]
+        Number of ticks to drop at the start, None to detect them
+        Default: None
+    tolerance: float[Optional]
+        Half width of the confidence interval relative to the mean to stop at
+        Default: 0.05
+    min_windows: int[Optional]
+        Number of windows after the warm-up needed before stopping
+        Default: 10
+    max_ticks: Optional[int]
+        Number of ticks to stop at if the statistics have not converged, None to never stop
+        Default: 100000
+    confidence: float[Optional]
+        Confidence level of the interval
+        Default: 0.95
+    """
+
+    def __init__(
+        self, window=500, warmup=None, tolerance=0.05, min_windows=10, max_ticks=100000, confidence=0.95
+    ) -> None:
+        self.window = window
+        self.warmup = warmup
+        self.tolerance = tolerance
+        self.min_windows = min_windows
+        self.max_ticks = max_ticks
+        self.confidence = confidence
+
+        self.windows: List[SteadyStateWindow] = []
+        self.current = SteadyStateWindow(0)
+        self.warmup_windows: Optional[int] = None
+        self.converged = False
+        self.tick = 0
+
+    def record_wait(self, wait_time):
+        """Records the wait time of a load that boarded"""
+        self.current.wait_time.append(wait_time)
+
+    def record_time_in_lift(self, time_in_lift):
+        """Records the time in lift of a load that alighted"""
+        self.current.time_in_lift.append(time_in_lift)
+
+    def update(self, algorithm) -> bool:
+        """Feeds the state of the current tick into the monitor
+
+        algorithm: ElevatorAlgorithm
+            The algorithm being run
+
+        Returns: True if the simulation should stop
+        """
+        self.tick = algorithm.tick_count
+        for elevator in algorithm.elevators:
+            self.current.occupancy.add(elevator.load, algorithm.max_load)
+
+        if self.tick - self.current.start_tick >= self.window:
+            self.current.wait_time.compact()
+            self.current.time_in_lift.compact()
+            self.windows.append(self.current)
+            self.current = SteadyStateWindow(self.tick)
+            self._check_convergence()
+
+        return self.done
+
+    @property
+    def done(self) -> bool:
+        return self.converged or (self.max_ticks is not None and self.tick >= self.max_ticks)
+
+    @property
+    def warmup_ticks(self) -> Optional[int]:
+        """Number of ticks dropped as warm-up, None until enough windows have been seen"""
+        if self.warmup_windows is None:
+            return None
+        return self.warmup_windows * self.window
+
+    def _detect_warmup(self, means: List[float]) -> Optional[int]:
+        """Returns the number of windows MSER-5 drops, None if it would drop more than half of them"""
+        if self.warmup is not None:
+            return min(math.ceil(self.warmup / self.window), len(means))
+
+        # suffix sums, so every truncation point is O(1)
+        n = len(means)
+        best = None
+        best_d = None
+        total = 0.0
+        squares = 0.0
+        for d in range(n - 1, -1, -1):
+            total += means[d]
+            squares += means[d] ** 2
+            count = n - d
+            if d > n // 2:
+                continue
+            mser = (squares - total * total / count) / (count * count)
+            if best is None or mser <= best:
+                best = mser
+                best_d = d
+
+        # still truncating as much as allowed, the warm-up may not be over yet
+        if best_d is None or (n > 1 and best_d == n // 2):
+            return None
+        return best_d
+
+    def _check_convergence(self):
+        means = [window.wait_time.mean for window in self.windows]
+        self.warmup_windows = self._detect_warmup(means)
+        if self.warmup_windows is None:
+            return
+
+        steady = means[self.warmup_windows:]
+        if len(steady) < max(self.min_windows, 2):
+            return
+
+        mean = statistics.mean(steady)
+        half_width = self.t_quantile(len(steady) - 1) * statistics.stdev(steady) / math.sqrt(len(steady))
+        self.converged = half_width <= self.tolerance * mean
+
+    def t_quantile(self, df) -> float:
+        """Two sided Student's t quantile of the confidence level (Cornish-Fisher expansion of the normal one)"""
+        z = statistics.NormalDist().inv_cdf((1 + self.confidence) / 2)
+        return z + (z**3 + z) / (4 * df) + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * df**2)
+
+    def steady_windows(self) -> List[SteadyStateWindow]:
+        """The windows after the warm-up"""
+        return self.windows[self.warmup_windows or 0:]
+
+    def stats(self) -> Dict[str, GeneratedStats | OccupancyStats]:
+        """Combines the windows after the warm-up
+
+        Returns: Dict[str, GeneratedStats | OccupancyStats]
+            'wait_time', 'time_in_lift' and 'occupancy' over the steady state
+        """
+        wait_time = GeneratedStats()
+        time_in_lift = GeneratedStats()
+        occupancy = OccupancyStats()
+        for window in self.steady_windows():
+            wait_time.merge(window.wait_time)
+            time_in_lift.merge(window.time_in_lift)
+            occupancy.merge(window.occupancy)
+
+        return {'wait_time': wait_time, 'time_in_lift': time_in_lift, 'occupancy': occupancy}
+
+    def __repr__(self) -> str:
+        return (
+            f'<SteadyStateMonitor windows={len(self.windows)} '
+            f'warmup={self.warmup_ticks} converged={self.converged}>'
+        )
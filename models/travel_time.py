@@ -0,0 +1,94 @@
+import math
+
+from models.action import ActionQueue
+from utils import Constants
+
+
+class TravelTimes:
+    """The number of ticks an elevator takes to travel between floors and to stop at them
+
+    The timings follow the engine (see Elevator.cycle): every floor travelled takes move_ticks, and a stop
+    where loads board or alight opens the doors, moves loads_per_tick loads per tick and closes the doors.
+    A stop where no load boards or alights takes no time. Every query is O(1).
+
+    move_ticks: int
+        Ticks to travel one floor
+        Default: ActionQueue.MOVE_TICKS
+    door_open_ticks: int
+        Ticks to open the doors
+        Default: ActionQueue.DOOR_OPEN_TICKS
+    door_close_ticks: int
+        Ticks to close the doors
+        Default: ActionQueue.DOOR_CLOSE_TICKS
+    loads_per_tick: int
+        Loads that can board or alight in a tick
+        Default: Constants.MAX_NUM_LOADS_REMOVED_PER_TICK
+    """
+
+    def __init__(
+        self,
+        move_ticks=ActionQueue.MOVE_TICKS,
+        door_open_ticks=ActionQueue.DOOR_OPEN_TICKS,
+        door_close_ticks=ActionQueue.DOOR_CLOSE_TICKS,
+        loads_per_tick=Constants.MAX_NUM_LOADS_REMOVED_PER_TICK,
+    ) -> None:
+        self.move_ticks = move_ticks
+        self.door_open_ticks = door_open_ticks
+        self.door_close_ticks = door_close_ticks
+        self.loads_per_tick = loads_per_tick
+        # ticks to open and close the doors
+        self.door_ticks = door_open_ticks + door_close_ticks
+
+    def travel(self, start, end) -> int:
+        """Returns the ticks it takes to travel from one floor to another without stopping"""
+        return abs(end - start) * self.move_ticks
+
+    def stop(self, changes) -> int:
+        """Returns the ticks a stop takes
+
+        changes: int
+            The number of loads boarding and alighting
+        """
+        if changes <= 0:
+            return 0
+        return self.door_ticks + math.ceil(changes / self.loads_per_tick)
+
+    def eta(self, start, end, stops=0, changes=0, busy=0) -> int:
+        """Returns the ticks it takes to reach a floor
+
+        start: int
+            The floor to start from
+        end: int
+            The floor to reach
+        stops: int
+            The number of stops on the way
+            Default: 0
+        changes: int
+            The number of loads boarding and alighting at those stops, in total
+            (exact for one stop, a lower bound for more, use stop for each of them to be exact)
+            Default: 0
+        busy: int
+            Ticks until the elevator can start moving (e.g. the rest of a stop)
+            Default: 0
+        """
+        ticks = busy + self.travel(start, end)
+        if stops > 0:
+            # every stop takes at least a tick to move its loads
+            ticks += stops * self.door_ticks + max(stops, math.ceil(changes / self.loads_per_tick))
+        return ticks
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TravelTimes):
+            return (self.move_ticks, self.door_open_ticks, self.door_close_ticks, self.loads_per_tick) == (
+                other.move_ticks,
+                other.door_open_ticks,
+                other.door_close_ticks,
+                other.loads_per_tick,
+            )
+        return super().__eq__(other)
+
+    def __repr__(self) -> str:
+        return (
+            f'<TravelTimes move={self.move_ticks} '
+            f'doors={self.door_open_ticks}+{self.door_close_ticks} loads_per_tick={self.loads_per_tick}>'
+        )
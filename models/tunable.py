@@ -0,0 +1,40 @@
+import math
+import random
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Tunable:
+    """A parameter of an algorithm that can be tuned (see ElevatorAlgorithm.tunables)
+
+    low: float
+        Lowest value of the parameter
+    high: float
+        Highest value of the parameter
+    integer: Optional[bool]
+        Whether the parameter only takes integer values
+        Default: False
+    log: Optional[bool]
+        Whether to sample the parameter on a log scale (low must be positive)
+        Default: False
+    """
+
+    low: float
+    high: float
+    integer: bool = False
+    log: bool = False
+
+    def sample(self, rnd: random.Random):
+        """Samples a value uniformly from the range"""
+        if self.log:
+            value = math.exp(rnd.uniform(math.log(self.low), math.log(self.high)))
+        else:
+            value = rnd.uniform(self.low, self.high)
+        return self.clip(value)
+
+    def clip(self, value):
+        """Clips a value to the range"""
+        value = min(max(value, self.low), self.high)
+        if self.integer:
+            return int(round(value))
+        return float(value)
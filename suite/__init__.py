@@ -1,4 +1,6 @@
+from .workload import Workload
 from .manager import TestSuiteManager, ManagerPool, run_loop
 from .stats import TestSettings, TestStats
 from .background import BackgroundProcess
 from .suite import TestSuite
+from .tuner import Tuner
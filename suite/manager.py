@@ -5,8 +5,9 @@ import multiprocessing as mp
 
 from utils import Constants, LogOrigin
 from utils import TestTimeoutError
-from models import ElevatorManager
+from models import ElevatorManager, StallDetector, SteadyStateMonitor
 from models.algorithm import load_algorithms
+from suite.workload import Workload
 
 
 class TestSuiteManager(ElevatorManager):
@@ -24,7 +25,11 @@ class TestSuiteManager(ElevatorManager):
         self.log_queue = log_queue
         self.log_levels = log_levels
 
-        self.latest_load_move = 0
+        self.stall_detector = StallDetector()
+        # set for open systems
+        self.steady_state: SteadyStateMonitor = None
+        # NumPy stream of the current iteration, for init functions to draw passengers from in bulk
+        self.workload: Workload = None
         self.previous_loads = []
         self.current_simulation = None
 
@@ -32,6 +37,12 @@ class TestSuiteManager(ElevatorManager):
     def running(self):
         return self._running
 
+    @property
+    def simulation_running(self) -> bool:
+        if self.steady_state is not None:
+            return not self.steady_state.done
+        return super().simulation_running
+
     @property
     def name(self):
         if self.current_simulation is not None:
@@ -41,14 +52,26 @@ class TestSuiteManager(ElevatorManager):
             return None
 
     def _on_loop(self):
-        # frozen loads
-        if self.algorithm.tick_count - self.latest_load_move > 500:
+        if self.steady_state is not None:
+            self.current_simulation[1].add_arrivals(self.algorithm, self.workload)
+            self.steady_state.update(self.algorithm)
+
+        # stalled or livelocked simulation
+        reason = None
+        if self.algorithm.simulation_running:
+            reason = self.stall_detector.update(
+                self.algorithm.tick_count, self.algorithm.fingerprint, self.algorithm.progress_count
+            )
+        else:
+            # nothing to serve until more loads arrive in an open system
+            self.stall_detector.reset()
+        if reason is not None:
             self.end_test_simulation()
             n_iter, settings = self.current_simulation
             self.log_message(
                 LogOrigin.TEST,
                 logging.ERROR,
-                f'{self.name=} TIMEOUT',
+                f'{self.name=} TIMEOUT ({reason})',
             )
             raise TestTimeoutError(self.name, n_iter, settings)
 
@@ -56,16 +79,31 @@ class TestSuiteManager(ElevatorManager):
             if self.current_simulation[1].on_tick is not None:
                 self.current_simulation[1].on_tick(self.algorithm)
 
-    def on_load_move(self, _):
-        self.latest_load_move = self.algorithm.tick_count
-
     def start_simulation(self):
         self._running = True
         self.loop()
 
+    def on_load_load(self, load, elevator):
+        if self.steady_state is not None:
+            self.steady_state.record_wait(self.algorithm.tick_count - load.tick_created)
+
+    def on_load_unload(self, load, elevator):
+        if self.steady_state is not None:
+            self.steady_state.record_time_in_lift(self.algorithm.tick_count - load.enter_lift_tick + 1)
+
     def on_simulation_end(self):
         self.end_test_simulation()
 
+    def simulation_stats(self):
+        """Returns the statistics of the simulation, only after the warm-up for open systems"""
+        stats = self.algorithm.stats
+        if self.steady_state is not None:
+            for name, value in self.steady_state.stats().items():
+                setattr(stats, name, value)
+            stats.warmup_ticks = self.steady_state.warmup_ticks
+            stats.converged = self.steady_state.converged
+        return stats
+
     def end_test_simulation(self):
         self._running = False
 
@@ -106,21 +144,40 @@ class ManagerPool:
 
 
 def run_loop(args):
-    (n_iter, settings), consumers = args
+    (n_iter, settings), consumers, record_hash_trace = args
     manager = consumers.get()
     try:
         manager.current_simulation = (n_iter, settings)
 
         algo = manager.algorithms[settings.algorithm_name]
         algo.name = settings.algorithm_name
-        manager.reset(algo)
+        # objects of the last iteration run by this worker are reused
+        manager.reset_in_place(algo)
         manager.algorithm.rnd = random.Random((settings.seed + n_iter) % 2 ** 32)
+        manager.algorithm.set_tunables(settings.algorithm_params)
+        if settings.record_hash_trace or record_hash_trace:
+            manager.algorithm.record_hash_trace()
+        if settings.check_invariants:
+            manager.algorithm.enable_invariant_checks()
 
         manager.set_speed(settings.speed)
         manager.set_floors(settings.floors)
         manager.set_max_load(settings.max_load)
+        manager.stall_detector = StallDetector(
+            settings.stall_window, settings.freeze_window, settings.cycle_repeats
+        )
+        manager.steady_state = None
+        if settings.open_system:
+            manager.steady_state = SteadyStateMonitor(
+                settings.window_ticks,
+                settings.warmup_ticks,
+                settings.ci_tolerance,
+                settings.min_windows,
+                settings.max_ticks,
+            )
 
-        settings.init_passengers(manager.algorithm.rnd)
+        manager.workload = Workload(settings.seed, n_iter)
+        settings.init_passengers(manager.workload)
 
         elevator_floors = []
         for _ in range(settings.num_elevators):
@@ -163,7 +220,7 @@ def run_loop(args):
                 logging.DEBUG,
                 f'{manager.name} END SIMULATION',
             )
-            return ((n_iter, settings), manager.algorithm.stats)
+            return ((n_iter, settings), manager.simulation_stats())
 
     except KeyboardInterrupt:
         return
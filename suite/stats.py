@@ -1,9 +1,9 @@
-import random
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List, Optional
 
 from utils import _InfinitySentinel, Infinity
 from models import CombinedStats, Load, SimulationStats
+from suite.workload import Workload
 
 
 @dataclass
@@ -76,6 +76,48 @@ class TestSettings:
         Function to call to initialize the algorithm
     on_tick: Optional[Callable[[ElevatorAlgorithm], None]
         Function to call every tick
+    stall_window: Optional[int]
+        Maximum ticks without a load boarding or alighting before the test times out
+        Default: 500
+    freeze_window: Optional[int]
+        Maximum ticks the simulation state may stay unchanged without progress
+        Default: 30
+    cycle_repeats: Optional[int]
+        Number of times in a row the simulation state may be repeated at the same interval without progress
+        Default: 3
+    record_hash_trace: Optional[bool]
+        Whether to record the state hash of every tick into SimulationStats.hash_trace
+        Default: False
+    check_invariants: Optional[bool]
+        Whether to check the invariants of the simulation after every tick (slow)
+        Default: False
+    algorithm_params: Optional[Dict[str, float]]
+        Tunable parameters of the algorithm to set before the simulation starts (see ElevatorAlgorithm.tunables)
+        Default: {}
+    iteration_offset: Optional[int]
+        Number added to the iteration number, so that iterations can be run in several batches
+        with a different seed for each
+        Default: 0
+    arrival_rate: Optional[float]
+        Mean number of passengers arriving every tick, between random floors. Any rate above 0 makes the test
+        an open system, which runs until its statistics converge (see SteadyStateMonitor) instead of until
+        every passenger has been served, and only reports the statistics after the warm-up
+        Default: 0
+    window_ticks: Optional[int]
+        Number of ticks in a window of an open system
+        Default: 500
+    warmup_ticks: Optional[int]
+        Number of ticks to drop at the start of an open system, None to detect them
+        Default: None
+    ci_tolerance: Optional[float]
+        Half width of the 95% confidence interval of the mean wait time, relative to it, to stop an open system at
+        Default: 0.05
+    min_windows: Optional[int]
+        Number of windows after the warm-up an open system runs for at least
+        Default: 10
+    max_ticks: Optional[int]
+        Number of ticks to stop an open system at if it has not converged
+        Default: 100000
     """
 
     id: int = field(init=False)
@@ -91,15 +133,35 @@ class TestSettings:
     loads: List[Load] = field(default_factory=list)
     init_function: callable = None
     on_tick: callable = None
+    stall_window: int = 500
+    freeze_window: int = 30
+    cycle_repeats: int = 3
+    record_hash_trace: bool = False
+    check_invariants: bool = False
+    algorithm_params: Dict[str, float] = field(default_factory=dict)
+    iteration_offset: int = 0
+    arrival_rate: float = 0
+    window_ticks: int = 500
+    warmup_ticks: Optional[int] = None
+    ci_tolerance: float = 0.05
+    min_windows: int = 10
+    max_ticks: int = 100000
 
     def __post_init__(self):
         self.id = hash((self.name, self.algorithm_name, self.seed))
 
-    def init_passengers(self, rnd: random.Random):
-        for _ in range(self.num_passengers):
-            initial, destination = rnd.sample(range(1, self.floors + 1), 2)
-            load = Load(initial, destination, 60)
-            self.loads.append(load)
+    def init_passengers(self, workload: Workload):
+        """Adds num_passengers passengers between random floors, drawn from the stream of the iteration"""
+        self.loads.extend(workload.passengers(self.num_passengers, self.floors))
+
+    @property
+    def open_system(self) -> bool:
+        return self.arrival_rate > 0
+
+    def add_arrivals(self, algorithm, workload: Workload):
+        """Adds the passengers arriving this tick to an open system (a Poisson stream of them)"""
+        for load in workload.arriving(algorithm.tick_count, self.arrival_rate, self.floors):
+            algorithm.add_load(load)
 
     @property
     def algorithm(self):
@@ -120,7 +182,19 @@ class TestSettings:
             'num_elevators': self.num_elevators,
             'num_loads': len(self.loads),
             'total_iterations': iteration_count or self.total_iterations,
+            'algorithm_params': self.algorithm_params,
+            'arrival_rate': self.arrival_rate,
         }
 
     def __hash__(self) -> int:
         return hash(self.id)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # sent to and back from every worker, see Load.pack
+        state['loads'] = Load.pack(self.loads)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.loads = Load.unpack(state['loads'])
@@ -6,11 +6,11 @@ import queue
 import tqdm
 from datetime import datetime
 from multiprocessing import JoinableQueue, Pool
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import colorama
 
-from utils import LogOrigin, get_log_name
+from utils import LogOrigin, first_divergence, get_log_name
 from models import ElevatorAlgorithm
 from suite import BackgroundProcess, TestStats, TestSuiteManager, ManagerPool, run_loop
 
@@ -30,6 +30,12 @@ class TestSuite:
         **include_raw_stats: bool
             Default: True
             Whether to include the raw stats in the output
+        **check_determinism: bool
+            Default: False
+            Whether to run every iteration twice and compare the state hash of every tick
+        **save_results: bool
+            Default: True
+            Whether to save the results to the results folder
         **log_levels: Dict[LogOrigin, List[int]]
         """
         self.tests: List['TestSettings'] = tests
@@ -40,6 +46,8 @@ class TestSuite:
         self.close_event = mp.Event()
         self.export_artefacts = options.pop('export_artefacts', True)
         self.include_raw_stats = options.pop('include_raw_stats', True)
+        self.check_determinism = options.pop('check_determinism', False)
+        self.save_results_file = options.pop('save_results', True)
         self.log_levels = {
             LogOrigin.SIMULATION: logging.WARNING,
             LogOrigin.TEST: logging.INFO,
@@ -52,8 +60,13 @@ class TestSuite:
 
         self.results: dict[str, Tuple['TestSettings', TestStats]] = {}
         self.did_not_complete: List['TestSettings'] = []
+        self.diverged: List[Tuple[int, 'TestSettings', Optional[int]]] = []
+
+        runs_per_iteration = 2 if self.check_determinism else 1
 
-        hard_max_processes = min(mp.cpu_count() - 1, sum(x.total_iterations for x in self.tests))
+        hard_max_processes = min(
+            max(mp.cpu_count() - 1, 1), sum(x.total_iterations for x in self.tests) * runs_per_iteration
+        )
 
         max_processes = options.pop('max_processes', hard_max_processes)
         self.max_processes = min(max_processes, hard_max_processes)
@@ -90,15 +103,22 @@ class TestSuite:
         """Starts the Test Suite"""
         try:
             for _ in range(self.max_processes):
-                self.algo_manager_pool.append(TestSuiteManager(self.export_queue, self.log_queue, self.log_levels))
+                self.algo_manager_pool.append(
+                    TestSuiteManager(
+                        self.export_queue if self.export_artefacts else None, self.log_queue, self.log_levels
+                    )
+                )
 
             self.log_queue.put((LogOrigin.TEST, logging.INFO, 'Starting test suite'))
             self.background_process.start()
 
             args = []
             for test in self.tests:
-                for i in range(test.total_iterations):
-                    args.append(((i + 1, test), self.algo_manager_pool))
+                for i in range(test.iteration_offset, test.iteration_offset + test.total_iterations):
+                    # traces are recorded for this suite only, the settings are left as they were passed in
+                    args.append(((i + 1, test), self.algo_manager_pool, self.check_determinism))
+                    if self.check_determinism:
+                        args.append(((i + 1, test), self.algo_manager_pool, True))
 
             res = []
             with Pool(processes=self.max_processes) as pool:
@@ -120,16 +140,37 @@ class TestSuite:
 
             self.log_queue.put((LogOrigin.TEST, logging.INFO, 'All tests finished, gathering results'))
 
+            # (settings id, iteration) -> the first run of an iteration that is run twice
+            first_runs = {}
+            failed = set()
             for (n_iter, settings), stats in res:
+                key = (settings.id, n_iter)
+                if self.check_determinism and key not in first_runs:
+                    first_runs[key] = stats
+                    continue
+
+                if self.check_determinism:
+                    first = first_runs.pop(key)
+                    if isinstance(first, Exception) != isinstance(stats, Exception):
+                        # one run failed and the other did not, neither is counted
+                        self.record_divergence(n_iter, settings, None)
+                        continue
+                    if not isinstance(stats, Exception):
+                        self.check_divergence(n_iter, settings, first.hash_trace, stats.hash_trace)
+
                 if isinstance(stats, Exception):
-                    self.did_not_complete.append((n_iter, settings))
+                    if key not in failed:
+                        failed.add(key)
+                        self.did_not_complete.append((n_iter, settings))
                 else:
                     if settings.id not in self.results:
                         self.results[settings.id] = (settings, TestStats())
                     self.results[settings.id][1].append(stats)
 
             self.did_not_complete.sort(key=lambda x: ((x[1].name, x[1].algorithm_name, x[0])))
-            self.save_results()
+            self.diverged.sort(key=lambda x: ((x[1].name, x[1].algorithm_name, x[0])))
+            if self.save_results_file:
+                self.save_results()
         except Exception:
             self.close(force=True)
             raise
@@ -139,6 +180,32 @@ class TestSuite:
         else:
             self.close()
 
+    def check_divergence(self, n_iter, settings, trace_a, trace_b):
+        """Compares the hash traces of two runs of the same iteration
+
+        Logs and records the first tick where they diverge
+        """
+        index = first_divergence(trace_a, trace_b)
+        if index is not None:
+            # trace[i] is the state at the end of tick i + 1
+            self.record_divergence(n_iter, settings, index + 1)
+
+    def record_divergence(self, n_iter, settings, tick):
+        """Logs and records an iteration whose two runs diverged
+
+        tick: Optional[int]
+            The first tick the runs diverged at, None if one run failed and the other did not
+        """
+        self.diverged.append((n_iter, settings, tick))
+        where = 'with one run failing' if tick is None else f'at tick {tick}'
+        self.log_queue.put(
+            (
+                LogOrigin.TEST,
+                logging.WARNING,
+                f'{settings.name}_{settings.algorithm_name}_{n_iter} DIVERGED {where}',
+            )
+        )
+
     def format_results(self):
         """Formats the results for printing"""
         colorama.init()
@@ -161,6 +228,11 @@ class TestSuite:
                 final_fmt.append(f'  - {test.name}_{test.algorithm_name}_{n_iter}')
 
         final_fmt.append(f'Successful iterations: {successful_iterations}')
+        if self.check_determinism:
+            final_fmt.append(f'Diverged iterations: {len(self.diverged)}')
+            for n_iter, test, tick in self.diverged:
+                where = 'one run failed' if tick is None else f'tick {tick}'
+                final_fmt.append(f'  - {test.name}_{test.algorithm_name}_{n_iter} ({where})')
 
         if self.results:
             for settings, results in sorted(self.results.values(), key=lambda x: x[1].ticks.mean):
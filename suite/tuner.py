@@ -0,0 +1,189 @@
+import math
+import random
+from dataclasses import replace
+from typing import Dict, List, Tuple
+
+from models.algorithm import load_algorithms
+from suite import TestSettings, TestStats, TestSuite
+
+
+class Tuner:
+    def __init__(self, algorithm_name, scenarios, **options):
+        """Searches for the best tunable parameters of an algorithm (see ElevatorAlgorithm.tunables)
+
+        Every configuration is run on the same seeds as the others, and the iterations of every
+        configuration and scenario in a round are run in one TestSuite.
+
+        algorithm_name: str
+            Name of the algorithm to tune
+        scenarios: List[TestSettings]
+            Scenarios to tune for, the best parameters are found for each one separately
+            (total_iterations and algorithm_name are ignored)
+        **method: str
+            Default: 'halving'
+            'random' runs every configuration for the full number of iterations,
+            'halving' (successive halving) only keeps the best 1 / reduction of the configurations
+            after each round and runs the rest for reduction times more iterations
+        **num_configs: int
+            Default: 8
+            Number of configurations to try, including the default parameters
+        **iterations: int
+            Default: 8
+            Number of iterations the best configurations are run for
+        **min_iterations: int
+            Default: 2
+            Number of iterations every configuration is run for in the first round of successive halving
+        **reduction: int
+            Default: 2
+            Factor configurations are cut by (and iterations are increased by) every round of successive halving
+        **objective: str
+            Default: 'ticks'
+            Statistic to minimise, one of 'ticks', 'wait_time' or 'time_in_lift'
+        **seed: int
+            Default: None
+            Seed used to sample the configurations
+        **suite_options
+            Passed on to every TestSuite (e.g. max_processes)
+        """
+        self.algorithm_name = algorithm_name
+        self.scenarios: List[TestSettings] = scenarios
+
+        self.method = options.pop('method', 'halving')
+        self.num_configs = options.pop('num_configs', 8)
+        self.iterations = options.pop('iterations', 8)
+        self.min_iterations = min(options.pop('min_iterations', 2), self.iterations)
+        self.reduction = options.pop('reduction', 2)
+        self.objective = options.pop('objective', 'ticks')
+        self.rnd = random.Random(options.pop('seed', None))
+
+        if self.method not in ('halving', 'random'):
+            raise ValueError(f'Unknown method: {self.method}')
+        if self.objective not in ('ticks', 'wait_time', 'time_in_lift'):
+            raise ValueError(f'Unknown objective: {self.objective}')
+        if self.reduction < 2:
+            raise ValueError('reduction must be at least 2')
+
+        self.suite_options = {'export_artefacts': False, 'save_results': False, 'include_raw_stats': False}
+        self.suite_options.update(options)
+
+        algorithm = load_algorithms()[algorithm_name]
+        self.tunables = algorithm.tunables
+        if not self.tunables:
+            raise ValueError(f'{algorithm_name} has no tunable parameters')
+
+        # the default parameters are always tried first, parameters that default to None are left unset
+        defaults = {name: getattr(algorithm, name) for name in self.tunables}
+        self.configs: List[Dict[str, float]] = [
+            {name: value for name, value in defaults.items() if value is not None}
+        ]
+        for _ in range(self.num_configs - 1):
+            self.configs.append({name: tunable.sample(self.rnd) for name, tunable in self.tunables.items()})
+
+        # (scenario index, config index) -> stats of every iteration run so far
+        self.stats: Dict[Tuple[int, int], TestStats] = {}
+        self.failed: Dict[Tuple[int, int], int] = {}
+        # scenario name -> (params, score, iterations) of the best configuration
+        self.results: Dict[str, Tuple[Dict[str, float], float, int]] = {}
+
+    def score(self, scenario_index, config_index) -> float:
+        """Mean of the objective over the iterations run so far, infinity if any iteration failed"""
+        key = (scenario_index, config_index)
+        if self.failed.get(key) or key not in self.stats or len(self.stats[key]) == 0:
+            return math.inf
+        return getattr(self.stats[key], self.objective).mean
+
+    def run_round(self, alive: Dict[int, List[int]], iterations: int):
+        """Runs the configurations still being considered up to a number of iterations
+
+        alive: Dict[int, List[int]]
+            Scenario index -> indexes of the configurations still being considered
+        iterations: int
+            Number of iterations every configuration should have been run for after this round
+        """
+        tests = []
+        for scenario_index, config_indexes in alive.items():
+            scenario = self.scenarios[scenario_index]
+            for config_index in config_indexes:
+                done = len(self.stats.get((scenario_index, config_index), ()))
+                if iterations <= done:
+                    continue
+
+                tests.append(
+                    replace(
+                        scenario,
+                        name=f'{scenario.name}#{config_index}',
+                        algorithm_name=self.algorithm_name,
+                        total_iterations=iterations - done,
+                        iteration_offset=done,
+                        algorithm_params=self.configs[config_index],
+                        loads=list(scenario.loads),
+                    )
+                )
+
+        if not tests:
+            return
+
+        names = {f'{self.scenarios[i].name}#{c}': (i, c) for i, configs in alive.items() for c in configs}
+        suite = TestSuite(tests, **self.suite_options)
+        suite.start()
+
+        for settings, stats in suite.results.values():
+            key = names[settings.name]
+            if key not in self.stats:
+                self.stats[key] = TestStats()
+            total = self.stats[key]
+            total.ticks.extend(stats.ticks.stats)
+            total.wait_time.extend(stats.wait_time.stats)
+            total.time_in_lift.extend(stats.time_in_lift.stats)
+            total.occupancy.extend(stats.occupancy.stats)
+
+        for _, settings in suite.did_not_complete:
+            key = names[settings.name]
+            self.failed[key] = self.failed.get(key, 0) + 1
+
+    def start(self):
+        """Runs the search and returns the best parameters found for each scenario
+
+        Returns: Dict[str, Tuple[Dict[str, float], float, int]]
+            Scenario name -> (parameters, mean objective, number of iterations)
+        """
+        alive = {i: list(range(len(self.configs))) for i in range(len(self.scenarios))}
+        if self.method == 'random':
+            self.run_round(alive, self.iterations)
+        else:
+            iterations = self.min_iterations
+            while True:
+                self.run_round(alive, iterations)
+                if iterations >= self.iterations or all(len(x) == 1 for x in alive.values()):
+                    break
+
+                # early stop: only the best configurations carry on
+                for scenario_index, config_indexes in alive.items():
+                    config_indexes.sort(key=lambda x: self.score(scenario_index, x))
+                    keep = max(1, math.ceil(len(config_indexes) / self.reduction))
+                    del config_indexes[keep:]
+                iterations = min(iterations * self.reduction, self.iterations)
+
+        for scenario_index, config_indexes in alive.items():
+            best = min(config_indexes, key=lambda x: (self.score(scenario_index, x), x))
+            self.results[self.scenarios[scenario_index].name] = (
+                self.configs[best],
+                self.score(scenario_index, best),
+                len(self.stats.get((scenario_index, best), ())),
+            )
+
+        return self.results
+
+    def format_results(self):
+        """Formats the results for printing"""
+        final_fmt = [f'Tuned {self.algorithm_name} ({self.objective}, {self.method})']
+        for scenario_index, scenario in enumerate(self.scenarios):
+            params, score, iterations = self.results[scenario.name]
+            default = self.score(scenario_index, 0)
+            formatted = ', '.join(f'{name}={value:g}' for name, value in params.items())
+            final_fmt.append(
+                f'  {scenario.name}: {formatted} -> {score:.2f} '
+                f'over {iterations} iterations (default {default:.2f})'
+            )
+
+        return '\n'.join(final_fmt)
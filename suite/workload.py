@@ -0,0 +1,161 @@
+import bisect
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from models import Load
+
+
+class Workload:
+    """Draws passengers in bulk from a seeded NumPy Generator
+
+    Every (seed, iteration) pair maps to its own stream:
+        np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(iteration,))))
+    The iteration is a spawn key rather than being added to the seed (as it is for ElevatorAlgorithm.rnd),
+    so seed 1 iteration 1 and seed 2 iteration 0 do not share a stream, and the streams are independent of
+    the random module. A stream is the same on every platform and process for a given NumPy version.
+
+    Floors and arrival times are drawn as whole arrays and only turned into Load objects at the end, so
+    building a scenario with 100k passengers takes milliseconds.
+
+    seed: int
+        Seed of the test
+    iteration: int
+        Iteration number of the test
+        Default: 0
+    """
+
+    # passengers of an open system drawn at once, see arriving
+    ARRIVAL_BLOCK = 1024
+
+    def __init__(self, seed, iteration=0) -> None:
+        self.seed = seed
+        self.iteration = iteration
+        self.rng = self.stream(seed, iteration)
+
+        # arrival time of the last passenger drawn, and the arrival ticks and trips of those not returned yet
+        self._arrival_time = 0.0
+        self._arrival_ticks: List[int] = []
+        self._arrival_trips = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        self._arrival_index = 0
+
+    @staticmethod
+    def stream(seed, iteration=0) -> np.random.Generator:
+        """Returns the Generator of a seed and iteration (see Workload)"""
+        return np.random.Generator(np.random.PCG64(np.random.SeedSequence(seed, spawn_key=(iteration,))))
+
+    def floors(self, count, low, high) -> np.ndarray:
+        """Draws floors uniformly between low and high (inclusive)
+
+        low: int | np.ndarray
+            The lowest floor, or the lowest floor of each draw
+        high: int | np.ndarray
+            The highest floor, or the highest floor of each draw
+        """
+        return self.rng.integers(low, np.asarray(high) + 1, size=count)
+
+    def choice(self, count, floors: Sequence[int]) -> np.ndarray:
+        """Draws floors uniformly from a list of floors"""
+        return self.rng.choice(np.asarray(floors), size=count)
+
+    def trips(self, count, floors, initial: Optional[np.ndarray] = None):
+        """Draws trips between two different floors, uniformly
+
+        count: int
+            The number of trips
+        floors: int
+            The number of floors
+        initial: Optional[np.ndarray]
+            The floors the trips start from, drawn uniformly if None
+            Default: None
+
+        Returns: Tuple[np.ndarray, np.ndarray]
+            The initial and destination floor of every trip
+        """
+        if initial is None:
+            initial = self.floors(count, 1, floors)
+        # any floor but the initial one
+        offset = self.rng.integers(1, floors, size=count)
+        destination = (initial - 1 + offset) % floors + 1
+        return initial, destination
+
+    def arrivals(self, count, rate, start=0.0) -> np.ndarray:
+        """Draws the times (in ticks) the next passengers of a Poisson stream arrive at, in order
+
+        count: int
+            The number of passengers
+        rate: float
+            Mean number of passengers arriving every tick
+        start: float
+            The time the stream is at
+            Default: 0
+        """
+        return start + np.cumsum(self.rng.exponential(1 / rate, size=count))
+
+    def arriving(self, tick, rate, floors) -> List[Load]:
+        """Returns the passengers of a Poisson stream between random floors arriving by a tick
+
+        Passengers arriving between two ticks arrive at the later one. Arrival times and trips are drawn
+        ARRIVAL_BLOCK passengers at a time, so most ticks only search the times already drawn.
+
+        tick: int
+            The current tick
+        rate: float
+            Mean number of passengers arriving every tick
+        floors: int
+            The number of floors
+        """
+        loads = []
+        while True:
+            if self._arrival_index == len(self._arrival_ticks):
+                times = self.arrivals(self.ARRIVAL_BLOCK, rate, self._arrival_time)
+                self._arrival_time = float(times[-1])
+                self._arrival_ticks = np.ceil(times).astype(np.int64).tolist()
+                self._arrival_trips = self.trips(self.ARRIVAL_BLOCK, floors)
+                self._arrival_index = 0
+
+            start = self._arrival_index
+            end = bisect.bisect_right(self._arrival_ticks, tick, start)
+            if end > start:
+                initial, destination = self._arrival_trips
+                ticks = self._arrival_ticks[start:end]
+                loads.extend(self.loads(initial[start:end], destination[start:end], ticks))
+                self._arrival_index = end
+            if end < len(self._arrival_ticks):
+                return loads
+
+    @staticmethod
+    def loads(initial, destination, ticks=None, weight=60) -> List[Load]:
+        """Creates the loads of a set of trips
+
+        initial: np.ndarray
+            The initial floor of every load
+        destination: np.ndarray
+            The destination floor of every load
+        ticks: Optional[np.ndarray]
+            The tick every load is created at, 0 if None
+            Default: None
+        weight: int
+            The weight of every load
+            Default: 60
+        """
+        initial = np.asarray(initial).tolist()
+        destination = np.asarray(destination).tolist()
+        loads = [Load(x, y, weight) for x, y in zip(initial, destination)]
+        if ticks is not None:
+            for load, tick in zip(loads, np.asarray(ticks).tolist()):
+                load.tick_created = tick
+        return loads
+
+    def passengers(self, count, floors) -> List[Load]:
+        """Creates passengers travelling between two random floors
+
+        count: int
+            The number of passengers
+        floors: int
+            The number of floors
+        """
+        return self.loads(*self.trips(count, floors))
+
+    def __repr__(self) -> str:
+        return f'<Workload seed={self.seed} iteration={self.iteration}>'
@@ -0,0 +1,40 @@
+"""Run a campus of 1000 small buildings on one tick scheduler"""
+import sys
+import time
+
+from models import Campus
+from models.algorithm import load_algorithms
+
+
+def run_test():
+    test_only = ' '.join(sys.argv[1:]) or None
+    SEED = 1234
+    BUILDINGS = 1000
+    FLOORS = 6
+    PASSENGERS = 10
+    START_TIME = time.perf_counter()
+
+    algorithms = load_algorithms()
+    for algorithm_name, algorithm in algorithms.items():
+        if test_only is not None and algorithm_name != test_only:
+            continue
+
+        campus = Campus(seed=SEED)
+        for _ in range(BUILDINGS):
+            building = campus.add_building(algorithm, FLOORS)
+            for _ in range(PASSENGERS):
+                building.add_passenger(*building.algorithm.rnd.sample(range(1, FLOORS + 1), 2))
+
+        campus.play()
+        loop_start = time.perf_counter()
+        ticks = campus.loop()
+        loop_time = time.perf_counter() - loop_start
+
+        building_ticks = sum(building.algorithm.tick_count for building in campus.buildings)
+        print(
+            f'{algorithm_name}: {ticks} ticks in {loop_time:.2f}s '
+            f'({building_ticks / loop_time:.0f} building ticks/s)\n{campus.combined_stats()}\n'
+        )
+
+    time_taken = time.perf_counter() - START_TIME
+    print(f'Total time: {time_taken:.2f}s')
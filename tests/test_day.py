@@ -1,7 +1,6 @@
 """Run a test suite simulating a full day"""
 import sys
 import time
-from models import Load
 from models import ElevatorAlgorithm
 
 from models.algorithm import load_algorithms
@@ -9,22 +8,18 @@ from suite import TestSettings, TestSuite
 
 
 def add_loads(algo, count, popular_floors):
-    all_floors = list(range(1, algo.floors + 1))
-    for _ in range(count // 2):
-        picked_popular = algo.rnd.choice(popular_floors)
-        while True:
-            dest = algo.rnd.choice(all_floors)
-            if dest > picked_popular:
-                break
-        algo.loads.append(Load(picked_popular, dest, 60))
-
-    for _ in range(count // 2):
-        picked_popular = algo.rnd.choice(popular_floors)
-        while True:
-            init = algo.rnd.choice(all_floors)
-            if init < picked_popular:
-                break
-        algo.loads.append(Load(init, picked_popular, 60))
+    workload = algo.manager.workload
+    # from a popular floor to any floor above it
+    picked_popular = workload.choice(count // 2, popular_floors)
+    destinations = workload.floors(count // 2, picked_popular + 1, algo.floors)
+    for load in workload.loads(picked_popular, destinations):
+        algo.add_load(load)
+
+    # from any floor below a popular floor to it
+    picked_popular = workload.choice(count // 2, popular_floors)
+    initial = workload.floors(count // 2, 1, picked_popular - 1)
+    for load in workload.loads(initial, picked_popular):
+        algo.add_load(load)
 
 
 def init_func(algo: ElevatorAlgorithm):
@@ -0,0 +1,163 @@
+"""Check the dispatch environment is reproducible and its observations are right, and measure its steps/s"""
+import time
+
+import numpy as np
+
+from env import ElevatorEnv, VectorElevatorEnv
+
+
+def random_actions(rng: np.random.Generator, env: ElevatorEnv, shape=()):
+    """Sends each elevator to a random floor, or leaves it be (0) half of the time"""
+    actions = rng.integers(1, env.floors + 1, shape + (env.num_elevators,))
+    return np.where(rng.random(actions.shape) < 0.5, actions, 0)
+
+
+def rollout(seed, steps):
+    """Runs an episode with random actions and returns every observation and reward"""
+    env = ElevatorEnv()
+    rng = np.random.default_rng(seed)
+    observation, _ = env.reset(seed)
+    trace = [observation]
+    for _ in range(steps):
+        observation, reward, terminated, truncated, _ = env.step(random_actions(rng, env))
+        trace.append((observation, reward))
+        if terminated or truncated:
+            break
+    env.close()
+    return trace
+
+
+def same_trace(first, second) -> bool:
+    if len(first) != len(second):
+        return False
+    for a, b in zip(first, second):
+        if isinstance(a, tuple):
+            if a[1] != b[1]:
+                return False
+            a, b = a[0], b[0]
+        if any(not np.array_equal(a[key], b[key]) for key in a):
+            return False
+    return True
+
+
+def check_determinism(steps):
+    if not same_trace(rollout(1, steps), rollout(1, steps)):
+        raise AssertionError('two episodes with the same seed differ')
+    if same_trace(rollout(1, steps), rollout(2, steps)):
+        raise AssertionError('two episodes with different seeds are the same')
+    print(f'determinism: {steps} steps, same seed same episode')
+
+
+def check_observations(steps):
+    env = ElevatorEnv(floors=12, num_elevators=3, num_passengers=150)
+    rng = np.random.default_rng(0)
+    observation, _ = env.reset(0)
+    for _ in range(steps):
+        shapes = {key: value.shape for key, value in observation.items()}
+        expected = {
+            'up_calls': (env.floors,),
+            'down_calls': (env.floors,),
+            'positions': (env.num_elevators,),
+            'loads': (env.num_elevators,),
+            'destinations': (env.num_elevators,),
+        }
+        if shapes != expected:
+            raise AssertionError(f'observation shapes {shapes}, expected {expected}')
+
+        up_calls = np.zeros(env.floors, dtype=np.int32)
+        down_calls = np.zeros(env.floors, dtype=np.int32)
+        for load in env.algorithm.pending_index:
+            if load.destination_floor > load.initial_floor:
+                up_calls[load.initial_floor - 1] += 1
+            else:
+                down_calls[load.initial_floor - 1] += 1
+        if not np.array_equal(observation['up_calls'], up_calls):
+            raise AssertionError(f'up calls {observation["up_calls"]}, expected {up_calls}')
+        if not np.array_equal(observation['down_calls'], down_calls):
+            raise AssertionError(f'down calls {observation["down_calls"]}, expected {down_calls}')
+
+        elevators = env.algorithm.elevators
+        if observation['positions'].tolist() != [elevator.current_floor for elevator in elevators]:
+            raise AssertionError('positions are out of sync with the elevators')
+        if observation['loads'].tolist() != [elevator.load for elevator in elevators]:
+            raise AssertionError('loads are out of sync with the elevators')
+
+        observation, _, terminated, truncated, _ = env.step(random_actions(rng, env))
+        if terminated or truncated:
+            observation, _ = env.reset()
+    env.close()
+    print(f'observations: {steps} steps, shapes and up/down counts match the simulation')
+
+
+def check_vector_env(steps, num_envs):
+    envs = VectorElevatorEnv([ElevatorEnv] * num_envs)
+    singles = [ElevatorEnv() for _ in range(num_envs)]
+    rng = np.random.default_rng(0)
+    observations, _ = envs.reset(0)
+    expected = [env.reset(i)[0] for i, env in enumerate(singles)]
+    for _ in range(steps):
+        for key, value in observations.items():
+            if not np.array_equal(value, np.stack([observation[key] for observation in expected])):
+                raise AssertionError(f'{key} of the vector environment differ from its environments on their own')
+
+        actions = random_actions(rng, singles[0], (num_envs,))
+        observations, rewards, _, _, _ = envs.step(actions)
+        expected = []
+        for env, env_actions, reward in zip(singles, actions, rewards):
+            observation, env_reward, terminated, truncated, _ = env.step(env_actions)
+            if env_reward != reward:
+                raise AssertionError('rewards of the vector environment differ from its environments on their own')
+            if terminated or truncated:
+                observation, _ = env.reset()
+            expected.append(observation)
+    envs.close()
+    for env in singles:
+        env.close()
+    print(f'vector: {steps} steps of {num_envs} environments, same as stepping them on their own')
+
+
+def measure_env(seconds, block=10000):
+    """Returns the steps/s of an environment, with random actions drawn ahead of time"""
+    env = ElevatorEnv()
+    rng = np.random.default_rng(0)
+    env.reset(0)
+    steps = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for actions in random_actions(rng, env, (block,)):
+            _, _, terminated, truncated, _ = env.step(actions)
+            if terminated or truncated:
+                env.reset()
+        steps += block
+    env.close()
+    return steps / (time.perf_counter() - start)
+
+
+def measure_vector_env(seconds, num_envs, block=1000):
+    """Returns the steps/s of all the environments of a vector environment together"""
+    envs = VectorElevatorEnv([ElevatorEnv] * num_envs)
+    rng = np.random.default_rng(0)
+    envs.reset(0)
+    steps = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for actions in random_actions(rng, envs.envs[0], (block, num_envs)):
+            envs.step(actions)
+        steps += block * num_envs
+    envs.close()
+    return steps / (time.perf_counter() - start)
+
+
+def run_test():
+    START_TIME = time.perf_counter()
+    SECONDS = 3
+    NUM_ENVS = 8
+
+    check_determinism(500)
+    check_observations(2000)
+    check_vector_env(2000, 3)
+    print(f'ElevatorEnv: {measure_env(SECONDS):.0f} steps/s')
+    print(f'VectorElevatorEnv ({NUM_ENVS} envs): {measure_vector_env(SECONDS, NUM_ENVS):.0f} steps/s')
+
+    time_taken = time.perf_counter() - START_TIME
+    print(f'Total time: {time_taken:.2f}s')
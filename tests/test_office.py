@@ -1,7 +1,9 @@
 """Run a test suite simulating a busy office day"""
 import sys
 import time
-from models import Load
+
+import numpy as np
+
 from models import ElevatorAlgorithm
 
 from models.algorithm import load_algorithms
@@ -9,19 +11,21 @@ from suite import TestSettings, TestSuite
 
 
 def morning_init(algo: ElevatorAlgorithm):
-    for _ in range(500):
-        dest = algo.rnd.randint(2, algo.floors)
-        algo.loads.append(Load(1, dest, 60))
+    workload = algo.manager.workload
+    destinations = workload.floors(500, 2, algo.floors)
+    for load in workload.loads(np.ones_like(destinations), destinations):
+        algo.add_load(load)
 
-    for _ in range(100):
-        init = algo.rnd.randint(2, algo.floors)
-        algo.loads.append(Load(init, 1, 60))
+    initial = workload.floors(100, 2, algo.floors)
+    for load in workload.loads(initial, np.ones_like(initial)):
+        algo.add_load(load)
 
 
 def evening_init(algo: ElevatorAlgorithm):
-    for _ in range(600):
-        init = algo.rnd.randint(2, algo.floors)
-        algo.loads.append(Load(init, 1, 60))
+    workload = algo.manager.workload
+    initial = workload.floors(600, 2, algo.floors)
+    for load in workload.loads(initial, np.ones_like(initial)):
+        algo.add_load(load)
 
 
 def run_test():
@@ -0,0 +1,59 @@
+"""Measure the size and speed of pickling the results of a busy test suite"""
+import pickle
+import sys
+import time
+
+from models.algorithm import load_algorithms
+from suite import TestSettings, TestSuite
+
+
+def run_test():
+    test_only = ' '.join(sys.argv[1:]) or None
+    SEED = 1234
+    REPEATS = 20
+    START_TIME = time.perf_counter()
+    options = {
+        'include_raw_stats': True,
+        'export_artefacts': False,
+    }
+
+    tests = []
+    algorithms = load_algorithms()
+    for algorithm_name in algorithms.keys():
+        if test_only is not None and algorithm_name != test_only:
+            continue
+
+        tests.append(
+            TestSettings(
+                name='Busy',
+                algorithm_name=algorithm_name,
+                seed=SEED,
+                floors=80,
+                num_elevators=16,
+                num_passengers=1600,
+                total_iterations=1,
+                max_load=15 * 60,
+            )
+        )
+
+    suite = TestSuite(tests, **options)
+    suite.start()
+
+    for settings, stats in suite.results.values():
+        dump_start = time.perf_counter()
+        for _ in range(REPEATS):
+            data = pickle.dumps((settings, stats), protocol=pickle.HIGHEST_PROTOCOL)
+        dump_time = (time.perf_counter() - dump_start) / REPEATS
+
+        load_start = time.perf_counter()
+        for _ in range(REPEATS):
+            pickle.loads(data)
+        load_time = (time.perf_counter() - load_start) / REPEATS
+
+        print(
+            f'{settings.algorithm_name}: {len(data)} bytes, '
+            f'dump {dump_time * 1000:.2f}ms, load {load_time * 1000:.2f}ms'
+        )
+
+    time_taken = time.perf_counter() - START_TIME
+    print(f'Total time: {time_taken:.2f}s')
@@ -0,0 +1,59 @@
+"""Run the rollout algorithm with and without worker processes and check both give the same simulation"""
+import logging
+import multiprocessing as mp
+import queue
+import time
+
+from algorithms.rollout import ElevatorAlgorithmRollout
+from suite import ManagerPool, TestSettings, TestSuiteManager, run_loop
+from utils import LogOrigin
+
+
+def settings():
+    # the passengers of an iteration are added to its settings, so every run gets its own
+    return TestSettings(
+        name='Office',
+        algorithm_name=ElevatorAlgorithmRollout.name,
+        seed=1234,
+        floors=50,
+        num_elevators=8,
+        num_passengers=300,
+        total_iterations=1,
+        max_load=15 * 60,
+    )
+
+
+def run_test():
+    ITERATIONS = 3
+    WORKERS = (1, 4)
+    START_TIME = time.perf_counter()
+
+    # simulations are run in this process, as rollouts are never sent to workers from a test suite process
+    mp_manager = mp.Manager()
+    log_levels = {origin: logging.WARNING for origin in LogOrigin}
+    pool = ManagerPool(mp_manager, [TestSuiteManager(None, queue.Queue(), log_levels)])
+    default_workers = ElevatorAlgorithmRollout.rollout_workers
+    results = {}
+    try:
+        for workers in WORKERS:
+            ElevatorAlgorithmRollout.rollout_workers = workers
+            run_start = time.perf_counter()
+            results[workers] = [run_loop(((i + 1, settings()), pool, True))[1] for i in range(ITERATIONS)]
+            print(f'{workers} worker(s): {time.perf_counter() - run_start:.2f}s')
+    finally:
+        ElevatorAlgorithmRollout.rollout_workers = default_workers
+        pool.close()
+        mp_manager.shutdown()
+
+    serial = results[WORKERS[0]]
+    for workers in WORKERS[1:]:
+        for n_iter, (expected, stats) in enumerate(zip(serial, results[workers]), start=1):
+            for result in (expected, stats):
+                if isinstance(result, Exception):
+                    raise result
+            if expected.hash_trace != stats.hash_trace:
+                raise AssertionError(f'iteration {n_iter} with {workers} workers diverged from the serial run')
+            print(f'iteration {n_iter}: {stats.ticks} ticks, {stats.wait_time.mean:.2f} mean wait, identical')
+
+    time_taken = time.perf_counter() - START_TIME
+    print(f'Total time: {time_taken:.2f}s')
@@ -0,0 +1,43 @@
+"""Run a test suite on an open system until the wait time converges"""
+import sys
+import time
+
+from models.algorithm import load_algorithms
+from suite import TestSettings, TestSuite
+
+
+def run_test():
+    test_only = ' '.join(sys.argv[1:]) or None
+    SEED = 1234
+    START_TIME = time.perf_counter()
+    options = {
+        'include_raw_stats': False,
+        'export_artefacts': False,
+    }
+
+    tests = []
+    algorithms = load_algorithms()
+    for algorithm_name in algorithms.keys():
+        if test_only is not None and algorithm_name != test_only:
+            continue
+
+        tests.append(
+            TestSettings(
+                name='Steady',
+                algorithm_name=algorithm_name,
+                seed=SEED,
+                floors=30,
+                num_elevators=4,
+                num_passengers=0,
+                total_iterations=10,
+                max_load=15 * 60,
+                arrival_rate=0.1,
+            )
+        )
+
+    suite = TestSuite(tests, **options)
+    suite.start()
+    print(suite.format_results())
+
+    time_taken = time.perf_counter() - START_TIME
+    print(f'Total time: {time_taken:.2f}s')
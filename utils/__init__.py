@@ -1,6 +1,7 @@
 from utils._utils import (
     save_algorithm, split_array, jq_join_timeout, i2b, b2i, algo_to_enum,
-    run_async_or_sync, log_levels, get_log_level, get_log_name
+    run_async_or_sync, log_levels, get_log_level, get_log_name, mix64, zobrist_key, first_divergence,
+    solve_assignment, pack_numbers, unpack_numbers
 )
 from utils.constants import (
     Constants, LogOrigin, ID, ActionType,
@@ -8,5 +9,6 @@ from utils.constants import (
 )
 from utils.errors import (
     TestTimeoutError, BadArgumentError, ElevatorError, ElevatorRunError, FullElevatorError, IncompletePacketError,
-    InvalidAlgorithmError, InvalidChecksumError, InvalidStartBytesError, PacketError, NoManagerError
+    InvalidAlgorithmError, InvalidChecksumError, InvalidStartBytesError, InvariantError, PacketError,
+    NoManagerError
 )
@@ -1,10 +1,15 @@
 import asyncio
+import functools
 import gzip
 import logging
 import os
 import pickle
+import zlib
+from array import array
 from datetime import datetime
-from typing import Generator, Tuple
+from typing import Dict, Generator, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from web.backend.constants import Algorithms
 
@@ -90,6 +95,177 @@ def get_log_name(level) -> str:
     return {v: k for k, v in log_levels().items()}[level]
 
 
+def mix64(value: int) -> int:
+    """Scrambles an integer into a well distributed 64 bit integer (splitmix64 finalizer)"""
+    value = (value + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return value ^ (value >> 31)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def zobrist_key(key: Tuple[int, ...]) -> int:
+    """Returns the random 64 bit value assigned to a state key
+
+    The value only depends on the integers in the key (not on hash()),
+    so it is identical across processes, machines and Python versions.
+    """
+    value = 0
+    for part in key:
+        value = mix64(value ^ (part & 0xFFFFFFFFFFFFFFFF))
+    return value
+
+
+def pack_numbers(values: Sequence[int | float], delta: bool = False) -> Tuple[str, bytes]:
+    """Packs numbers into a compressed buffer of the smallest type that holds them
+
+    values: Sequence[int | float]
+        The numbers to pack
+    delta: bool
+        Whether to store the difference to the previous integer instead (e.g. for ids, which mostly go up by 1)
+        Default: False
+
+    Returns: Tuple[str, bytes]
+        The little endian NumPy dtype and the zlib compressed buffer, see unpack_numbers
+    """
+    if not isinstance(values, (list, tuple, array, np.ndarray)):
+        values = list(values)
+    values = np.asarray(values)
+    if values.dtype.kind == 'f':
+        dtype = '<f8'
+    else:
+        if delta and len(values):
+            values = np.diff(values.astype(np.int64), prepend=0)
+        low, high = (int(values.min()), int(values.max())) if len(values) else (0, 0)
+        for dtype in ('<u1', '<i1', '<u2', '<i2', '<u4', '<i4', '<u8', '<i8'):
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                break
+    return dtype, zlib.compress(values.astype(dtype).tobytes(), 1)
+
+
+def unpack_numbers(packed: Tuple[str, bytes], delta: bool = False) -> List[int | float]:
+    """Unpacks the numbers packed by pack_numbers
+
+    packed: Tuple[str, bytes]
+        The dtype and buffer returned by pack_numbers
+    delta: bool
+        Whether they were packed with delta
+        Default: False
+    """
+    dtype, data = packed
+    values = np.frombuffer(zlib.decompress(data), dtype=dtype)
+    if delta and values.dtype.kind != 'f':
+        values = np.cumsum(values, dtype=np.int64)
+    return values.tolist()
+
+
+def first_divergence(a: Sequence[int], b: Sequence[int]) -> Optional[int]:
+    """Returns the first index where two traces differ, None if they are identical"""
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return i
+    if len(a) != len(b):
+        return min(len(a), len(b))
+    return None
+
+
+def solve_assignment(
+    cost: np.ndarray, column_potentials: Optional[np.ndarray] = None, initial: Optional[Dict[int, int]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Solves the minimum cost assignment of every row to a different column with the Hungarian method
+
+    Rows are added one at a time along the shortest augmenting path (Jonker-Volgenant),
+    so a previous solution can be reused: its column potentials keep the duals feasible and any
+    of its pairs that are still tight are kept, leaving only the new rows to be augmented.
+
+    cost: np.ndarray
+        A rows x columns matrix of finite costs, with no more rows than columns
+    column_potentials: Optional[np.ndarray]
+        Column potentials returned by a previous solve, to warm start from
+    initial: Optional[Dict[int, int]]
+        Row -> column pairs of a previous solve, to warm start from
+
+    Returns: Tuple[np.ndarray, np.ndarray]
+        The column assigned to each row and the column potentials
+    """
+    n_rows, n_columns = cost.shape
+    if n_rows > n_columns:
+        raise ValueError('solve_assignment needs at least as many columns as rows')
+
+    # column_row[n_columns] is a virtual column holding the row being added
+    column_row = np.full(n_columns + 1, -1)
+    v = np.zeros(n_columns + 1)
+    u = cost.min(axis=1) if n_columns else np.zeros(n_rows)
+    if column_potentials is not None and initial:
+        v[:n_columns] = np.minimum(column_potentials, 0)
+        pairs = {}
+        for row, column in initial.items():
+            if 0 <= row < n_rows and 0 <= column < n_columns and column not in pairs.values():
+                pairs[row] = column
+
+        while True:
+            # columns without a row must have a potential of 0, the others must not be positive
+            kept = np.zeros(n_columns + 1, dtype=bool)
+            kept[list(pairs.values())] = True
+            v[~kept] = 0
+            u = (cost - v[:n_columns]).min(axis=1)
+            tight = {
+                row: column
+                for row, column in pairs.items()
+                if np.isclose(cost[row, column] - u[row] - v[column], 0)
+            }
+            if len(tight) == len(pairs):
+                break
+            pairs = tight
+
+        for row, column in pairs.items():
+            column_row[column] = row
+
+    assigned = set(column_row[:n_columns][column_row[:n_columns] >= 0].tolist())
+    for row in range(n_rows):
+        if row in assigned:
+            continue
+
+        column_row[n_columns] = row
+        min_value = np.full(n_columns + 1, np.inf)
+        way = np.full(n_columns + 1, n_columns)
+        used = np.zeros(n_columns + 1, dtype=bool)
+        current = n_columns
+        while True:
+            used[current] = True
+            current_row = column_row[current]
+            free = ~used[:n_columns]
+            reduced = cost[current_row] - u[current_row] - v[:n_columns]
+            better = free & (reduced < min_value[:n_columns])
+            min_value[:n_columns][better] = reduced[better]
+            way[:n_columns][better] = current
+
+            candidates = np.where(free, min_value[:n_columns], np.inf)
+            following = int(np.argmin(candidates))
+            delta = candidates[following]
+
+            used_columns = np.flatnonzero(used)
+            u[column_row[used_columns]] += delta
+            v[used_columns] -= delta
+            min_value[:n_columns][free] -= delta
+
+            current = following
+            if column_row[current] == -1:
+                break
+
+        # flip the augmenting path
+        while current != n_columns:
+            previous = way[current]
+            column_row[current] = column_row[previous]
+            current = previous
+
+    row_column = np.full(n_rows, -1)
+    columns = np.flatnonzero(column_row[:n_columns] >= 0)
+    row_column[column_row[columns]] = columns
+    return row_column, v[:n_columns]
+
+
 async def run_async_or_sync(func):
     """Runs a function whether it is async or sync"""
     if asyncio.iscoroutinefunction(func):
@@ -10,6 +10,7 @@ class ID(IntEnum):
     BUTTON_CONTROL_PLAY = 22
 
     MENU_APP_EXIT = 310
+    MENU_LONG_RUNNING = 311
 
     SELECT_ELEVATOR_ADD = 410
     SELECT_ELEVATOR_REMOVE = 411
@@ -49,6 +50,7 @@ class Constants:
     DEFAULT_FLOORS = 10
     MAX_PROCESSES_WXGUI = 3
     MAX_NUM_LOADS_REMOVED_PER_TICK = 3
+    MAX_LOG_MESSAGES = 5000
 
 
 class _InfinitySentinel:
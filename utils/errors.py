@@ -22,6 +22,12 @@ class ElevatorRunError(ElevatorError):
     pass
 
 
+class InvariantError(ElevatorError):
+    """Raised when the state of the simulation is inconsistent"""
+
+    pass
+
+
 class InvalidAlgorithmError(ElevatorError):
     """Raised when the algorithm is not of a valid type"""
 
@@ -54,3 +54,6 @@ class Algorithms(IntEnum):
     NStepLOOK = 3
     Rolling = 4
     Scatter = 5
+    ETA_Dispatch = 6
+    Hungarian = 7
+    Rollout = 8
@@ -24,6 +24,8 @@ class AsyncWebManager(ElevatorManager):
             log_func=self.log_message_web,
             sync=False
         )
+        # sessions can be left running indefinitely
+        self.set_long_running()
         self.ws_connection: WSConnection = None
 
         self._running = False
@@ -5,6 +5,9 @@ enum ElevatorAlgorithm {
     NStepLOOK = 3,
     Rolling = 4,
     Scatter = 5,
+    ETA_Dispatch = 6,
+    Hungarian = 7,
+    Rollout = 8,
 }
 
 